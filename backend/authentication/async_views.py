@@ -0,0 +1,162 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import exceptions, serializers, status
+import logging
+from backend.routers import read_replica
+from backend.throttling import throttle
+from backend.async_api import (
+    BadRequest,
+    aget_token_user,
+    error_response,
+    parse_json_body,
+    staff_required,
+    token_required,
+)
+from backend import exporting
+from backend.renderers import FastJSONResponse
+from django.db import router
+from .models import AuthToken, User
+from .serializers import (
+    UserValuesSerializer,
+    LoginSerializer,
+    CompanyRegistrationSerializer,
+    CostumerRegistrationSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+# ASGI-native versions of the views in views.py, served when settings.API_MODE == 'async'.
+
+#------------
+# ===> Login:
+#------------
+@csrf_exempt
+@require_POST
+@throttle('login', email_field='email')
+async def login_view(request):
+    """
+    Login API endpoint
+    POST /authentication/login/
+    {
+        "email": "user@example.com",
+        "password": "password13"
+    }
+    """
+    try:
+        data = parse_json_body(request)
+        # field validation only, LoginSerializer.validate() authenticates synchronously.
+        attrs = LoginSerializer().to_internal_value(data)
+    except BadRequest as error:
+        return error_response(error.detail)
+    except serializers.ValidationError as error:
+        return error_response(error.detail)
+    user = await aauthenticate(username=attrs['email'], password=attrs['password'])
+    if not user:
+        return error_response({'non_field_errors': ["Invalid email or password."]})
+    token = await AuthToken.objects.aissue(user)
+    return FastJSONResponse(
+        {
+            'token': token.key,
+            'user': UserValuesSerializer(user).data,
+            'message': "Login successful"
+        },
+        status=status.HTTP_200_OK
+    )
+
+#-------------
+# ===> Logout:
+#-------------
+@csrf_exempt
+@require_POST
+async def logout_view(request):
+    '''
+    Logout API endpoint
+    POST /authentication/logout/
+    Headers: Authorization: Token your_token_here
+    Only the token of the request is deleted, the other devices stay logged in.
+    '''
+    try:
+        credentials = await aget_token_user(request)
+    except exceptions.AuthenticationFailed:
+        credentials = None
+    if credentials is None:
+        return error_response({'error': 'Error logging out'})
+    _, token = credentials
+    await token.adelete()
+    return FastJSONResponse({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
+
+# ------------------
+# ===> REGISTRATION
+# ------------------
+
+async def _register(request, serializer_class, message):
+    # message is the (key, text) pair of the matching sync view's response.
+    try:
+        data = parse_json_body(request)
+    except BadRequest as error:
+        return error_response(error.detail)
+    serializer = serializer_class(data=data)
+    # the unique validators query the database and the password validators are cpu bound.
+    if not await sync_to_async(serializer.is_valid)():
+        logger.info("registration rejected", extra={'errors': serializer.errors})
+        return error_response(serializer.errors)
+    user = await serializer.acreate(serializer.validated_data)
+    token = await AuthToken.objects.aissue(user)
+    return FastJSONResponse(
+        {
+            'token': token.key,
+            'user': UserValuesSerializer(user).data,
+            message[0]: message[1]
+        },
+        status=status.HTTP_200_OK
+    )
+
+# ====> Costumer:
+@csrf_exempt
+@require_POST
+@throttle('register')
+async def costumer_register_view(request):
+    """
+    Customer registration API endpoint
+    POST /authentication/register_costumer/
+    """
+    return await _register(request, CostumerRegistrationSerializer, ('messsage', 'Costumer registration successful'))
+
+# ====> Company:
+@csrf_exempt
+@require_POST
+@throttle('register')
+async def company_register_view(request):
+    """
+    Company registration API endpoint
+    POST /authentication/register_company/
+    """
+    return await _register(request, CompanyRegistrationSerializer, ('message', "Company registration successful"))
+
+# Authenticate the session:
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+async def authenticate_view(request):
+    return FastJSONResponse(UserValuesSerializer(request.user).data)
+
+# Export the users:
+@read_replica
+@require_GET
+@token_required
+@staff_required
+@throttle('api')
+async def export_users_view(request):
+    """
+    User export API endpoint (staff)
+    GET /authentication/export/?output=csv|ndjson|json&since=2026-01-01T00:00:00Z&until=...
+    """
+    params = exporting.ExportParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    return exporting.streaming_response(
+        exporting.get_exports()['users'], params.validated_data, using=router.db_for_read(User), asynchronous=True
+    )
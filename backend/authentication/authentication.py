@@ -0,0 +1,238 @@
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from backend.routers import reading_from_replica
+from .models import AuthToken
+
+SHARED_KEY_PREFIX = 'auth-token:'
+REVOKED_KEY_PREFIX = 'auth-token-revoked:'
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> user with a TTL.
+    When a shared django cache alias is given it is used as a second level, so the workers
+    share their lookups. An invalidation also leaves a revocation marker there for the TTL,
+    every hit (local or shared) checks it: the other workers stop trusting their copy at once.
+    """
+
+    def __init__(self, max_size=10000, ttl=300, shared_cache=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = caches[shared_cache] if shared_cache else None
+        self._entries = OrderedDict()  # key -> (user, expires_at)
+        self._keys_by_user = {}        # user id -> set of keys, to invalidate a user without a scan.
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                user, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                else:
+                    self._evict(key)
+                    entry = None
+        if entry is not None:
+            if self.shared is not None and self.shared.get(REVOKED_KEY_PREFIX + key):
+                # invalidated by another worker.
+                with self._lock:
+                    self._evict(key)
+                return None
+            return copy.copy(user)
+        if self.shared is not None:
+            entries = self.shared.get_many([SHARED_KEY_PREFIX + key, REVOKED_KEY_PREFIX + key])
+            entry = entries.get(SHARED_KEY_PREFIX + key)
+            if entry is not None and REVOKED_KEY_PREFIX + key not in entries:
+                user, deadline = entry
+                ttl = deadline - time.time()
+                if ttl > 0:
+                    self._store(key, user, ttl)
+                    return copy.copy(user)
+        return None
+
+    def set(self, key, user, expires_at=None):
+        # an entry never outlives the token it was cached for.
+        ttl = self.ttl
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - timezone.now()).total_seconds())
+            if ttl <= 0:
+                return
+        self._store(key, user, ttl)
+        if self.shared is not None:
+            # with its deadline, the other workers don't restart the ttl when they copy it.
+            self.shared.set(SHARED_KEY_PREFIX + key, (user, time.time() + ttl), math.ceil(ttl))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._evict(key)
+        if self.shared is not None:
+            self.shared.delete(SHARED_KEY_PREFIX + key)
+            # no copy of the entry outlives the ttl, neither does the marker.
+            self.shared.set(REVOKED_KEY_PREFIX + key, True, math.ceil(self.ttl))
+
+    def invalidate_user(self, user_id, keys=()):
+        # keys are the user's tokens in the database, other workers may have cached them in the shared level.
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._evict(key)
+        if self.shared is not None and keys:
+            self.shared.delete_many([SHARED_KEY_PREFIX + key for key in keys])
+            self.shared.set_many({REVOKED_KEY_PREFIX + key: True for key in keys}, math.ceil(self.ttl))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _store(self, key, user, ttl):
+        with self._lock:
+            self._evict(key)
+            self._entries[key] = (user, time.monotonic() + ttl)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._evict(next(iter(self._entries)))
+
+    # must be called with the lock held.
+    def _evict(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_keys = self._keys_by_user.get(entry[0].pk)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[entry[0].pk]
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                config = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+                _token_cache = TokenCache(
+                    max_size=config.get('MAX_SIZE', 10000),
+                    ttl=config.get('TTL', 300),
+                    shared_cache=config.get('SHARED_CACHE'),
+                )
+    return _token_cache
+
+
+def _refresh(token):
+    """
+    Sliding expiration: (new expires_at, threshold) when the token was refreshed more than
+    REFRESH_INTERVAL ago, (None, threshold) when it is recent enough (no write).
+    """
+    config = settings.AUTH_TOKENS
+    now = timezone.now()
+    lifetime = timedelta(seconds=config['LIFETIME'])
+    stale = now + lifetime - timedelta(seconds=config['REFRESH_INTERVAL'])
+    if token.expires_at >= stale:
+        return None, stale
+    return now + lifetime, stale
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement of DRF TokenAuthentication on the expiring authentication.AuthToken.
+    A cache hit authenticates the request without touching the database,
+    a miss falls back to the usual AuthToken join User query, slides the token's
+    expiration when due and fills the cache (until the token expires at the latest).
+    """
+    model = AuthToken
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        user = token_cache.get(key)
+        if user is not None:
+            # rebuild the token from the cache instead of fetching it back.
+            token = AuthToken(key=key, user=user)
+            token._state.adding = False
+            return (user, token)
+        token = self.get_token(key)
+        self.check_token(token)
+        expires_at, stale = _refresh(token)
+        if expires_at is not None:
+            # conditional, the concurrent requests of a token write it once.
+            AuthToken.objects.filter(key=key, expires_at__lt=stale).update(expires_at=expires_at)
+            token.expires_at = expires_at
+        token_cache.set(key, token.user, token.expires_at)
+        return (token.user, token)
+
+    def check_token(self, token):
+        if token.is_expired:
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+    def get_token(self, key):
+        queryset = AuthToken.objects.select_related('user')
+        try:
+            return queryset.get(key=key)
+        except AuthToken.DoesNotExist:
+            pass
+        # a token created by a login a moment ago may not be replicated yet.
+        if reading_from_replica():
+            try:
+                return queryset.using(DEFAULT_DB_ALIAS).get(key=key)
+            except AuthToken.DoesNotExist:
+                pass
+        raise exceptions.AuthenticationFailed('Invalid token.')
+
+    # async path used by the ASGI views, same checks as DRF's authenticate() on a plain django request.
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header. Token string should not contain invalid characters.')
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        user = token_cache.get(key)
+        if user is not None:
+            token = AuthToken(key=key, user=user)
+            token._state.adding = False
+            return (user, token)
+        token = await self.aget_token(key)
+        self.check_token(token)
+        expires_at, stale = _refresh(token)
+        if expires_at is not None:
+            await AuthToken.objects.filter(key=key, expires_at__lt=stale).aupdate(expires_at=expires_at)
+            token.expires_at = expires_at
+        token_cache.set(key, token.user, token.expires_at)
+        return (token.user, token)
+
+    async def aget_token(self, key):
+        queryset = AuthToken.objects.select_related('user')
+        try:
+            return await queryset.aget(key=key)
+        except AuthToken.DoesNotExist:
+            pass
+        if reading_from_replica():
+            try:
+                return await queryset.using(DEFAULT_DB_ALIAS).aget(key=key)
+            except AuthToken.DoesNotExist:
+                pass
+        raise exceptions.AuthenticationFailed('Invalid token.')
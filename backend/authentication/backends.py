@@ -0,0 +1,27 @@
+from django.contrib.auth.backends import ModelBackend as DjangoModelBackend
+from django.contrib.auth import get_user_model
+from . import hashing
+
+UserModel = get_user_model()
+
+
+class ModelBackend(DjangoModelBackend):
+    """
+    Django's ModelBackend whose async path never hashes on the event loop:
+    django's aauthenticate hashes an unknown user's password synchronously.
+    """
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the hasher once anyway to reduce the timing difference with an existing user.
+            await hashing.amake_password(password)
+            return None
+        if await user.acheck_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
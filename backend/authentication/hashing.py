@@ -0,0 +1,135 @@
+"""
+Password hashing for the login and registration paths.
+
+The cost is configured per environment with settings.PASSWORD_HASHING and the
+hashes are computed in a bounded process pool, so a login burst queues on the
+pool instead of pinning every request worker's CPU.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ConfigurablePBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    pbkdf2_sha256 with the iteration count taken from settings.PASSWORD_HASHING['ITERATIONS'].
+    It keeps the algorithm name, so existing hashes verify and get re-encoded
+    with the configured cost on the next successful login (must_update).
+    """
+
+    @property
+    def iterations(self):
+        if _worker_iterations is not None:
+            return _worker_iterations
+        return get_config()['ITERATIONS'] or hashers.PBKDF2PasswordHasher.iterations
+
+
+def get_config():
+    config = {'ITERATIONS': None, 'OFFLOAD': True, 'POOL_SIZE': None, 'MAX_PENDING': None}
+    config.update(getattr(settings, 'PASSWORD_HASHING', {}))
+    config['POOL_SIZE'] = config['POOL_SIZE'] or os.cpu_count() or 1
+    config['MAX_PENDING'] = config['MAX_PENDING'] or config['POOL_SIZE'] * 4
+    return config
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+_worker_iterations = None
+
+
+# the pool workers hash with the cost the pool was started with, whatever their own settings say.
+def _init_worker(iterations):
+    global _worker_iterations
+    _worker_iterations = iterations
+
+
+def _get_pool():
+    global _pool, _slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = get_config()
+                # forkserver children don't inherit the threads and sockets of the server process.
+                _pool = ProcessPoolExecutor(
+                    max_workers=config['POOL_SIZE'],
+                    mp_context=multiprocessing.get_context('forkserver'),
+                    initializer=_init_worker,
+                    initargs=(ConfigurablePBKDF2PasswordHasher().iterations,),
+                )
+                # bounds the pending hashes, callers wait for a slot instead of growing the queue.
+                _slots = threading.BoundedSemaphore(config['MAX_PENDING'])
+    return _pool, _slots
+
+
+def shutdown_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+        _slots = None
+
+
+def _submit(func, *args):
+    pool, slots = _get_pool()
+    slots.acquire()
+    try:
+        future = pool.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+async def _asubmit(func, *args):
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        # the pool is saturated, wait for a slot without blocking the event loop.
+        await asyncio.to_thread(slots.acquire)
+    try:
+        future = pool.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def make_password(password):
+    if not get_config()['OFFLOAD']:
+        return hashers.make_password(password)
+    return _submit(hashers.make_password, password).result()
+
+
+def check_password(password, encoded):
+    if not get_config()['OFFLOAD'] or not hashers.is_password_usable(encoded):
+        return hashers.check_password(password, encoded)
+    return _submit(hashers.check_password, password, encoded).result()
+
+
+async def amake_password(password):
+    if not get_config()['OFFLOAD']:
+        return hashers.make_password(password)
+    return await _asubmit(hashers.make_password, password)
+
+
+async def acheck_password(password, encoded):
+    if not get_config()['OFFLOAD'] or not hashers.is_password_usable(encoded):
+        return hashers.check_password(password, encoded)
+    return await _asubmit(hashers.check_password, password, encoded)
+
+
+def must_update(encoded):
+    """True when the stored hash doesn't use the preferred hasher or its configured cost."""
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = hashers.get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from authentication.models import AuthToken
+
+
+class Command(BaseCommand):
+    help = "Delete the expired auth tokens, in small transactions so the table is never locked for long."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--chunk-size', type=int, default=1000, help="tokens deleted per transaction")
+        parser.add_argument('--sleep', type=float, default=0, help="seconds between two chunks, to leave room to the api")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        chunk_size = options['chunk_size']
+        now = timezone.now()
+        expired = AuthToken.objects.using(using).filter(expires_at__lte=now)
+        deleted = 0
+        while True:
+            # walk the expires_at index, each chunk is a primary key lookup.
+            keys = list(expired.order_by('expires_at').values_list('key', flat=True)[:chunk_size])
+            if not keys:
+                break
+            with transaction.atomic(using=using):
+                # delete() sends the post_delete that clears the token cache (authentication/signals.py).
+                deleted += expired.filter(key__in=keys).delete()[0]
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} expired tokens deleted."))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:52
+
+from datetime import timedelta
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# the tokens of rest_framework.authtoken keep working, they start their lifetime now.
+def copy_authtoken_tokens(apps, schema_editor):
+    Token = apps.get_model('authtoken', 'Token')
+    AuthToken = apps.get_model('authentication', 'AuthToken')
+    using = schema_editor.connection.alias
+    expires_at = timezone.now() + timedelta(seconds=settings.AUTH_TOKENS['LIFETIME'])
+    tokens = Token.objects.using(using).values_list('key', 'user_id')
+    AuthToken.objects.using(using).bulk_create(
+        [AuthToken(key=key, user_id=user_id, expires_at=expires_at) for key, user_id in tokens],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_user_manager'),
+        ('authtoken', '0004_alter_tokenproxy_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('key', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='auth_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(copy_authtoken_tokens, migrations.RunPython.noop),
+    ]
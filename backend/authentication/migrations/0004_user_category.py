@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 0004-0006 replace field_of_work by a categories.Category foreign key, see services 0006-0008.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_auth_token'),
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='categories.category'),
+        ),
+    ]
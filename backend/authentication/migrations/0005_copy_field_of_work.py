@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations
+
+ALIASES = {'House Keeping': 'Housekeeping'}
+
+
+def copy_categories(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    using = schema_editor.connection.alias
+    users = apps.get_model('authentication', 'User').objects.using(using).exclude(field_of_work__isnull=True).exclude(field_of_work='')
+    for name in users.order_by().values_list('field_of_work', flat=True).distinct():
+        category, _ = Category.objects.using(using).get_or_create(name=ALIASES.get(name, name))
+        users.filter(field_of_work=name).update(category=category)
+
+
+def copy_names(apps, schema_editor):
+    using = schema_editor.connection.alias
+    users = apps.get_model('authentication', 'User').objects.using(using).exclude(category__isnull=True)
+    for category_id, name in users.order_by().values_list('category_id', 'category__name').distinct():
+        users.filter(category_id=category_id).update(field_of_work=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0004_user_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_categories, copy_names),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_copy_field_of_work'),
+        ('categories', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='field_of_work',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='category',
+            new_name='field_of_work',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='field_of_work',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='companies', to='categories.category'),
+        ),
+    ]
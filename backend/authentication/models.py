@@ -1,6 +1,36 @@
+import secrets
+from asgiref.sync import sync_to_async
+from datetime import timedelta
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager as DjangoUserManager
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from categories import registry as categories
+from categories.models import Category
+from . import hashing
+
+class UserManager(DjangoUserManager):
+    # create_user hashes with django's make_password, route it through authentication.hashing instead.
+    def _create_user_object(self, username, email, password, **extra_fields):
+        user = super()._create_user_object(username, email, None, **extra_fields)
+        if password is not None:
+            user.password = hashing.make_password(password)
+        return user
+
+    # validate_unique=False when the caller already checked email and username (the registration serializers).
+    def _create_user(self, username, email, password, validate_unique=True, **extra_fields):
+        user = self._create_user_object(username, email, password, **extra_fields)
+        user.save(using=self._db, validate_unique=validate_unique)
+        return user
+
+    async def _acreate_user(self, username, email, password, validate_unique=True, **extra_fields):
+        user = super()._create_user_object(username, email, None, **extra_fields)
+        if password is not None:
+            user.password = await hashing.amake_password(password)
+        await user.asave(using=self._db, validate_unique=validate_unique)
+        return user
+
 
 class User(AbstractUser):
 
@@ -9,21 +39,6 @@ class User(AbstractUser):
         ('company', 'Company')
     )
 
-    FIELD_OF_WORK_CHOICES = (
-        ('Air Conditioner', 'Air Conditioner'),
-        ('All in One', 'All in One'),
-        ('Carpentry', 'Carpentry'),
-        ('Electricity', 'Electricity'),
-        ('Gardening', 'Gardening'),
-        ('Home Machines', 'Home Machines'),
-        ('Housekeeping', 'Housekeeping'),
-        ('Interior Design', 'Interior Design'),
-        ('Locks', 'Locks'),
-        ('Painting', 'Painting'),
-        ('Plumbing', 'Plumbing'),
-        ('Water Heaters', 'Water Heaters'),
-    )
-
     email = models.EmailField(unique=True)
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
     # Costumer specific field.
@@ -31,13 +46,22 @@ class User(AbstractUser):
 
 
     # Company specfic field.
-    field_of_work = models.CharField(
-        max_length=20,
-        choices=FIELD_OF_WORK_CHOICES,
+    field_of_work = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        related_name='companies',
         null=True,
         blank=True
     )
 
+    objects = UserManager()
+
+    class Meta(AbstractUser.Meta):
+        # the incremental user exports walk it (backend/exporting.py).
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='user_date_joined_id_idx'),
+        ]
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
@@ -45,13 +69,54 @@ class User(AbstractUser):
         super().clean()
         if self.user_type == 'costumer' and not  self.date_of_birth:
             raise ValidationError('Date of birth is required.')
-        if self.user_type == 'company' and not self.field_of_work:
+        if self.user_type == 'company' and self.field_of_work_id is None:
             raise ValidationError("Field of work is required.")
 
-    def save(self, *args, **kwargs):
-        self.full_clean()
+    # hashing runs in the bounded pool of authentication.hashing instead of the request worker.
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        valid = hashing.check_password(raw_password, self.password)
+        if valid and hashing.must_update(self.password):
+            # transparent upgrade to the configured cost on a successful login.
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        return valid
+
+    async def acheck_password(self, raw_password):
+        valid = await hashing.acheck_password(raw_password, self.password)
+        if valid and hashing.must_update(self.password):
+            self.password = await hashing.amake_password(raw_password)
+            await self.asave(update_fields=['password'])
+        return valid
+
+    def save(self, *args, validate_unique=True, **kwargs):
+        """
+        full_clean() then save. The unique checks cost a query per unique field:
+        validate_unique=False skips them when they already ran (a serializer's UniqueValidators),
+        and an update_fields save (password upgrade, last_login...) only validates the fields it writes.
+        The unique indexes still reject a duplicate that races the checks.
+        """
+        update_fields = kwargs.get('update_fields')
+        exclude = None
+        if update_fields is not None:
+            updated = set(update_fields)
+            exclude = {
+                field.name for field in self._meta.concrete_fields
+                if field.name not in updated and field.attname not in updated
+            }
+        if categories.get(self.field_of_work_id) is not None:
+            # a known category needs no existence query, the foreign key still guards the column.
+            exclude = {*(exclude or ()), 'field_of_work'}
+        self.full_clean(exclude=exclude, validate_unique=validate_unique)
         super().save(*args, **kwargs)
 
+    async def asave(self, *args, validate_unique=True, **kwargs):
+        await sync_to_async(self.save)(*args, validate_unique=validate_unique, **kwargs)
+
     def __str__(self):
         return self.email
     
@@ -61,4 +126,46 @@ class User(AbstractUser):
 
     def get_is_company(self, obj):
         return obj.user_type == 'company'
-    
\ No newline at end of file
+
+
+def token_lifetime():
+    return timedelta(seconds=settings.AUTH_TOKENS['LIFETIME'])
+
+
+class AuthTokenManager(models.Manager):
+    # one token per login, so every device of a user has its own and logs out alone.
+    def issue(self, user):
+        return self.create(user=user, expires_at=timezone.now() + token_lifetime())
+
+    async def aissue(self, user):
+        return await self.acreate(user=user, expires_at=timezone.now() + token_lifetime())
+
+
+class AuthToken(models.Model):
+    """
+    Expiring API token, several per user (one per device).
+    expires_at slides forward while the token is used, at most once per REFRESH_INTERVAL
+    (see authentication.authentication), and purge_expired_tokens deletes the expired ones.
+    """
+    key = models.CharField(max_length=40, primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='auth_tokens')
+    created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = AuthTokenManager()
+
+    def save(self, *args, **kwargs):
+        if not self.key:
+            self.key = self.generate_key()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def generate_key(cls):
+        return secrets.token_hex(20)
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= timezone.now()
+
+    def __str__(self):
+        return self.key
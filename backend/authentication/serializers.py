@@ -1,12 +1,18 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from backend.fast_serializers import ValuesSerializer
+from categories.fields import CategoryField
 from .models import User
 import datetime
+import logging
+
+logger = logging.getLogger(__name__)
 
 # general user serializer:
 class UserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only= True)
+    field_of_work = CategoryField(required=False, allow_null=True)
     class Meta:
         model = User
         fields = ['id', 'email', 'password', 'username', 'date_of_birth', 'user_type', 'field_of_work', 'date_joined']
@@ -14,13 +20,30 @@ class UserSerializer(serializers.ModelSerializer):
 # TODO: Studying the serialyzer documentation when having the internet.
     def to_representation(self, instance):
         data = super().to_representation(instance)
-        print(f"debug representational data: {data}")
+        logger.debug("user representation: %s", data)
         if instance.user_type == 'costumer':
             data.pop('field_of_work', None)
         elif instance.user_type == 'company':
             data.pop('birth_date', None)
         return data
+
+
+# same output as UserSerializer, for the login/authenticate responses.
+class UserValuesSerializer(ValuesSerializer):
+    serializer_class = UserSerializer
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        user_type = instance['user_type'] if isinstance(instance, dict) else instance.user_type
+        if user_type == 'costumer':
+            data.pop('field_of_work', None)
+        return data
     
+# every column for every user (a CSV export has one header), for backend/exporting.py.
+class UserExportSerializer(ValuesSerializer):
+    serializer_class = UserSerializer
+
+
 # login user serializer:
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -63,42 +86,54 @@ class CostumerRegistrationSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError("You must be at least 18 years old to register.")
         return attrs
 
+    # is_valid() already ran the unique validators of email and username.
     def create(self, validated_data):
+        return User.objects.create_user(**self.get_user_fields(validated_data), validate_unique=False)
+
+    async def acreate(self, validated_data):
+        return await User.objects.acreate_user(**self.get_user_fields(validated_data), validate_unique=False)
+
+    def get_user_fields(self, validated_data):
         validated_data.pop('password_confirm')  # you had a typo 'passwor_confirm'
-        user = User.objects.create_user(
+        return dict(
             email=validated_data['email'],
             username=validated_data['username'],
             password=validated_data['password'],
             user_type=validated_data['user_type'],
             date_of_birth=validated_data['date_of_birth']
         )
-        return user
 
 
 class CompanyRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
+    # the categories are in the Category table.
+    field_of_work = CategoryField(required=False, allow_null=True)
 
-    # field_of_work choices are in the model.
     class Meta:
         model = User
         fields = ('email', 'username', 'field_of_work', 'password', 'password_confirm', 'user_type')
 
     def validate(self, data):
-        print(f"the data in the company serializer is: {data}")
+        logger.debug("validating the company registration of %s", data.get('email'))
         if data['password'] != data['password_confirm']:
             raise serializers.ValidationError("Password confirmation doesn't match")
         return data
     
     def create(self, valid_data):
-        
+        return User.objects.create_user(**self.get_user_fields(valid_data), validate_unique=False)
+
+    async def acreate(self, valid_data):
+        return await User.objects.acreate_user(**self.get_user_fields(valid_data), validate_unique=False)
+
+    def get_user_fields(self, valid_data):
         valid_data.pop('password_confirm')
-        print(f"the valid data in the company serializer is: {valid_data}")
-        user = User.objects.create_user(
+        logger.debug("creating the company %s", valid_data['email'])
+        return dict(
             email=valid_data['email'],
             username=valid_data['username'],
             password=valid_data['password'],
             user_type=valid_data['user_type'],
             field_of_work=valid_data['field_of_work']
         )
-        return user
+
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .authentication import get_token_cache
+from .models import AuthToken, User
+
+
+# logout deletes the token, the cached entry must go with it.
+@receiver(post_delete, sender=AuthToken)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    get_token_cache().invalidate(instance.key)
+
+
+# a deactivated user must not stay authenticated until the cache entry expires.
+@receiver(post_save, sender=User)
+def invalidate_deactivated_user(sender, instance, created, **kwargs):
+    if created or instance.is_active:
+        return
+    keys = list(AuthToken.objects.filter(user=instance).values_list('key', flat=True))
+    get_token_cache().invalidate_user(instance.pk, keys)
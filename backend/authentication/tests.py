@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from backend import throttling
+from backend.testing import PASSWORD_HASHING, api_mode, get_content
+from categories import registry as categories
+from .authentication import TokenCache, get_token_cache
+from .models import AuthToken, User
+
+PASSWORD = 'BenDoe123!'
+
+
+@override_settings(PASSWORD_HASHING=PASSWORD_HASHING, THROTTLING={'ENABLED': False, 'RATES': {}})
+class UserQueriesTests(TestCase):
+    """Queries of the login/registration paths, User.save() validates without the redundant unique checks."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='costumer@example.com', username='costumer', password=PASSWORD,
+            user_type='costumer', date_of_birth='1990-01-01'
+        )
+
+    def post(self, path, data):
+        return self.client.post(path, json.dumps(data), content_type='application/json')
+
+    def test_login(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                # the user, then the token insert.
+                with self.assertNumQueries(2):
+                    response = self.post('/authentication/login/', {'email': self.user.email, 'password': PASSWORD})
+                self.assertEqual(response.status_code, 200, response.content)
+
+    def test_costumer_registration(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                # the email and username unique validators, the user insert, the token insert.
+                with self.assertNumQueries(4):
+                    response = self.post('/authentication/register_costumer/', {
+                        'email': f'{mode}@example.com', 'username': f'{mode}-costumer', 'date_of_birth': '1990-01-01',
+                        'password': PASSWORD, 'password_confirm': PASSWORD, 'user_type': 'costumer',
+                    })
+                self.assertEqual(response.status_code, 200, response.content)
+
+    def test_company_registration(self):
+        categories.load()  # the category names are mapped from memory.
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                with self.assertNumQueries(4):
+                    response = self.post('/authentication/register_company/', {
+                        'email': f'{mode}-company@example.com', 'username': f'{mode}-company',
+                        'field_of_work': 'Plumbing', 'password': PASSWORD, 'password_confirm': PASSWORD,
+                        'user_type': 'company',
+                    })
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertEqual(User.objects.get(username=f'{mode}-company').field_of_work.name, 'Plumbing')
+
+    def test_update_fields_save(self):
+        # no unique check for the fields the save doesn't write.
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_duplicate_email_rejected(self):
+        response = self.post('/authentication/register_costumer/', {
+            'email': self.user.email, 'username': 'other', 'date_of_birth': '1990-01-01',
+            'password': PASSWORD, 'password_confirm': PASSWORD, 'user_type': 'costumer',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('email', response.json())
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class SharedTokenCacheTests(TestCase):
+    """Two workers: their own TokenCache, one shared django cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='costumer@example.com', username='costumer', password=PASSWORD,
+            user_type='costumer', date_of_birth='1990-01-01'
+        )
+        self.key = AuthToken.objects.issue(self.user).key
+        self.workers = [TokenCache(shared_cache='default'), TokenCache(shared_cache='default')]
+
+    def request(self, worker, method, path):
+        with mock.patch('authentication.authentication._token_cache', self.workers[worker]):
+            return getattr(self.client, method)(path, headers={'Authorization': f'Token {self.key}'})
+
+    def test_logout_reaches_the_other_workers(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                self.key = AuthToken.objects.issue(self.user).key
+                # both workers have the token in their local level.
+                self.assertEqual(self.request(0, 'get', '/authentication/authenticate/').status_code, 200)
+                self.assertEqual(self.request(1, 'get', '/authentication/authenticate/').status_code, 200)
+                self.assertEqual(self.request(0, 'post', '/authentication/logout/').status_code, 200)
+                self.assertEqual(self.request(1, 'get', '/authentication/authenticate/').status_code, 401)
+
+    def test_deactivation_reaches_the_other_workers(self):
+        self.assertEqual(self.request(1, 'get', '/authentication/authenticate/').status_code, 200)
+        with mock.patch('authentication.authentication._token_cache', self.workers[0]):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.request(1, 'get', '/authentication/authenticate/').status_code, 401)
+
+
+@override_settings(PASSWORD_HASHING=PASSWORD_HASHING, THROTTLING={
+    'ENABLED': True, 'RATES': {'login': {'ip': '4/min', 'email': '2/min'}, 'register': {'ip': '2/hour'}},
+})
+class ThrottlingTests(TestCase):
+
+    def setUp(self):
+        throttling.get_buckets().clear()
+
+    def post(self, path, data, ip='10.0.0.1'):
+        return self.client.post(path, json.dumps(data), content_type='application/json', REMOTE_ADDR=ip)
+
+    def login(self, email, ip='10.0.0.1'):
+        return self.post('/authentication/login/', {'email': email, 'password': PASSWORD}, ip)
+
+    def assertThrottled(self, response, retry_after):
+        self.assertEqual(response.status_code, 429, response.content)
+        self.assertEqual(response['Retry-After'], retry_after)
+
+    def test_login(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                throttling.get_buckets().clear()
+                self.assertNotEqual(self.login('a@example.com').status_code, 429)
+                self.assertNotEqual(self.login('A@example.com ').status_code, 429)
+                # the email's bucket (2/min, one more every 30s), from any ip.
+                self.assertThrottled(self.login('a@example.com'), '30')
+                self.assertThrottled(self.login('a@example.com', ip='10.0.0.2'), '30')
+                # another email, the ip still has one request left (4/min, one more every 15s).
+                self.assertNotEqual(self.login('b@example.com').status_code, 429)
+                self.assertThrottled(self.login('c@example.com'), '15')
+                self.assertNotEqual(self.login('c@example.com', ip='10.0.0.2').status_code, 429)
+
+    def test_register(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                throttling.get_buckets().clear()
+                for _ in range(2):
+                    self.assertNotEqual(self.post('/authentication/register_costumer/', {}).status_code, 429)
+                # 2/hour, one more every 30 minutes.
+                self.assertThrottled(self.post('/authentication/register_company/', {}), '1800')
+                self.assertNotEqual(self.post('/authentication/register_costumer/', {}, ip='10.0.0.2').status_code, 429)
+
+    def test_shared_cache_fails_open(self):
+        buckets = throttling.TokenBuckets(shared_cache='default')
+        buckets.shared = mock.Mock()
+        buckets.shared._cache.get_client.side_effect = ConnectionError('redis is down')
+        with self.assertLogs('backend.throttling', 'WARNING'):
+            self.assertEqual(buckets.consume('login:ip:x', 2, 1 / 30), 0)
+        self.assertEqual(buckets.consume('login:ip:x', 2, 1 / 30), 0)
+        # the local bucket still applies.
+        self.assertGreater(buckets.consume('login:ip:x', 2, 1 / 30), 0)
+
+
+class PurgeExpiredTokensTests(TestCase):
+
+    def test_purge(self):
+        user = User.objects.create_user(
+            email='costumer@example.com', username='costumer', password=PASSWORD,
+            user_type='costumer', date_of_birth='1990-01-01'
+        )
+        expired = [AuthToken.objects.issue(user) for _ in range(5)]
+        alive = AuthToken.objects.issue(user)
+        AuthToken.objects.filter(pk__in=[token.pk for token in expired]).update(expires_at=timezone.now() - timedelta(seconds=1))
+        for token in expired:
+            get_token_cache().set(token.key, user)
+        out = io.StringIO()
+        call_command('purge_expired_tokens', chunk_size=2, stdout=out)
+        self.assertIn('5 expired tokens deleted.', out.getvalue())
+        self.assertEqual(list(AuthToken.objects.values_list('key', flat=True)), [alive.key])
+        # the post_delete receiver cleared them from the token cache.
+        self.assertEqual([get_token_cache().get(token.key) for token in expired], [None] * 5)
+
+
+@override_settings(PASSWORD_HASHING=PASSWORD_HASHING, THROTTLING={'ENABLED': False, 'RATES': {}})
+class UserExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        cls.staff = User.objects.create_user(
+            email='staff@example.com', username='staff', password=PASSWORD, user_type='costumer',
+            date_of_birth='1990-01-01', is_staff=True
+        )
+        cls.company = User.objects.create_user(
+            email='company@example.com', username='company', password=PASSWORD, user_type='company',
+            field_of_work=categories.get_by_name('Plumbing')
+        )
+        # joined before the default until of the export.
+        User.objects.update(date_joined=timezone.now() - timedelta(hours=1))
+        cls.tokens = {user.username: AuthToken.objects.issue(user).key for user in (cls.staff, cls.company)}
+
+    def export(self, username, **params):
+        return get_content(self, '/authentication/export/', params, headers={'Authorization': f'Token {self.tokens[username]}'})
+
+    def test_no_password(self):
+        hashes = [encoded.encode() for encoded in User.objects.values_list('password', flat=True)]
+        for mode in ('sync', 'async'):
+            for output in ('csv', 'ndjson', 'json'):
+                with self.subTest(mode=mode, output=output), api_mode(mode):
+                    response, content = self.export('staff', output=output)
+                    self.assertEqual(response.status_code, 200, content)
+                    self.assertEqual(content.count(b'@example.com'), 2)
+                    self.assertNotIn(b'password', content)
+                    for encoded in hashes:
+                        self.assertNotIn(encoded, content)
+                    if output == 'csv':
+                        self.assertNotIn('password', csv.DictReader(io.StringIO(content.decode())).fieldnames)
+
+    def test_staff_only(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                response, content = self.export('company')
+                self.assertEqual(response.status_code, 403, content)
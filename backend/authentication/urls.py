@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# same urls, served by the async (ASGI-native) views when API_MODE is 'async'.
+if settings.API_MODE == 'async':
+    from . import async_views as views
+
 
 urlpatterns = [
     path('register_costumer/', views.costumer_register_view, name='register_costumer'),
@@ -8,5 +13,6 @@ urlpatterns = [
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('authenticate/', views.authenticate_view, name='authenticate'),
+    path('export/', views.export_users_view, name='export_users'),
    # add profile and update profile paths later.
 ]
\ No newline at end of file
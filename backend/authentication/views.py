@@ -1,16 +1,20 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import (
-    UserSerializer,
-    LoginSerializer,
-    CompanyRegistrationSerializer,
-    CostumerRegistrationSerializer
-)
+from .models import AuthToken, User
 # from django.contrib.auth import authenticate, login, logout, get_user_model
-from rest_framework.authtoken.models import Token
+import logging
+from backend.routers import read_replica
+from backend.throttling import LoginThrottle, RegisterThrottle
+from backend import exporting
+from django.db import router
+
+logger = logging.getLogger(__name__)
+
+# the serializers (password validation, categories...) are imported by the views using them,
+# on their first request: a worker starts without them.
 # from django.contrib.auth import get_user_model
 
 # Customer = get_user_model()  # this will get the custom user model to help with authentication and token generation and database operations.
@@ -19,6 +23,7 @@ from rest_framework.authtoken.models import Token
 #------------
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login_view(request):
     """
     Login API endpoint
@@ -28,14 +33,15 @@ def login_view(request):
         "password": "password13"
     }
     """
+    from .serializers import LoginSerializer, UserValuesSerializer
     serialized_user = LoginSerializer(data=request.data)
     if serialized_user.is_valid():
         user = serialized_user.validated_data['user']
-        token, _ = Token.objects.get_or_create(user=user)
+        token = AuthToken.objects.issue(user)
         return Response(
             {
                 'token': token.key,
-                'user': UserSerializer(user).data,  # serialized user
+                'user': UserValuesSerializer(user).data,  # serialized user
                 'message': "Login successful"
             },
             status=status.HTTP_200_OK
@@ -52,9 +58,10 @@ def logout_view(request):
     Logout API endpoint
     POST /auth/logout
     Headers: Authorization: Token your_token_here
+    Only the token of the request is deleted, the other devices stay logged in.
     '''
     try:
-        request.user.auth_token.delete()
+        request.auth.delete()
         return Response({'message': 'Logged out successfully'}, status=status.HTTP_200_OK)
     except:
         return Response({'error': 'Error logging out'}, status=status.HTTP_400_BAD_REQUEST)
@@ -66,6 +73,7 @@ def logout_view(request):
 # ====> Costumer:
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 @csrf_exempt
 def costumer_register_view(request):
     """
@@ -79,25 +87,26 @@ def costumer_register_view(request):
         "password_confirm": "password123"
     }
     """
+    from .serializers import CostumerRegistrationSerializer, UserValuesSerializer
     costumer_serializer = CostumerRegistrationSerializer(data=request.data)
     if costumer_serializer.is_valid():
         user = costumer_serializer.save()
-        print
-        token, _ = Token.objects.get_or_create(user=user)
+        token = AuthToken.objects.issue(user)
         return Response(
             {
                 "token": token.key,
-                "user": UserSerializer(user).data,
+                "user": UserValuesSerializer(user).data,
                 'messsage': 'Costumer registration successful'
             },
             status=status.HTTP_200_OK
         )
-    print(f"error durring serialization: {costumer_serializer.errors}")
+    logger.info("costumer registration rejected", extra={'errors': costumer_serializer.errors})
     return Response(costumer_serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # ====> Company:
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 @csrf_exempt
 def company_register_view(request):
     """
@@ -111,15 +120,16 @@ def company_register_view(request):
         "password_confirm": "password123"
     }
     """
+    from .serializers import CompanyRegistrationSerializer, UserValuesSerializer
     serialized_company = CompanyRegistrationSerializer(data=request.data)
     if serialized_company.is_valid():
         user = serialized_company.save()
-        token, _ = Token.objects.get_or_create(user=user)
-        print(f"the new created company is: {user}")
+        token = AuthToken.objects.issue(user)
+        logger.info("company registered", extra={'user_id': user.pk})
         return Response(
             {
                 'token': token.key,
-                'user': UserSerializer(user).data,
+                'user': UserValuesSerializer(user).data,
                 'message': "Company registration successful"
             },
             status=status.HTTP_200_OK
@@ -127,9 +137,29 @@ def company_register_view(request):
     return Response(serialized_company.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Authenticate the session:
+@read_replica
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def authenticate_view(request):
+    from .serializers import UserValuesSerializer
     user = request.user
-    serializer = UserSerializer(user)
+    serializer = UserValuesSerializer(user)
     return Response(serializer.data)
+
+# Export the users:
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_users_view(request):
+    """
+    User export API endpoint (staff, for the analytics jobs)
+    GET /authentication/export/?output=csv|ndjson|json&since=2026-01-01T00:00:00Z&until=...
+    Streams the users who joined in [since, until), oldest first, in constant memory, no password.
+    The X-Export-Until header is the since of the next incremental export.
+    """
+    params = exporting.ExportParamsSerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return exporting.streaming_response(
+        exporting.get_exports()['users'], params.validated_data, using=router.db_for_read(User)
+    )
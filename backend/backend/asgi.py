@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# the category names are served from memory (categories/registry.py).
+from categories import registry  # noqa: E402
+registry.warm()
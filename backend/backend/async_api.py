@@ -0,0 +1,70 @@
+"""
+Helpers shared by the async (ASGI-native) views of the apps.
+They answer with the same payloads and status codes as the DRF views they mirror.
+"""
+import functools
+from rest_framework import exceptions, status
+from authentication.authentication import CachedTokenAuthentication
+from . import fast_json
+from .renderers import FastJSONResponse
+
+_authentication = CachedTokenAuthentication()
+
+
+class BadRequest(Exception):
+    def __init__(self, detail):
+        self.detail = detail
+
+
+def parse_json_body(request):
+    if not request.body:
+        return {}
+    try:
+        data = fast_json.loads(request.body)
+    except (ValueError, UnicodeDecodeError) as error:
+        raise BadRequest({'detail': f'JSON parse error - {error}'})
+    if not isinstance(data, dict):
+        raise BadRequest({'non_field_errors': ['Invalid data. Expected a dictionary.']})
+    return data
+
+
+def error_response(detail, status_code=status.HTTP_400_BAD_REQUEST):
+    return FastJSONResponse(detail, status=status_code)
+
+
+def unauthorized(detail='Authentication credentials were not provided.'):
+    response = FastJSONResponse({'detail': str(detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = _authentication.authenticate_header(None)
+    return response
+
+
+def staff_required(view):
+    """Async counterpart of IsAdminUser, put it below @token_required."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not request.user.is_staff:
+            return error_response(
+                {'detail': 'You do not have permission to perform this action.'}, status.HTTP_403_FORBIDDEN
+            )
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def aget_token_user(request):
+    """(user, token) of the request's Authorization header, None when there is none."""
+    return await _authentication.aauthenticate(request)
+
+
+def token_required(view):
+    """Async counterpart of IsAuthenticated with the token authentication."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            credentials = await aget_token_user(request)
+        except exceptions.AuthenticationFailed as error:
+            return unauthorized(error.detail)
+        if credentials is None:
+            return unauthorized()
+        request.user, request.auth = credentials
+        return await view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,84 @@
+"""
+Environment driven DATABASES profiles.
+
+    DB_ENGINE               sqlite (default, local work) or postgres
+    DB_NAME                 database name, the sqlite file path for sqlite
+    DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE         seconds a connection is kept between requests (default 60)
+    DB_POOL_MAX_SIZE        postgres: use a psycopg connection pool of this size instead of persistent connections
+    DB_PGBOUNCER            postgres: 1 when connecting through pgbouncer in transaction mode
+    DB_REPLICA_HOSTS        postgres: comma separated read replica hosts
+    DB_REPLICA              sqlite: 1 adds a query-only "replica" connection to the same file, a local stand-in
+"""
+import os
+
+
+def _env(name, default=None):
+    return os.environ.get(name) or default
+
+
+def sqlite_profile(base_dir):
+    """WAL journal so readers don't block on the writer, IMMEDIATE transactions so writers queue instead of deadlocking."""
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _env('DB_NAME', base_dir / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(_env('DB_CONN_MAX_AGE', 60)),
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=134217728;'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,  # seconds a writer waits for the lock.
+        },
+    }
+
+
+def postgres_profile():
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': _env('DB_NAME', 'backend'),
+        'USER': _env('DB_USER', 'postgres'),
+        'PASSWORD': _env('DB_PASSWORD', ''),
+        'HOST': _env('DB_HOST', 'localhost'),
+        'PORT': _env('DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(_env('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if _env('DB_POOL_MAX_SIZE'):
+        # the pool owns the connections, django refuses persistent connections on top of it.
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(_env('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(_env('DB_POOL_MAX_SIZE')),
+            'timeout': 10,
+        }
+    if _env('DB_PGBOUNCER') == '1':
+        # named cursors don't survive transaction pooling.
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return database
+
+
+def database_settings(base_dir):
+    """Returns the DATABASES setting, the read replicas are the aliases starting with 'replica'."""
+    if _env('DB_ENGINE', 'sqlite') == 'postgres':
+        default = postgres_profile()
+        hosts = [host.strip() for host in _env('DB_REPLICA_HOSTS', '').split(',') if host.strip()]
+        replicas = {
+            f'replica_{index}': dict(default, HOST=host, TEST={'MIRROR': 'default'})
+            for index, host in enumerate(hosts, start=1)
+        }
+    else:
+        default = sqlite_profile(base_dir)
+        replicas = {}
+        if _env('DB_REPLICA') == '1':
+            # any write routed to it fails, like on a real replica.
+            replicas['replica'] = dict(
+                default,
+                OPTIONS=dict(default['OPTIONS'], init_command='PRAGMA query_only=1;', transaction_mode=None),
+                TEST={'MIRROR': 'default'},
+            )
+    return {'default': default, **replicas}
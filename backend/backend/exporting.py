@@ -0,0 +1,175 @@
+"""
+Streaming exports of whole tables (services, users) for the analytics jobs, as CSV, NDJSON or a
+JSON array (rendered by backend.renderers.StreamingJSONRenderer).
+
+The rows are read with QuerySet.iterator(chunk_size) / aiterator() (a server-side cursor on
+postgres), serialized by the ValuesSerializer of the table and encoded one chunk at a time:
+the memory holds a chunk, whatever the size of the table.
+
+An export can be incremental: the rows whose watermark column (Service.created_at, which is
+also updated by every save, User.date_joined) is in [since, until). until is fixed when the
+export starts, a few seconds in the past so a row saved by a transaction still running can't
+be skipped for good, and is sent back (X-Export-Until header, the command's summary): passing
+it as the next since exports every row once.
+"""
+import csv
+import io
+from datetime import timedelta
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers
+from . import fast_json
+from .renderers import StreamingJSONRenderer, StreamingJSONResponse
+
+DEFAULT_CHUNK_SIZE = 2000
+WATERMARK_LAG = timedelta(seconds=5)
+
+
+class CSVEncoder:
+    content_type = 'text/csv; charset=utf-8'
+    extension = 'csv'
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def header(self):
+        return self._lines([self.columns])
+
+    def encode(self, rows):
+        return self._lines([row[column] for column in self.columns] for row in rows)
+
+    def _lines(self, lines):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(lines)  # None is written as an empty cell.
+        return buffer.getvalue().encode()
+
+
+class NDJSONEncoder:
+    content_type = 'application/x-ndjson'
+    extension = 'ndjson'
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def header(self):
+        return b''
+
+    def encode(self, rows):
+        return b''.join(fast_json.dumps(row) + b'\n' for row in rows)
+
+
+ENCODERS = {'csv': CSVEncoder, 'ndjson': NDJSONEncoder}
+# the json output is a single array, rendered chunk by chunk by the streaming renderer.
+OUTPUTS = [*ENCODERS, 'json']
+
+
+class Export:
+    """The rows of serializer_class's model, in watermark order."""
+
+    def __init__(self, name, serializer_class, watermark):
+        self.name = name
+        self.serializer_class = serializer_class
+        self.model = serializer_class.serializer_class.Meta.model
+        self.watermark = watermark
+
+    def default_until(self):
+        return timezone.now() - WATERMARK_LAG
+
+    def queryset(self, since=None, until=None, using=None):
+        queryset = self.model._default_manager.using(using)
+        if since is not None:
+            queryset = queryset.filter(**{f'{self.watermark}__gte': since})
+        if until is not None:
+            queryset = queryset.filter(**{f'{self.watermark}__lt': until})
+        # (watermark, id) indexes: the rows come out of the index, no sort of the table.
+        return queryset.order_by(self.watermark, 'pk').values(*self.serializer_class.value_fields())
+
+    def rows(self, since=None, until=None, using=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """The representations of the rows, one at a time."""
+        rows = self.queryset(since, until, using).iterator(chunk_size=chunk_size)
+        return self.serializer_class(rows, many=True).iter_data()
+
+    async def arows(self, since=None, until=None, using=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        serializer = self.serializer_class(None)
+        async for row in self.queryset(since, until, using).aiterator(chunk_size=chunk_size):
+            yield serializer.to_representation(row)
+
+    def stream(self, export_format, since=None, until=None, using=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """The encoded export, one bytes chunk per chunk_size rows."""
+        rows = self.rows(since, until, using, chunk_size)
+        if export_format == 'json':
+            yield from StreamingJSONRenderer().iter_render(rows)
+            return
+        encoder = ENCODERS[export_format](self.serializer_class.field_names())
+        yield encoder.header()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield encoder.encode(chunk)
+                chunk = []
+        if chunk:
+            yield encoder.encode(chunk)
+
+    async def astream(self, export_format, since=None, until=None, using=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        rows = self.arows(since, until, using, chunk_size)
+        if export_format == 'json':
+            async for part in StreamingJSONRenderer().aiter_render(rows):
+                yield part
+            return
+        encoder = ENCODERS[export_format](self.serializer_class.field_names())
+        yield encoder.header()
+        chunk = []
+        async for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield encoder.encode(chunk)
+                chunk = []
+        if chunk:
+            yield encoder.encode(chunk)
+
+
+def get_exports():
+    from authentication.serializers import UserExportSerializer
+    from services.serializers import ServiceValuesSerializer
+    return {
+        'services': Export('services', ServiceValuesSerializer, 'created_at'),
+        'users': Export('users', UserExportSerializer, 'date_joined'),
+    }
+
+
+# query parameters of the export endpoints (?format= is DRF's renderer override).
+class ExportParamsSerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=OUTPUTS, default='csv')
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        since = attrs.get('since')
+        until = attrs.get('until')
+        if since is not None and until is not None and since > until:
+            raise serializers.ValidationError("since can't be after until.")
+        return attrs
+
+
+def streaming_response(export, params, using, asynchronous=False):
+    """
+    The export as a StreamingHttpResponse, params are the validated ExportParamsSerializer data.
+    using is resolved by the view: the rows are read after it returned (outside of @read_replica).
+    """
+    export_format = params['output']
+    until = params.get('until') or export.default_until()
+    if export_format == 'json':
+        rows = export.arows if asynchronous else export.rows
+        response = StreamingJSONResponse(rows(params.get('since'), until, using), asynchronous=asynchronous)
+        extension = 'json'
+    else:
+        stream = export.astream if asynchronous else export.stream
+        encoder = ENCODERS[export_format]
+        response = StreamingHttpResponse(stream(export_format, params.get('since'), until, using), content_type=encoder.content_type)
+        extension = encoder.extension
+    response['Content-Disposition'] = f'attachment; filename="{export.name}.{extension}"'
+    # the since of the next incremental export.
+    response['X-Export-Until'] = until.isoformat()
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,44 @@
+"""
+JSON encoding shared by the API renderers/parsers (backend/renderers.py, backend/parsers.py).
+orjson when it's installed, the standard library otherwise. Both follow DRF's JSONEncoder:
+compact output, Decimal as float, date/datetime as ISO 8601 with "Z" for UTC.
+"""
+from rest_framework.utils import json
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib fallback is slower but equivalent.
+    orjson = None
+
+# orjson serializes dates/datetimes (UTC as "Z", like DRF) and str/int/dict/list subclasses itself.
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+_encoder = JSONEncoder()
+# escaped like DRF does, to keep the output a strict javascript subset.
+_LINE_SEPARATORS = ((b'\xe2\x80\xa8', b'\\u2028'), (b'\xe2\x80\xa9', b'\\u2029'))
+
+
+def _default(obj):
+    # Decimal, Promise, UUID, QuerySet... everything DRF's encoder knows.
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    """Encode `data` to compact utf-8 JSON bytes."""
+    if orjson is not None:
+        encoded = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    else:
+        # DRF's json wrapper is strict, NaN/Infinity are rejected.
+        encoded = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    if b'\xe2\x80' in encoded:
+        for separator, escaped in _LINE_SEPARATORS:
+            encoded = encoded.replace(separator, escaped)
+    return encoded
+
+
+def loads(data):
+    """Decode JSON bytes/str, raises ValueError on invalid JSON (NaN/Infinity included)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,163 @@
+"""
+Read only serializers for the high-volume endpoints.
+
+A ValuesSerializer reproduces the output of a DRF ModelSerializer byte for byte, but the
+fields are introspected once per class and compiled to plain (key, converter) pairs,
+so serializing a row is a dict comprehension instead of DRF's per-field machinery.
+The rows are `.values(*Serializer.value_fields())` dicts, or model instances.
+"""
+import decimal
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import fields, relations
+from rest_framework.settings import ISO_8601, api_settings
+from . import metrics
+
+
+def _identity(value):
+    return value
+
+
+def _iso_8601(output_format):
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _decimal_converter(field):
+    if not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) \
+            or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            value = decimal.Decimal(str(value).strip())
+        return f'{value.quantize(exponent, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _datetime_converter(field):
+    if not _iso_8601(getattr(field, 'format', api_settings.DATETIME_FORMAT)) or hasattr(field, 'timezone'):
+        return field.to_representation
+
+    def bind(current_timezone):
+        def convert(value):
+            if isinstance(value, str):
+                return value
+            # same as DRF's enforce_timezone, the values of USE_TZ projects are aware.
+            if current_timezone is not None and timezone.is_aware(value):
+                value = value.astimezone(current_timezone)
+            else:
+                value = field.enforce_timezone(value)
+            value = value.isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+    # the current timezone is looked up once per serialization, not once per value.
+    return _PerTimezone(bind)
+
+
+class _PerTimezone:
+    def __init__(self, bind):
+        self.bind = bind
+
+
+def _date_converter(field):
+    if not _iso_8601(getattr(field, 'format', api_settings.DATE_FORMAT)):
+        return field.to_representation
+    return lambda value: value if isinstance(value, str) else value.isoformat()
+
+
+def _converter(field):
+    # fields converting the bare column value themselves (categories.fields.CategoryField).
+    if getattr(field, 'accepts_column_values', False):
+        return field.to_representation
+    # only the types whose to_representation is a no-op on database values skip DRF.
+    if isinstance(field, fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, fields.DateTimeField):
+        return _datetime_converter(field)
+    if isinstance(field, fields.DateField):
+        return _date_converter(field)
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return _identity
+    if isinstance(field, (fields.ChoiceField, fields.CharField, fields.IntegerField, fields.FloatField, fields.BooleanField)):
+        return _identity
+    return None
+
+
+class ValuesSerializer:
+    """
+    Fast read path of `serializer_class`, same api as a DRF serializer: Serializer(rows, many=True).data
+    Override to_representation (calling super) to post-process a row like the DRF serializer does.
+    """
+    serializer_class = None
+
+    def __init__(self, instance, many=False):
+        self.instance = instance
+        self.many = many
+        self._bound = None
+
+    @classmethod
+    def _compile(cls):
+        compiled = cls.__dict__.get('_compiled')
+        if compiled is None:
+            serializer = cls.serializer_class()
+            opts = serializer.Meta.model._meta
+            compiled = []
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                convert = _converter(field)
+                if convert is None:
+                    raise TypeError(f'{cls.__name__}: no fast path for {name} ({type(field).__name__}).')
+                model_field = opts.get_field(field.source)
+                compiled.append((name, field.source, model_field.attname, convert))
+            cls._compiled = compiled
+        return compiled
+
+    @classmethod
+    def value_fields(cls):
+        """The names to pass to QuerySet.values() for the rows of this serializer."""
+        return [key for _, key, _, _ in cls._compile()]
+
+    @classmethod
+    def field_names(cls):
+        """The keys of a representation, in order."""
+        return [name for name, _, _, _ in cls._compile()]
+
+    def _fields(self):
+        if self._bound is None:
+            current_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+            self._bound = [
+                (name, key, attname, convert.bind(current_timezone) if isinstance(convert, _PerTimezone) else convert)
+                for name, key, attname, convert in self._compile()
+            ]
+        return self._bound
+
+    def to_representation(self, row):
+        if isinstance(row, dict):
+            return {
+                name: None if (value := row[key]) is None else convert(value)
+                for name, key, _, convert in self._fields()
+            }
+        return {
+            name: None if (value := getattr(row, attname)) is None else convert(value)
+            for name, _, attname, convert in self._fields()
+        }
+
+    def iter_data(self):
+        """The representations of the rows one by one, to stream a large `many` queryset/iterator."""
+        for row in self.instance:
+            yield self.to_representation(row)
+
+    @property
+    def data(self):
+        with metrics.timed('serializer'):
+            if self.many:
+                return [self.to_representation(row) for row in self.instance]
+            return self.to_representation(self.instance)
@@ -0,0 +1,162 @@
+"""
+Structured request logging.
+
+- RequestLogMiddleware binds a request scoped context (request id, method, path...)
+  and logs one "request" record per response with its status and duration.
+- JSONFormatter renders a record, its extra fields and that context as one JSON line.
+- QueueingStreamHandler only enqueues the records, a listener thread formats and writes
+  them, and when the queue is full the records are dropped instead of blocking the request.
+- SamplingFilter keeps a sample of the requests below WARNING, warnings and errors always pass.
+"""
+import contextvars
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.functional import SimpleLazyObject
+
+logger = logging.getLogger('backend.requests')
+
+_context = contextvars.ContextVar('log_context', default=None)
+
+# attributes of every LogRecord, everything else on a record comes from extra={...}.
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'context', 'taskName'}
+
+
+def get_context():
+    return _context.get() or {}
+
+
+def bind(**fields):
+    """Add fields to the current request's log context (and to its "request" record)."""
+    context = _context.get()
+    if context is not None:
+        context.update(fields)
+
+
+class JSONFormatter(logging.Formatter):
+    # the time is written with a Z, in UTC whatever the server's timezone.
+    converter = time.gmtime
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        # the context is snapshotted by QueueingStreamHandler, the listener thread can't see the contextvar.
+        context = getattr(record, 'context', None)
+        context = get_context() if context is None else context
+        payload.update({key: value for key, value in context.items() if key != 'sampled'})
+        payload.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exception'] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        context = _context.get()
+        if context is None:
+            return self.rate >= 1.0 or random.random() < self.rate
+        # decided once per request, so a request's records are kept or dropped together.
+        return context.get('sampled', True)
+
+
+class QueueingStreamHandler(QueueHandler):
+    """Non-blocking handler writing to stdout (or `stream`) from a background thread."""
+
+    def __init__(self, queue_size=10000, stream=None):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream or sys.stdout)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+
+    def setFormatter(self, formatter):
+        # the formatting happens in the listener thread.
+        self.target.setFormatter(formatter)
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.context = dict(get_context())
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    # called by logging.shutdown() at exit, flushes the queue.
+    def close(self):
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
+
+
+@sync_and_async_middleware
+def RequestLogMiddleware(get_response):
+    from django.conf import settings
+    sample_rate = getattr(settings, 'LOG_SAMPLE_RATE', 1.0)
+
+    def start(request):
+        context = {
+            'request_id': request.headers.get('X-Request-ID') or uuid.uuid4().hex,
+            'method': request.method,
+            'path': request.path,
+            'sampled': sample_rate >= 1.0 or random.random() < sample_rate,
+        }
+        return _context.set(context), context, time.perf_counter()
+
+    def finish(request, response, token, context, started):
+        resolver_match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject):
+            # not replaced by the token authentication, don't hit the session store for it.
+            user = None
+        logger.info(
+            'request',
+            extra={
+                'status': response.status_code,
+                'view': resolver_match.view_name if resolver_match else None,
+                'user_id': user.pk if user is not None and user.is_authenticated else None,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            }
+        )
+        response['X-Request-ID'] = context['request_id']
+        _context.reset(token)
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token, context, started = start(request)
+            response = await get_response(request)
+            return finish(request, response, token, context, started)
+    else:
+        def middleware(request):
+            token, context, started = start(request)
+            response = get_response(request)
+            return finish(request, response, token, context, started)
+    return middleware
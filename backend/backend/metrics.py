@@ -0,0 +1,288 @@
+"""
+Request level performance instrumentation.
+
+- Every database connection gets an execute wrapper counting the queries of the current
+  request and their time (sync and async views, the context follows sync_to_async).
+- DRF serializers (.data, .is_valid()) and the JSON renderer add their time to the request.
+- MetricsMiddleware sends them back as a Server-Timing header, adds them to the "request" log
+  record and to the in-process Prometheus registry served by metrics_view.
+- The N+1 detector flags a request running the same SQL (with different parameters) at least
+  N_PLUS_ONE_THRESHOLD times: a warning, or an NPlusOneError when N_PLUS_ONE_RAISE is set (tests).
+  assert_no_n_plus_one() does the same check around any block of a test.
+"""
+import contextlib
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import Counter
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.decorators import sync_and_async_middleware
+from . import log
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class NPlusOneError(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'timings', 'statements', '_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.timings = {'serializer': 0.0, 'render': 0.0}
+        self.statements = Counter()  # sql (with placeholders) -> executions
+        self._depth = Counter()
+
+    def repeated_queries(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def current():
+    return _current.get()
+
+
+# installed on every connection, a no-op outside of a request.
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+        metrics.statements[sql] += 1
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def instrument_open_connections():
+    # the connections opened before this module was imported.
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(None, connection)
+
+
+@contextlib.contextmanager
+def timed(kind):
+    """Add the time of the block to `kind` of the current request, nested blocks count once."""
+    metrics = _current.get()
+    if metrics is None or metrics._depth[kind]:
+        yield
+        return
+    metrics._depth[kind] += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[kind] += time.perf_counter() - started
+        metrics._depth[kind] -= 1
+
+
+def _timed_method(kind, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with timed(kind):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+_hooks_installed = False
+
+
+def install_serializer_hooks():
+    """Time BaseSerializer.data and is_valid(), DRF has no signal for them."""
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    from rest_framework.serializers import BaseSerializer, ListSerializer
+    BaseSerializer.data = property(_timed_method('serializer', BaseSerializer.data.fget))
+    for serializer_class in (BaseSerializer, ListSerializer):
+        if 'is_valid' in vars(serializer_class):
+            serializer_class.is_valid = _timed_method('serializer', serializer_class.is_valid)
+    _hooks_installed = True
+
+
+@contextlib.contextmanager
+def assert_no_n_plus_one(threshold=None):
+    """Test helper: raise NPlusOneError when the block repeats a query `threshold` times."""
+    threshold = threshold or settings.METRICS['N_PLUS_ONE_THRESHOLD']
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+    repeated = metrics.repeated_queries(threshold)
+    if repeated:
+        raise NPlusOneError(f'{repeated[0][1]} executions of: {repeated[0][0]}')
+
+
+class Registry:
+    """Counters and histograms in the Prometheus text format (per process)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts..., count, sum]
+        self._help = {}
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(DURATION_BUCKETS) + 2)
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    def render(self):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(value) for key, value in self._histograms.items()}
+        lines = []
+        for name, (kind, text) in sorted(self._help.items()):
+            lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_labels(labels)} {_number(value)}')
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(DURATION_BUCKETS, histogram):
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {count}')
+                lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {histogram[-2]}')
+                lines.append(f'{name}_count{_labels(labels)} {histogram[-2]}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(histogram[-1])}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        '%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{%s}' % ','.join(escaped)
+
+
+def _number(value):
+    return repr(round(value, 6)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+REGISTRY.describe('api_requests_total', 'counter', 'Requests by view, method and status.')
+REGISTRY.describe('api_request_duration_seconds', 'histogram', 'Request duration by view.')
+REGISTRY.describe('api_db_queries_total', 'counter', 'SQL queries by view.')
+REGISTRY.describe('api_db_duration_seconds_total', 'counter', 'Time spent in SQL queries by view.')
+REGISTRY.describe('api_serializer_duration_seconds_total', 'counter', 'Time spent in DRF serializers by view.')
+REGISTRY.describe('api_render_duration_seconds_total', 'counter', 'Time spent rendering JSON by view.')
+REGISTRY.describe('api_n_plus_one_total', 'counter', 'Requests flagged by the N+1 query detector by view.')
+
+
+def server_timing(metrics, total):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+        f'serializer;dur={metrics.timings["serializer"] * 1000:.2f}',
+        f'render;dur={metrics.timings["render"] * 1000:.2f}',
+        f'total;dur={total * 1000:.2f}',
+    ])
+
+
+@sync_and_async_middleware
+def MetricsMiddleware(get_response):
+    config = settings.METRICS
+    if not config['ENABLED']:
+        raise MiddlewareNotUsed
+    install_serializer_hooks()
+    instrument_open_connections()
+    threshold = config['N_PLUS_ONE_THRESHOLD']
+    ignored_views = set(config.get('N_PLUS_ONE_IGNORE_VIEWS', ()))
+
+    def start():
+        metrics = RequestMetrics()
+        return _current.set(metrics), metrics, time.perf_counter()
+
+    def finish(request, response, token, metrics, started):
+        _current.reset(token)
+        total = time.perf_counter() - started
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else 'unresolved'
+        labels = {'view': view}
+        REGISTRY.inc('api_requests_total', {'view': view, 'method': request.method, 'status': response.status_code})
+        REGISTRY.observe('api_request_duration_seconds', labels, total)
+        REGISTRY.inc('api_db_queries_total', labels, metrics.queries)
+        REGISTRY.inc('api_db_duration_seconds_total', labels, metrics.db_time)
+        REGISTRY.inc('api_serializer_duration_seconds_total', labels, metrics.timings['serializer'])
+        REGISTRY.inc('api_render_duration_seconds_total', labels, metrics.timings['render'])
+        log.bind(
+            queries=metrics.queries,
+            db_ms=round(metrics.db_time * 1000, 2),
+            serializer_ms=round(metrics.timings['serializer'] * 1000, 2),
+            render_ms=round(metrics.timings['render'] * 1000, 2),
+        )
+        response['Server-Timing'] = server_timing(metrics, total)
+        repeated = metrics.repeated_queries(threshold) if view not in ignored_views else None
+        if repeated:
+            REGISTRY.inc('api_n_plus_one_total', labels)
+            logger.warning(
+                'repeated queries',
+                extra={'view': view, 'repeated': [{'sql': sql[:300], 'count': count} for sql, count in repeated[:5]]}
+            )
+            if config['N_PLUS_ONE_RAISE']:
+                raise NPlusOneError(f'{view}: {repeated[0][1]} executions of: {repeated[0][0]}')
+        return response
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token, metrics, started = start()
+            response = await get_response(request)
+            return finish(request, response, token, metrics, started)
+    else:
+        def middleware(request):
+            token, metrics, started = start()
+            response = get_response(request)
+            return finish(request, response, token, metrics, started)
+    return middleware
+
+
+def metrics_view(request):
+    """
+    Prometheus metrics endpoint (internal)
+    GET /internal/metrics/ from one of settings.METRICS['ALLOWED_IPS']
+    The registry is per process, scrape every worker.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS['ALLOWED_IPS']:
+        raise PermissionDenied
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,96 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from . import fast_json, metrics
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF's JSONRenderer on backend.fast_json (orjson when installed).
+    Indented output (browsable API, `; indent=` media types) keeps DRF's implementation.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.compact or not self.strict or self.ensure_ascii \
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        with metrics.timed('render'):
+            return fast_json.dumps(data)
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """
+    Renders a dict/list whose lists may be iterators (QuerySet.iterator(), generators...)
+    chunk by chunk, so a large list is never held in memory, neither as objects nor as JSON.
+    Use it through StreamingJSONResponse, DRF's Response always renders the whole body.
+    """
+    chunk_size = 500  # items per yielded chunk
+
+    def iter_render(self, data):
+        if isinstance(data, dict):
+            yield b'{'
+            for index, (key, value) in enumerate(data.items()):
+                yield (b',' if index else b'') + fast_json.dumps(str(key)) + b':'
+                yield from self.iter_render(value)
+            yield b'}'
+        elif isinstance(data, (str, bytes)) or not hasattr(data, '__iter__'):
+            yield fast_json.dumps(data)
+        else:
+            yield b'['
+            chunk = []
+            first = True
+            for item in data:
+                chunk.append(item)
+                if len(chunk) == self.chunk_size:
+                    yield self._render_items(chunk, first)
+                    chunk, first = [], False
+            if chunk:
+                yield self._render_items(chunk, first)
+            yield b']'
+
+    async def aiter_render(self, data):
+        """iter_render() of data whose lists may also be async iterators (QuerySet.aiterator()...)."""
+        if isinstance(data, dict):
+            yield b'{'
+            for index, (key, value) in enumerate(data.items()):
+                yield (b',' if index else b'') + fast_json.dumps(str(key)) + b':'
+                async for part in self.aiter_render(value):
+                    yield part
+            yield b'}'
+        elif hasattr(data, '__aiter__'):
+            yield b'['
+            chunk = []
+            first = True
+            async for item in data:
+                chunk.append(item)
+                if len(chunk) == self.chunk_size:
+                    yield self._render_items(chunk, first)
+                    chunk, first = [], False
+            if chunk:
+                yield self._render_items(chunk, first)
+            yield b']'
+        else:
+            for part in self.iter_render(data):
+                yield part
+
+    def _render_items(self, items, first):
+        # encode the chunk as one array and drop its brackets.
+        encoded = fast_json.dumps(items)[1:-1]
+        return encoded if first else b',' + encoded
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """data rendered by StreamingJSONRenderer, asynchronous for the async iterators of the ASGI views."""
+    def __init__(self, data, renderer=None, asynchronous=False, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        renderer = renderer or StreamingJSONRenderer()
+        super().__init__(renderer.aiter_render(data) if asynchronous else renderer.iter_render(data), **kwargs)
+
+
+class FastJSONResponse(HttpResponse):
+    """JsonResponse of the async views, encoded by backend.fast_json like FastJSONRenderer does for DRF."""
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        with metrics.timed('render'):
+            content = fast_json.dumps(data)
+        super().__init__(content, **kwargs)
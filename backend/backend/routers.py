@@ -0,0 +1,59 @@
+import contextvars
+import functools
+import random
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith('replica')]
+
+
+def reading_from_replica():
+    return _use_replica.get() and bool(replica_aliases())
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of the views decorated with @read_replica to a random replica,
+    everything else (and every write) goes to the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return random.choice(replica_aliases())
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same data as the default database.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return not db.startswith('replica')
+
+
+def read_replica(view):
+    """Route the ORM reads of a (read only) view to the replicas, put it above @api_view."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+    return wrapper
@@ -10,11 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
+from .db import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
-print("This is the base directory: ", {BASE_DIR})
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -40,13 +41,18 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework.authtoken',
+    'categories',
     'authentication',
-    'services'
+    'services',
+    'bookings',
+    'tasks'
 ]
 
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # <- add this
+    'backend.log.RequestLogMiddleware',
+    'backend.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,13 +89,113 @@ TEMPLATES = [
 # TODO: understand the relationship of this API with the authentication system.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'authentication.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    # orjson backed when it's installed (backend/fast_json.py).
+    'DEFAULT_RENDERER_CLASSES': [
+        'backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'backend.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # the login/register views use LoginThrottle/RegisterThrottle instead.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'backend.throttling.ApiThrottle',
+    ],
+}
+
+# token buckets of backend/throttling.py, per scope: key kind (ip, email, token) -> "capacity/period".
+# SHARED_CACHE is an optional redis alias of CACHES, to enforce the rates across the workers.
+THROTTLING = {
+    'ENABLED': os.environ.get('THROTTLING', '1') == '1',
+    'SHARED_CACHE': None,
+    'LOCAL_MAX_SIZE': 100000,
+    'RATES': {
+        'login': {'ip': '30/min', 'email': '5/min'},
+        'register': {'ip': '20/hour'},
+        'api': {'token': os.environ.get('THROTTLE_API_RATE', '6000/min')},
+    },
+}
+
+# authentication.AuthToken: a token expires LIFETIME seconds after its last refresh, a request
+# with a token refreshed more than REFRESH_INTERVAL seconds ago slides it forward (one UPDATE).
+AUTH_TOKENS = {
+    'LIFETIME': int(os.environ.get('AUTH_TOKEN_LIFETIME', 60 * 60 * 24 * 14)),
+    'REFRESH_INTERVAL': 60 * 60 * 24,
+}
+
+# background tasks of the tasks app, run by `manage.py run_tasks` workers (see tasks/queue.py).
+# EAGER runs them in the process right after the commit instead, when no worker runs (development).
+TASKS = {
+    'EAGER': os.environ.get('TASKS_EAGER', '1' if DEBUG else '0') == '1',
+    'BATCH_SIZE': 100,
+    'POLL_INTERVAL': 1.0,  # seconds
+    'LEASE': 300,  # seconds before the tasks of a dead worker are claimed again
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 10,  # seconds, doubled at each attempt
+}
+
+# token -> user cache used by CachedTokenAuthentication.
+# SHARED_CACHE is an optional alias of CACHES shared by all the workers (redis, memcached...).
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL': 300,  # seconds
+    'SHARED_CACHE': None,
+}
+
+# in-process cache by default, set CACHE_URL (redis://...) to share it between the workers.
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# cached pages of the service list/search endpoints (services/cache.py).
+CATALOG_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,  # seconds
+}
+
+# live feed of the services (services/feed.py), per worker: each subscriber buffers BUFFER events
+# before it's dropped as a slow consumer, POLL_INTERVAL and KEEPALIVE are seconds, RETRY milliseconds.
+FEED = {
+    'MAX_SUBSCRIBERS': int(os.environ.get('FEED_MAX_SUBSCRIBERS', 10000)),
+    'BUFFER': 64,
+    'POLL_INTERVAL': 1.0,
+    'KEEPALIVE': 15,
+    'RETRY': 3000,
+    'REPLAY_LIMIT': 100,
 }
 
+# request instrumentation of backend/metrics.py: Server-Timing headers, /internal/metrics/ and the N+1 detector.
+METRICS = {
+    'ENABLED': os.environ.get('METRICS', '1') == '1',
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],
+    # a request running the same SQL this many times is flagged, raise instead of warn in the tests.
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'N_PLUS_ONE_RAISE': os.environ.get('METRICS_N_PLUS_ONE_RAISE', '0') == '1',
+    # the bulk import repeats its batched statements once per chunk.
+    'N_PLUS_ONE_IGNORE_VIEWS': ['bulk_create_services'],
+}
+
+# 'sync' serves the DRF views, 'async' serves the ASGI-native views on the same urls (run it under an ASGI server).
+API_MODE = os.environ.get('API_MODE', 'sync')
+
 
 WSGI_APPLICATION = 'backend.wsgi.application'
 
@@ -97,12 +203,11 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# sqlite (WAL) for local work, postgres with persistent or pooled connections
+# and read replicas in production, see backend/db.py for the environment variables.
+DATABASES = database_settings(BASE_DIR)
+
+DATABASE_ROUTERS = ['backend.routers.ReplicaRouter']
 
 
 # Password validation
@@ -123,8 +228,65 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# pbkdf2_sha256 stays the default algorithm, its cost comes from PASSWORD_HASHING.
+PASSWORD_HASHERS = [
+    'authentication.hashing.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# ITERATIONS: PBKDF2 cost, lower it in dev/test environments (None keeps Django's default).
+# OFFLOAD: hash in a process pool of POOL_SIZE workers (defaults to the cpu count),
+# at most MAX_PENDING hashes are queued before the callers wait.
+PASSWORD_HASHING = {
+    'ITERATIONS': int(os.environ['PASSWORD_HASH_ITERATIONS']) if os.environ.get('PASSWORD_HASH_ITERATIONS') else None,
+    'OFFLOAD': os.environ.get('PASSWORD_HASH_OFFLOAD', '1') == '1',
+    'POOL_SIZE': int(os.environ.get('PASSWORD_HASH_POOL_SIZE', 0)) or None,
+    'MAX_PENDING': None,
+}
+
 AUTH_USER_MODEL = 'authentication.User'  # Custom user model
 
+# never hashes on the event loop in the async views (see authentication/backends.py).
+AUTHENTICATION_BACKENDS = ['authentication.backends.ModelBackend']
+
+# Logging
+# JSON lines on stdout written by a background thread (see backend/log.py).
+# LOG_SAMPLE_RATE is the fraction of requests whose records below WARNING are kept.
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'backend.log.JSONFormatter'},
+    },
+    'filters': {
+        'sampling': {'()': 'backend.log.SamplingFilter', 'rate': LOG_SAMPLE_RATE},
+    },
+    'handlers': {
+        'queue': {
+            'class': 'backend.log.QueueingStreamHandler',
+            'formatter': 'json',
+            'filters': ['sampling'],
+            'queue_size': 10000,
+        },
+    },
+    'loggers': {
+        'django': {'handlers': ['queue'], 'level': 'INFO', 'propagate': False},
+        'backend': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        'authentication': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        'services': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        'categories': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        'bookings': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+        'tasks': {'handlers': ['queue'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
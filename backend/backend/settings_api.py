@@ -0,0 +1,41 @@
+"""
+Lean settings profile of the API workers (token-authenticated JSON only).
+
+    DJANGO_SETTINGS_MODULE=backend.settings_api gunicorn backend.wsgi
+    DJANGO_SETTINGS_MODULE=backend.settings_api uvicorn backend.asgi:application
+
+Everything of backend/settings.py, minus what only the admin and the browsable API use: the
+admin, sessions, messages and staticfiles apps, their middleware, CSRF (no cookie
+authentication) and the templates. The workers import and set up less at startup and run
+fewer middleware per request. The admin (and manage.py) keep running on backend.settings,
+against the same database: the tables of the apps left out are still migrated there.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK
+
+_BROWSER_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+_BROWSER_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    # DRF and the async views (token_required) set request.user themselves.
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in _BROWSER_APPS]
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in _BROWSER_MIDDLEWARE]
+
+# JSON only, the browsable API needs the templates.
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['backend.renderers.FastJSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['backend.parsers.FastJSONParser'],
+}
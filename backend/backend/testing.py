@@ -0,0 +1,54 @@
+"""
+Helpers shared by the test modules of the apps.
+
+    python manage.py test
+"""
+import contextlib
+import importlib
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import override_settings
+from django.urls import clear_url_caches
+
+# the apps' urls pick their views (views or async_views) when they're imported.
+APP_URLCONFS = ('authentication.urls', 'services.urls', 'bookings.urls')
+
+# cheap hashes, computed in the test process.
+PASSWORD_HASHING = {'ITERATIONS': 1000, 'OFFLOAD': False}
+
+
+def _reload_urls():
+    for name in APP_URLCONFS:
+        importlib.reload(importlib.import_module(name))
+    # its include()s hold resolvers that cached the former urlpatterns.
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+@contextlib.contextmanager
+def api_mode(mode):
+    """Serve the urls with the views of settings.API_MODE == mode ('sync' or 'async') in the block."""
+    try:
+        with override_settings(API_MODE=mode):
+            _reload_urls()
+            yield
+    finally:
+        # back to the views of the settings.
+        _reload_urls()
+
+
+def get_content(test, path, params=None, **kwargs):
+    """
+    (response, body) of a GET by the client of settings.API_MODE: the async views stream from
+    async iterators, the AsyncClient reads them (the sync client would, with a warning).
+    """
+    if settings.API_MODE != 'async':
+        response = test.client.get(path, params, **kwargs)
+        return response, b''.join(response.streaming_content) if response.streaming else response.content
+
+    async def aget():
+        response = await test.async_client.get(path, params, **kwargs)
+        if not response.streaming:
+            return response, response.content
+        return response, b''.join([chunk async for chunk in response.streaming_content])
+    return async_to_sync(aget)()
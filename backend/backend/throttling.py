@@ -0,0 +1,255 @@
+"""
+Token bucket throttling of the API, keyed by client ip, by login email and by auth token.
+
+Each scope (settings.THROTTLING['RATES']) maps key kinds to a rate "capacity/period":
+the bucket holds `capacity` requests and refills continuously at capacity/period.
+The buckets live in the process (a bounded LRU behind a lock, a few µs per check). With a
+SHARED_CACHE (a redis alias of CACHES) they also live in redis, updated atomically by a
+lua script, so the limits hold across the workers: the local bucket is checked first and
+a request it denies never reaches redis (the process alone already exceeded the rate).
+
+DRF views use the throttle classes, the async views the @throttle(scope) decorator.
+"""
+import functools
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from .async_api import BadRequest, parse_json_body
+from .renderers import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+SHARED_KEY_PREFIX = 'throttle:'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# KEYS[1] bucket, ARGV capacity, refill per second, ttl. Returns {allowed, wait}.
+REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return {allowed, tostring(wait)}
+"""
+
+
+def parse_rate(rate):
+    """'5/min' -> (capacity 5, 5/60 tokens per second)."""
+    count, period = rate.split('/')
+    seconds = PERIODS.get(period.strip()[:1].lower())
+    if seconds is None:
+        raise ImproperlyConfigured(f'Invalid throttle rate {rate!r}, expected "<count>/<s|min|hour|day>".')
+    return int(count), int(count) / seconds
+
+
+class TokenBuckets:
+    """The buckets of all the scopes and keys: in-process, plus the shared redis ones when configured."""
+
+    def __init__(self, max_size=100000, shared_cache=None):
+        self.max_size = max_size
+        self.shared = caches[shared_cache] if shared_cache else None
+        self._script = None
+        self._buckets = OrderedDict()  # key -> [tokens, updated]
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        """Take a token from the bucket of key, returns 0 when allowed or the seconds to wait."""
+        wait = self._consume_local(key, capacity, refill_rate)
+        if wait or self.shared is None:
+            return wait
+        try:
+            return self._consume_shared(key, capacity, refill_rate)
+        except Exception:
+            # fail open on the local bucket, an outage of the cache must not take the api down.
+            logger.warning("shared throttle cache unavailable", exc_info=True)
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def _consume_local(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [capacity, now]
+                if len(self._buckets) > self.max_size:
+                    # an evicted bucket starts full again, it is the least recently used one.
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / refill_rate
+
+    def _consume_shared(self, key, capacity, refill_rate):
+        if self._script is None:
+            if not hasattr(self.shared, '_cache') or not hasattr(self.shared._cache, 'get_client'):
+                raise ImproperlyConfigured("THROTTLING['SHARED_CACHE'] must be a redis cache alias.")
+            self._script = self.shared._cache.get_client(write=True).register_script(REDIS_TOKEN_BUCKET)
+        shared_key = self.shared.make_and_validate_key(SHARED_KEY_PREFIX + key)
+        ttl = math.ceil(capacity / refill_rate) + 1
+        allowed, wait = self._script(keys=[shared_key], args=[capacity, refill_rate, ttl])
+        return 0 if int(allowed) else float(wait)
+
+
+_buckets = None
+_buckets_lock = threading.Lock()
+
+
+def get_buckets():
+    global _buckets
+    if _buckets is None:
+        with _buckets_lock:
+            if _buckets is None:
+                config = settings.THROTTLING
+                _buckets = TokenBuckets(config.get('LOCAL_MAX_SIZE', 100000), config.get('SHARED_CACHE'))
+    return _buckets
+
+
+@functools.lru_cache(maxsize=None)
+def _scope_rates(scope):
+    if not settings.THROTTLING.get('ENABLED', True):
+        return []
+    return [(kind, *parse_rate(rate)) for kind, rate in settings.THROTTLING['RATES'].get(scope, {}).items()]
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    global _buckets
+    if setting == 'THROTTLING':
+        _scope_rates.cache_clear()
+        _buckets = None
+
+
+def _hashed(value):
+    # tokens and emails are not kept in clear in the buckets.
+    return hashlib.sha1(value.encode()).hexdigest()
+
+
+def client_ip(request):
+    """DRF's BaseThrottle.get_ident() on request.META only (building request.headers costs more than the check)."""
+    meta = getattr(request, '_request', request).META
+    forwarded = meta.get('HTTP_X_FORWARDED_FOR')
+    remote_addr = meta.get('REMOTE_ADDR')
+    num_proxies = api_settings.NUM_PROXIES
+    if num_proxies is not None:
+        if num_proxies == 0 or forwarded is None:
+            return remote_addr
+        addresses = forwarded.split(',')
+        return addresses[-min(num_proxies, len(addresses))].strip()
+    return ''.join(forwarded.split()) if forwarded else remote_addr
+
+
+def request_idents(request, email=None, token=None):
+    """The ident of each key kind for the request (None when it has none)."""
+    return {
+        'ip': client_ip(request),
+        'email': _hashed(email.strip().lower()) if isinstance(email, str) and email.strip() else None,
+        'token': _hashed(token) if token else None,
+    }
+
+
+def check(scope, idents):
+    """Consume a token of every bucket of scope, returns 0 when allowed or the seconds to wait."""
+    buckets = get_buckets()
+    for kind, capacity, refill_rate in _scope_rates(scope):
+        ident = idents.get(kind)
+        if ident is None:
+            continue
+        wait = buckets.consume(f'{scope}:{kind}:{ident}', capacity, refill_rate)
+        if wait:
+            return wait
+    return 0
+
+
+class BucketThrottle(BaseThrottle):
+    """DRF throttle of the buckets of `scope`, DRF answers 429 with a Retry-After header."""
+    scope = None
+
+    def allow_request(self, request, view):
+        self._wait = check(self.scope, self.get_idents(request))
+        return not self._wait
+
+    def get_idents(self, request):
+        token = getattr(request.auth, 'key', None)
+        return request_idents(request, token=token)
+
+    def wait(self):
+        return self._wait
+
+
+class LoginThrottle(BucketThrottle):
+    scope = 'login'
+
+    def get_idents(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return request_idents(request, email=email)
+
+
+class RegisterThrottle(LoginThrottle):
+    scope = 'register'
+
+
+class ApiThrottle(BucketThrottle):
+    scope = 'api'
+
+
+def throttled_response(wait):
+    wait = math.ceil(wait)
+    response = FastJSONResponse(
+        {'detail': str(exceptions.Throttled(wait).detail)}, status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
+    response['Retry-After'] = '%d' % wait
+    return response
+
+
+def throttle(scope, email_field=None):
+    """
+    Async views: throttle on the buckets of scope, put it below @token_required for the token kind.
+    email_field names the JSON body field holding the email of the email kind.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            email = None
+            if email_field:
+                try:
+                    email = parse_json_body(request).get(email_field)
+                except BadRequest:
+                    pass  # the view answers the parse error.
+            token = getattr(getattr(request, 'auth', None), 'key', None)
+            wait = check(scope, request_idents(request, email=email, token=token))
+            if wait:
+                return throttled_response(wait)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
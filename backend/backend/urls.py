@@ -14,11 +14,19 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from django.contrib import admin
+from django.apps import apps
 from django.urls import path, include
+from .metrics import metrics_view
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('authentication/', include('authentication.urls')),  # Include the customers app URLs, this will delegate to customers/urls.py
-    path('services/', include('services.urls'))
+    path('services/', include('services.urls')),
+    path('categories/', include('categories.urls')),
+    path('bookings/', include('bookings.urls')),
+    path('internal/metrics/', metrics_view, name='metrics')
 ]
+
+# left out of the API workers' settings profile (backend/settings_api.py).
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
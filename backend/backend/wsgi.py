@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# the category names are served from memory (categories/registry.py).
+from categories import registry  # noqa: E402
+registry.warm()
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks, run them from the backend directory:
+    python -m benchmarks.<name> --help
+They run against a throwaway test database, never against db.sqlite3.
+"""
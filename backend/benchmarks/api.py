@@ -0,0 +1,209 @@
+"""
+Benchmark suite of the auth and services APIs: login, authenticate, register, service create, list and nearby.
+
+    python -m benchmarks.api --users 200 --services 5000 --requests 500 --concurrency 8
+    python -m benchmarks.api --drivers client asgi --scenarios login list_services
+
+Seeds the users/tokens/services with the bulk factories on a throwaway sqlite database, then
+drives every scenario through each driver:
+    client  django's test client, in process
+    asgi    uvicorn serving backend.asgi (API_MODE from the environment, sync by default)
+    wsgi    gunicorn serving backend.wsgi, django's threaded runserver when gunicorn isn't installed
+and reports throughput, p50/p95/p99 latency and queries per request (read from the
+Server-Timing header of backend.metrics) as JSON, to compare runs before a deploy.
+"""
+import argparse
+import http.client
+import importlib.util
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from .factories import CENTER, PASSWORD, seed_services, seed_tokens, seed_users, user_email
+from .utils import free_port, latency_summary, report, server_timing_queries, setup_django, wait_for_port
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DRIVERS = ('client', 'asgi', 'wsgi')
+JSON = 'application/json'
+
+
+def build_scenarios(users, tokens, run_id):
+    """name -> function(index) returning the (method, path, body, headers) of the index-th request."""
+    companies = [user for user in users if user.user_type == 'company']
+    fields = ['Plumbing', 'Gardening', 'Painting', 'Carpentry', 'Locks']
+
+    def auth(user):
+        return {'Authorization': f'Token {tokens[user.pk]}'}
+
+    def login(index):
+        body = {'email': user_email(index % len(users)), 'password': PASSWORD}
+        return 'POST', '/authentication/login/', json.dumps(body), {'Content-Type': JSON}
+
+    def authenticate(index):
+        return 'GET', '/authentication/authenticate/', None, auth(users[index % len(users)])
+
+    def register(index):
+        body = {
+            'email': f'register-{run_id}-{index}@example.com', 'username': f'register-{run_id}-{index}',
+            'date_of_birth': '1990-01-01', 'password': PASSWORD, 'password_confirm': PASSWORD,
+            'user_type': 'costumer',
+        }
+        return 'POST', '/authentication/register_costumer/', json.dumps(body), {'Content-Type': JSON}
+
+    def create_service(index):
+        body = {'name': f'new service {index}', 'description': 'created by the benchmark',
+                'price_per_hour': '25.00', 'field': fields[index % len(fields)]}
+        headers = {'Content-Type': JSON, **auth(companies[index % len(companies)])}
+        return 'POST', '/services/create/', json.dumps(body), headers
+
+    def list_services(index):
+        path = f'/services/list/?limit=20&field={fields[index % len(fields)]}'
+        return 'GET', path, None, auth(companies[index % len(companies)])
+
+    def nearby_services(index):
+        lat, lng = CENTER[0] + (index % 7 - 3) * 0.1, CENTER[1] + (index % 5 - 2) * 0.1
+        path = f'/services/nearby/?lat={lat:.4f}&lng={lng:.4f}&radius=10&limit=20'
+        return 'GET', path, None, auth(users[index % len(users)])
+
+    return {
+        'login': login,
+        'authenticate': authenticate,
+        'register': register,
+        'create_service': create_service,
+        'list_services': list_services,
+        'nearby_services': nearby_services,
+    }
+
+
+def client_sender():
+    from django.test import Client
+
+    client = Client()
+
+    def send(method, path, body, headers):
+        headers = dict(headers)
+        content_type = headers.pop('Content-Type', None)
+        extra = {'content_type': content_type} if content_type else {}
+        response = client.generic(method, path, data=body or '', headers=headers, **extra)
+        return response.status_code, response.get('Server-Timing')
+    return send
+
+
+def http_sender(port):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+
+    def send(method, path, body, headers):
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status, response.getheader('Server-Timing')
+    return send
+
+
+def drive(make_sender, scenario, requests, concurrency):
+    """Send `requests` requests of the scenario from `concurrency` threads (one sender each)."""
+    counter = itertools.count()
+    latencies, queries = [], []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker():
+        send = make_sender()
+        local_latencies, local_queries, local_errors = [], [], 0
+        while (index := next(counter)) < requests:
+            request = scenario(index)
+            started = time.perf_counter()
+            status, server_timing = send(*request)
+            local_latencies.append(time.perf_counter() - started)
+            local_errors += status >= 400
+            count = server_timing_queries(server_timing)
+            if count is not None:
+                local_queries.append(count)
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latency_summary(latencies, time.perf_counter() - started, errors[0], queries)
+
+
+def server_command(driver, port):
+    if driver == 'asgi':
+        return [sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--port', str(port),
+                '--log-level', 'warning', '--no-access-log']
+    if importlib.util.find_spec('gunicorn'):
+        return [sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                '--threads', '8', '--log-level', 'warning']
+    return [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+
+
+def run_driver(driver, scenarios, database_file, requests, concurrency):
+    if driver == 'client':
+        return {name: drive(client_sender, scenario, requests, concurrency) for name, scenario in scenarios.items()}
+    port = free_port()
+    server = subprocess.Popen(
+        server_command(driver, port), cwd=BACKEND_DIR, env=dict(os.environ, DB_NAME=database_file),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        return {
+            name: drive(lambda: http_sender(port), scenario, requests, concurrency)
+            for name, scenario in scenarios.items()
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200, help='seeded users, half of them companies')
+    parser.add_argument('--services', type=int, default=5000, help='seeded services')
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario and driver')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--drivers', nargs='+', choices=DRIVERS, default=list(DRIVERS))
+    parser.add_argument('--scenarios', nargs='+', help='subset of the scenarios, all by default')
+    parser.add_argument('--iterations', type=int, default=1000, help='PBKDF2 iterations, keeps login from measuring only the hash')
+    args = parser.parse_args()
+
+    # read by the settings, of this process and of the servers.
+    os.environ['PASSWORD_HASH_ITERATIONS'] = str(args.iterations)
+    os.environ.setdefault('METRICS', '1')
+    teardown = setup_django()
+    try:
+        from django.db import connection
+        users = seed_users(args.users)
+        tokens = seed_tokens(users)
+        seed_services([user for user in users if user.user_type == 'company'], args.services)
+        database_file = connection.settings_dict['NAME']
+        results = {}
+        for driver in args.drivers:
+            scenarios = build_scenarios(users, tokens, run_id=driver)
+            if args.scenarios:
+                scenarios = {name: scenarios[name] for name in args.scenarios}
+            results[driver] = run_driver(driver, scenarios, database_file, args.requests, args.concurrency)
+        report({
+            'users': args.users,
+            'services': args.services,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'api_mode': os.environ.get('API_MODE', 'sync'),
+            'results': results,
+        })
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
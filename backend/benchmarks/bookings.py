@@ -0,0 +1,110 @@
+"""
+Booking throughput under contention: concurrent costumers booking the slots of a few companies,
+some of the requested slots overlapping (refused with a 409) and the others disjoint.
+Every accepted booking must hold: no two confirmed bookings of a company may overlap.
+
+    python -m benchmarks.bookings --bookings 400 --concurrency 8 --companies 4 --overlap 0.5
+"""
+import argparse
+import json
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from .utils import Timer, report, setup_django
+
+
+def slots(companies, count, overlap, seed=0):
+    """(company index, start offset in minutes) of the requested bookings, an hour long each."""
+    rng = random.Random(seed)
+    requested = []
+    for index in range(count):
+        company = index % len(companies)
+        hour = index // len(companies)
+        # an overlapping request starts within the hour booked by the previous one.
+        offset = (hour - 1) * 60 + rng.randrange(1, 60) if hour and rng.random() < overlap else hour * 60
+        requested.append((company, offset))
+    return requested
+
+
+def run(services, tokens, count, concurrency, overlap):
+    from django.db import close_old_connections
+    from django.test import Client
+    from django.utils import timezone
+    from bookings.models import Booking
+
+    start = (timezone.now() + timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+    requested = slots(services, count, overlap)
+
+    def book(index):
+        company, offset = requested[index]
+        starts_at = start + timedelta(minutes=offset)
+        try:
+            response = Client().post(
+                '/bookings/create/',
+                json.dumps({
+                    'service': services[company].pk,
+                    'starts_at': starts_at.isoformat(),
+                    'ends_at': (starts_at + timedelta(hours=1)).isoformat(),
+                }),
+                content_type='application/json',
+                headers={'Authorization': f'Token {tokens[index % len(tokens)]}'}
+            )
+            assert response.status_code in (201, 409), response.content
+            return response.status_code
+        finally:
+            close_old_connections()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor, Timer() as timer:
+        statuses = list(executor.map(book, range(count)))
+
+    overlaps = 0
+    for service in services:
+        intervals = list(
+            Booking.objects.filter(company_id=service.company_id, status=Booking.CONFIRMED)
+            .order_by('starts_at').values_list('starts_at', 'ends_at')
+        )
+        overlaps += sum(1 for previous, current in zip(intervals, intervals[1:]) if current[0] < previous[1])
+    assert not overlaps, f'{overlaps} overlapping bookings'
+    return {
+        'requests': count,
+        'booked': statuses.count(201),
+        'conflicts': statuses.count(409),
+        'overlapping_bookings': overlaps,
+        'seconds': round(timer.elapsed, 3),
+        'requests_per_second': round(count / timer.elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookings', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--companies', type=int, default=4)
+    parser.add_argument('--overlap', type=float, default=0.5, help='share of the requests overlapping an earlier one')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    # the 409s are expected here, keep django's warning for each of them out of the report.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    try:
+        from .factories import seed_services, seed_tokens, seed_users
+        from services.models import Service
+        users = seed_users(args.companies * 2)
+        companies = [user for user in users if user.user_type == 'company']
+        seed_services(companies, args.companies)
+        services = [Service.objects.filter(company=company).first() for company in companies]
+        tokens = list(seed_tokens([user for user in users if user.user_type == 'costumer']).values())
+        report({
+            'concurrency': args.concurrency,
+            'companies': args.companies,
+            'overlap': args.overlap,
+            'results': run(services, tokens, args.bookings, args.concurrency, args.overlap),
+        })
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Peak memory of a CSV export of the services: the whole table at once vs the streamed export
+(backend/exporting.py). The streamed peak must stay flat while the table grows.
+
+    python -m benchmarks.export --sizes 10000 50000
+"""
+import argparse
+import csv
+import io
+import tracemalloc
+
+from .utils import Timer, report, setup_django
+
+
+def peak(function):
+    tracemalloc.start()
+    try:
+        with Timer() as timer:
+            size = function()
+        return size, round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2), round(timer.elapsed * 1000, 2)
+    finally:
+        tracemalloc.stop()
+
+
+def run(size):
+    from backend import exporting
+    from services.models import Service
+    from services.serializers import ServiceValuesSerializer
+
+    export = exporting.get_exports()['services']
+    last = Service.objects.order_by('created_at', 'id').values_list('created_at', flat=True)[size - 1]
+    # the until of the first `size` rows (ties aside).
+    until = Service.objects.filter(created_at__gt=last).order_by('created_at').values_list('created_at', flat=True).first()
+
+    def whole():
+        rows = ServiceValuesSerializer(list(export.queryset(until=until)), many=True).data
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(ServiceValuesSerializer.field_names())
+        writer.writerows([row[name] for name in ServiceValuesSerializer.field_names()] for row in rows)
+        return len(buffer.getvalue().encode())
+
+    def streamed():
+        # the chunks are sent to the client, only their size is kept.
+        return sum(len(chunk) for chunk in export.stream('csv', until=until))
+
+    whole_bytes, whole_mb, whole_ms = peak(whole)
+    streamed_bytes, streamed_mb, streamed_ms = peak(streamed)
+    assert whole_bytes == streamed_bytes
+    return {
+        'rows': size,
+        'bytes': streamed_bytes,
+        'whole_peak_mb': whole_mb,
+        'whole_ms': whole_ms,
+        'streamed_peak_mb': streamed_mb,
+        'streamed_ms': streamed_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from .factories import seed_services, seed_users
+        companies = [user for user in seed_users(100) if user.user_type == 'company']
+        # one more row, so the until of the largest size exists.
+        seed_services(companies, max(args.sizes) + 1)
+        report({'results': [run(size) for size in args.sizes]})
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
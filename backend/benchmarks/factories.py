@@ -0,0 +1,76 @@
+"""
+Bulk seeding of users, tokens and services for the benchmarks.
+Everything goes through bulk_create, so the side tables the signals maintain
+(search index, dashboard aggregates) are rebuilt at the end.
+"""
+import random
+from decimal import Decimal
+
+PASSWORD = 'BenDoe123!'
+BATCH_SIZE = 1000
+
+
+def user_email(index):
+    return f'user{index}@example.com'
+
+
+def seed_users(count, companies_ratio=0.5, password=PASSWORD):
+    """Create `count` users (companies first) sharing one password hash, returns them."""
+    from authentication import hashing
+    from authentication.models import User
+    from categories import registry as categories
+
+    encoded = hashing.make_password(password)  # hashed once, not once per user.
+    companies = int(count * companies_ratio)
+    fields = list(categories.all())
+    users = []
+    for index in range(count):
+        company = index < companies
+        users.append(User(
+            email=user_email(index), username=f'user{index}', password=encoded,
+            user_type='company' if company else 'costumer',
+            field_of_work=fields[index % len(fields)] if company else None,
+            date_of_birth=None if company else '1990-01-01',
+        ))
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    return list(User.objects.order_by('id'))
+
+
+def seed_tokens(users):
+    """One token per user, returns {user id: key}."""
+    from django.utils import timezone
+    from authentication.models import AuthToken, token_lifetime
+
+    expires_at = timezone.now() + token_lifetime()
+    tokens = [AuthToken(user=user, key=AuthToken.generate_key(), expires_at=expires_at) for user in users]
+    AuthToken.objects.bulk_create(tokens, batch_size=BATCH_SIZE)
+    return {token.user_id: token.key for token in tokens}
+
+
+# the services are spread over a square of about 100 km around it.
+CENTER = (48.8566, 2.3522)
+
+
+def seed_services(companies, count, seed=0):
+    """Create `count` services spread over the companies, then rebuild the derived tables."""
+    from services import search, stats
+    from categories import registry as categories
+    from services.models import Service
+
+    companies = list(companies)
+    fields = list(categories.all())
+    generator = random.Random(seed)
+
+    def service(index):
+        service = Service(
+            company=companies[index % len(companies)], name=f'service {index}',
+            description=f'benchmark {generator.choice(fields).name.lower()} service number {index}',
+            price_per_hour=Decimal(generator.randint(500, 20000)) / 100, field=generator.choice(fields),
+            latitude=CENTER[0] + generator.uniform(-0.45, 0.45), longitude=CENTER[1] + generator.uniform(-0.7, 0.7),
+        )
+        service.update_geohash()
+        return service
+
+    Service.objects.bulk_create((service(index) for index in range(count)), batch_size=BATCH_SIZE)
+    search.rebuild_index()
+    stats.rebuild()
@@ -0,0 +1,78 @@
+"""
+Fan-out of the live service feed (services/feed.py) in one worker: memory of the idle
+subscribers, and the publishing of events to them while some stop reading (slow consumers,
+dropped once their buffer is full).
+
+    python -m benchmarks.feed --subscribers 1000 10000 --events 1000 --slow 0.01
+"""
+import argparse
+import asyncio
+import tracemalloc
+
+from .utils import Timer, report, setup_django
+
+FIELDS = 12
+
+
+async def consume(subscriber, received):
+    while True:
+        event = await subscriber.queue.get()
+        if event is None:
+            return
+        received.append(len(event))
+
+
+async def fan_out(count, events, slow):
+    from services.feed import Hub
+
+    hub = Hub()
+    # publish() is called by hand here, no poller.
+    hub._poller = asyncio.get_running_loop().create_future()
+    tracemalloc.start()
+    subscribers = [hub.subscribe(index % (FIELDS + 1) or None) for index in range(count)]
+    idle_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    received = []
+    slow_count = int(count * slow)
+    # the first slow_count subscribers never read.
+    consumers = [asyncio.create_task(consume(subscriber, received)) for subscriber in subscribers[slow_count:]]
+    event = b'id: x\nevent: service\ndata: %s\n\n' % (b'x' * 300)
+    with Timer() as timer:
+        for index in range(events):
+            hub.publish(index % FIELDS + 1, event)
+            # the consumers read between two events.
+            await asyncio.sleep(0)
+    for consumer in consumers:
+        consumer.cancel()
+    return {
+        'subscribers': count,
+        'idle_kb_per_subscriber': round(idle_bytes / count / 1024, 2),
+        'events': events,
+        'deliveries': len(received),
+        'ms_per_event': round(timer.elapsed * 1000 / events, 3),
+        'slow': slow_count,
+        'dropped': hub.dropped,
+        'subscribed': hub.count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--slow', type=float, default=0.01, help='share of the subscribers never reading')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.test import override_settings
+        from django.conf import settings
+        with override_settings(FEED={**settings.FEED, 'MAX_SUBSCRIBERS': max(args.subscribers)}):
+            report({'results': [asyncio.run(fan_out(count, args.events, args.slow)) for count in args.subscribers]})
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
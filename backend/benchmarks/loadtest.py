@@ -0,0 +1,117 @@
+"""
+Requests/sec of the sync (DRF) and async (ASGI-native) stacks, both served by uvicorn.
+
+    python -m benchmarks.loadtest --duration 10 --concurrency 32
+
+Each stack runs in its own uvicorn process (API_MODE=sync|async) on the same seeded
+temporary sqlite database, and is hammered by `concurrency` keep-alive clients.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .factories import PASSWORD, seed_services, seed_tokens, seed_users, user_email
+from .utils import free_port, latency_summary, report, wait_for_port
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(database_file, services):
+    os.environ['DB_NAME'] = database_file
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+    company, = seed_users(1, companies_ratio=1)
+    seed_services([company], services)
+    return seed_tokens([company])[company.pk]
+
+
+def hammer(port, scenario, duration, concurrency):
+    method, path, body, headers = scenario
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        local_latencies, local_errors = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            local_latencies.append(time.perf_counter() - start)
+            if response.status >= 400:
+                local_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return latency_summary(latencies, elapsed, sum(errors))
+
+
+def run_stack(mode, database_file, scenarios, duration, concurrency):
+    port = free_port()
+    env = dict(os.environ, API_MODE=mode, DB_NAME=database_file)
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        return {name: hammer(port, scenario, duration, concurrency) for name, scenario in scenarios.items()}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=10, help='seconds per scenario and stack')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--services', type=int, default=1000, help='seeded services')
+    parser.add_argument('--iterations', type=int, default=1000, help='PBKDF2 iterations, keeps login from measuring only the hash')
+    args = parser.parse_args()
+
+    os.environ['PASSWORD_HASH_ITERATIONS'] = str(args.iterations)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('THROTTLING', '0')
+    database_file = os.path.join(tempfile.mkdtemp(prefix='loadtest-'), 'db.sqlite3')
+    token = seed(database_file, args.services)
+    auth = {'Authorization': f'Token {token}'}
+    json_headers = {'Content-Type': 'application/json'}
+    scenarios = {
+        'authenticate': ('GET', '/authentication/authenticate/', None, auth),
+        'list_services': ('GET', '/services/list/?limit=20', None, auth),
+        'login': ('POST', '/authentication/login/',
+                  json.dumps({'email': user_email(0), 'password': PASSWORD}), json_headers),
+    }
+    report({
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'sync': run_stack('sync', database_file, scenarios, args.duration, args.concurrency),
+        'async': run_stack('async', database_file, scenarios, args.duration, args.concurrency),
+    })
+
+
+if __name__ == '__main__':
+    main()
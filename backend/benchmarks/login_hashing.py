@@ -0,0 +1,73 @@
+"""
+Login throughput with the password hashing inline vs offloaded to the process pool.
+
+    python -m benchmarks.login_hashing --logins 40 --concurrency 8 --iterations 100000
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import Timer, report, setup_django
+
+PASSWORD = 'BenDoe123!'
+
+
+def run(logins, concurrency, offload, iterations):
+    from django.test import Client, override_settings
+    from authentication import hashing
+
+    hashing_settings = {'ITERATIONS': iterations, 'OFFLOAD': offload}
+
+    def login(index):
+        response = Client().post(
+            '/authentication/login/',
+            {'email': f'user{index % concurrency}@example.com', 'password': PASSWORD},
+            content_type='application/json'
+        )
+        assert response.status_code == 200, response.content
+
+    with override_settings(PASSWORD_HASHING=hashing_settings):
+        login(0)  # warm up (and start the pool when offloading).
+        with ThreadPoolExecutor(max_workers=concurrency) as executor, Timer() as timer:
+            list(executor.map(login, range(logins)))
+        hashing.shutdown_pool()
+    throughput = logins / timer.elapsed
+    return {
+        'offload': offload,
+        'logins': logins,
+        'seconds': round(timer.elapsed, 3),
+        'logins_per_second': round(throughput, 2),
+        'logins_per_second_per_core': round(throughput / (os.cpu_count() or 1), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=None, help="PBKDF2 iterations (django's default when omitted)")
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.test import override_settings
+        from authentication.models import User
+        from categories import registry as categories
+        with override_settings(PASSWORD_HASHING={'ITERATIONS': args.iterations, 'OFFLOAD': False}):
+            for index in range(args.concurrency):
+                User.objects.create_user(
+                    email=f'user{index}@example.com', username=f'user{index}', password=PASSWORD,
+                    user_type='company', field_of_work=categories.get_by_name('Plumbing')
+                )
+        report({
+            'cores': os.cpu_count(),
+            'iterations': args.iterations,
+            'before': run(args.logins, args.concurrency, False, args.iterations),
+            'after': run(args.logins, args.concurrency, True, args.iterations),
+        })
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Rendering a service list response: DRF's JSONRenderer vs FastJSONRenderer vs StreamingJSONRenderer.
+
+    python -m benchmarks.renderers --sizes 1000 10000 --repeat 5
+"""
+import argparse
+
+from .serializers import best_of, seed
+from .utils import report, setup_django
+
+
+def run(size, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from backend import fast_json
+    from backend.renderers import FastJSONRenderer, StreamingJSONRenderer
+    from services.models import Service
+    from services.serializers import ServiceValuesSerializer
+
+    rows = Service.objects.order_by('id').values(*ServiceValuesSerializer.value_fields())[:size]
+    data = {'results': ServiceValuesSerializer(list(rows), many=True).data, 'next': None}
+    expected = JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == expected
+
+    def stream():
+        # serialized lazily, row by row, like a streamed response.
+        results = ServiceValuesSerializer(rows.iterator(chunk_size=2000), many=True).iter_data()
+        return b''.join(StreamingJSONRenderer().iter_render({'results': results, 'next': None}))
+    assert stream() == expected
+    return {
+        'objects': size,
+        'backend': 'orjson' if fast_json.orjson else 'json',
+        'drf_ms': best_of(repeat, lambda: JSONRenderer().render(data)),
+        'fast_ms': best_of(repeat, lambda: FastJSONRenderer().render(data)),
+        'streaming_with_query_ms': best_of(repeat, stream),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        seed(max(args.sizes))
+        report({'results': [run(size, args.repeat) for size in args.sizes]})
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
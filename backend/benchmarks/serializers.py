@@ -0,0 +1,81 @@
+"""
+Serialization of 1k/10k services: DRF ServiceSerializer vs ServiceValuesSerializer.
+Checks that both render the same bytes before timing them.
+
+    python -m benchmarks.serializers --sizes 1000 10000 --repeat 5
+"""
+import argparse
+import random
+from decimal import Decimal
+
+from .utils import Timer, report, setup_django
+
+
+def seed(count):
+    from authentication.models import User
+    from categories import registry as categories
+    from services.models import Service
+    company = User.objects.create_user(
+        email='company@example.com', username='company', password='BenDoe123!',
+        user_type='company', field_of_work=categories.get_by_name('Plumbing')
+    )
+    fields = list(categories.all())
+    Service.objects.bulk_create(
+        Service(
+            company=company, name=f'Service {index}', description='benchmark service ' * 5,
+            price_per_hour=Decimal(random.randint(100, 20000)) / 100, field=random.choice(fields)
+        )
+        for index in range(count)
+    )
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            function()
+        timings.append(timer.elapsed)
+    return round(min(timings) * 1000, 2)
+
+
+def run(size, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from services.models import Service
+    from services.serializers import ServiceSerializer, ServiceValuesSerializer
+
+    queryset = Service.objects.order_by('id')[:size]
+    instances = list(queryset)
+    rows = list(queryset.values(*ServiceValuesSerializer.value_fields()))
+    render = JSONRenderer().render
+    expected = render(ServiceSerializer(instances, many=True).data)
+    assert render(ServiceValuesSerializer(instances, many=True).data) == expected
+    assert render(ServiceValuesSerializer(rows, many=True).data) == expected
+    return {
+        'objects': size,
+        'drf_ms': best_of(repeat, lambda: ServiceSerializer(instances, many=True).data),
+        'fast_instances_ms': best_of(repeat, lambda: ServiceValuesSerializer(instances, many=True).data),
+        'fast_values_ms': best_of(repeat, lambda: ServiceValuesSerializer(rows, many=True).data),
+        # query + serialization, what the list endpoint does.
+        'drf_with_query_ms': best_of(repeat, lambda: ServiceSerializer(list(queryset), many=True).data),
+        'fast_with_query_ms': best_of(repeat, lambda: ServiceValuesSerializer(
+            list(queryset.values(*ServiceValuesSerializer.value_fields())), many=True
+        ).data),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        seed(max(args.sizes))
+        report({'results': [run(size, args.repeat) for size in args.sizes]})
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Startup of a worker: import time of backend.wsgi / backend.asgi (django.setup(), the categories
+warm-up) and latency of its first request, with the full settings and the lean API profile
+(backend/settings_api.py). Every run is a fresh python process, like an autoscaled worker.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from .utils import report, setup_django
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ('backend.settings', 'backend.settings_api')
+ENTRY_POINTS = ('wsgi', 'asgi')
+
+# runs in the worker process: imports the entry point, then sends it one authenticated request.
+PROBE = r'''
+import asyncio, importlib, io, json, os, sys, time
+started = time.perf_counter()
+application = importlib.import_module('backend.' + sys.argv[1]).application
+imported = time.perf_counter()
+headers = [(b'host', b'localhost'), (b'authorization', ('Token ' + os.environ['STARTUP_TOKEN']).encode())]
+path = '/authentication/authenticate/'
+if sys.argv[1] == 'wsgi':
+    from wsgiref.util import setup_testing_defaults
+    environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.input': io.BytesIO()}
+    environ.update(('HTTP_' + name.decode().upper(), value.decode()) for name, value in headers)
+    setup_testing_defaults(environ)
+    statuses = []
+    body = b''.join(application(environ, lambda status, response_headers: statuses.append(status)))
+    status = int(statuses[0].split()[0])
+else:
+    messages = []
+    requests = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Future()  # no disconnect, django stops listening once it answered.
+    async def send(message):
+        messages.append(message)
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'headers': headers, 'client': ('127.0.0.1', 1), 'server': ('localhost', 80),
+    }
+    asyncio.run(application(scope, receive, send))
+    status = messages[0]['status']
+answered = time.perf_counter()
+print(json.dumps({
+    'status': status,
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (answered - imported) * 1000,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def probe(profile, entry_point, database_file, token):
+    env = dict(
+        os.environ, DJANGO_SETTINGS_MODULE=profile, DB_NAME=database_file, STARTUP_TOKEN=token,
+        # the request log would be mixed with the probe's output.
+        LOG_LEVEL='WARNING', METRICS='0',
+    )
+    process = subprocess.run([sys.executable, '-c', PROBE, entry_point], cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(f'{profile} {entry_point} probe failed:\n{process.stderr}')
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    assert result['status'] == 200, result
+    return result
+
+
+def run(profile, entry_point, database_file, token, runs):
+    results = [probe(profile, entry_point, database_file, token) for _ in range(runs)]
+    return {
+        'settings': profile,
+        'entry_point': entry_point,
+        'import_ms': round(statistics.median(result['import_ms'] for result in results), 1),
+        'first_request_ms': round(statistics.median(result['first_request_ms'] for result in results), 1),
+        'modules': results[-1]['modules'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='processes per profile and entry point (median reported)')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.conf import settings
+        from .factories import seed_tokens, seed_users
+        users = seed_users(2)
+        token = seed_tokens(users[:1])[users[0].pk]
+        database_file = settings.DATABASES['default']['NAME']
+        report({'results': [
+            run(profile, entry_point, database_file, token, args.runs)
+            for profile in PROFILES for entry_point in ENTRY_POINTS
+        ]})
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
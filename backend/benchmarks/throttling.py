@@ -0,0 +1,88 @@
+"""
+Per request cost of the token bucket throttles (in-process buckets), against a 100µs budget.
+
+    python -m benchmarks.throttling --requests 20000 --clients 1000
+"""
+import argparse
+import statistics
+import time
+
+from .utils import report, setup_django
+
+BUDGET_US = 100
+
+
+def measure(throttle_class, requests):
+    timings = []
+    for request in requests:
+        start = time.perf_counter()
+        allowed = throttle_class().allow_request(request, None)
+        timings.append((time.perf_counter() - start) * 1e6)
+        assert allowed
+    timings.sort()
+    return {
+        'mean_us': round(statistics.fmean(timings), 2),
+        'p50_us': round(timings[len(timings) // 2], 2),
+        'p99_us': round(timings[int(len(timings) * 0.99)], 2),
+    }
+
+
+def run(count, clients):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from authentication.models import AuthToken
+    from backend.throttling import ApiThrottle, LoginThrottle
+
+    factory = APIRequestFactory()
+
+    def login_request(index):
+        client = index % clients
+        request = Request(
+            factory.post('/authentication/login/', {'email': f'user{client}@example.com', 'password': 'x'},
+                         format='json', REMOTE_ADDR=f'10.0.{client // 256}.{client % 256}'),
+            parsers=[JSONParser()],
+        )
+        request.data  # parsed by the view anyway, keep it out of the timing.
+        return request
+
+    def api_request(index):
+        request = Request(factory.get('/services/list/'))
+        request._user, request._auth = None, AuthToken(key=f'{index % clients:040d}')
+        return request
+
+    return {
+        'login (ip + email buckets)': measure(LoginThrottle, [login_request(index) for index in range(count)]),
+        'api (token bucket)': measure(ApiThrottle, [api_request(index) for index in range(count)]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=1000, help='distinct ips/emails/tokens')
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.test import override_settings
+        # rates high enough for every request to pass: the cost of an allowed request is the overhead.
+        rate = f'{args.requests}/min'
+        throttling = {
+            'ENABLED': True,
+            'SHARED_CACHE': None,
+            'RATES': {'login': {'ip': rate, 'email': rate}, 'api': {'token': rate}},
+        }
+        with override_settings(THROTTLING=throttling):
+            results = run(args.requests, args.clients)
+        report({
+            'budget_us': BUDGET_US,
+            'results': results,
+            'within_budget': all(result['p99_us'] < BUDGET_US for result in results.values()),
+        })
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import re
+import socket
+import sys
+import tempfile
+import time
+
+import django
+
+
+def setup_django(settings_module='backend.settings'):
+    """
+    Configure django on a temporary sqlite test database (migrated) and return a teardown callable.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    # keep the request logs out of the json report on stdout.
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    # the benchmarks hammer the api from one ip/token, benchmarks.throttling enables it itself.
+    os.environ.setdefault('THROTTLING', '0')
+    from django.conf import settings
+    # the file is shared by the hashing pool / server processes, unlike an in-memory database.
+    database_file = os.path.join(tempfile.mkdtemp(prefix='benchmarks-'), 'db.sqlite3')
+    settings.DATABASES['default']['TEST'] = {'NAME': database_file}
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return teardown
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def report(results):
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'the server did not start on port {port}')
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else None
+
+
+def latency_summary(latencies, elapsed, errors=0, queries=None):
+    """Throughput and latency percentiles (seconds in, milliseconds out) of a run."""
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+    for name, fraction in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+        value = percentile(latencies, fraction)
+        summary[name] = round(value * 1000, 2) if value is not None else None
+    if queries:
+        summary['queries_per_request'] = round(sum(queries) / len(queries), 2)
+    return summary
+
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def server_timing_queries(header):
+    """The query count of a response's Server-Timing header (backend.metrics), None without it."""
+    match = _SERVER_TIMING_QUERIES.search(header or '')
+    return int(match.group(1)) if match else None
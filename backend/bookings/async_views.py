@@ -0,0 +1,116 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+import logging
+from backend.async_api import BadRequest, error_response, parse_json_body, token_required
+from backend.renderers import FastJSONResponse
+from backend.routers import read_replica
+from backend.throttling import throttle
+from services.models import Service
+from services.pagination import InvalidCursor, apaginate_keyset
+from . import engine
+from .models import Booking
+from .serializers import (
+    AvailabilitySerializer,
+    BookingListSerializer,
+    BookingSerializer,
+    BookingValuesSerializer,
+    availability_data
+)
+from .views import user_bookings
+
+logger = logging.getLogger(__name__)
+
+# ASGI-native versions of the views in views.py, served when settings.API_MODE == 'async'.
+
+@csrf_exempt
+@require_POST
+@token_required
+@throttle('api')
+async def create_booking_view(request):
+    """
+    Booking API endpoint (costumers)
+    POST /bookings/create/
+    """
+    if request.user.user_type != 'costumer':
+        return error_response({"message": "Only costumer accounts can book a service."}, status.HTTP_403_FORBIDDEN)
+    try:
+        data = parse_json_body(request)
+    except BadRequest as error:
+        return error_response(error.detail)
+    serializer = BookingSerializer(data=data)
+    # validating the service foreign key runs a query.
+    if not await sync_to_async(serializer.is_valid)():
+        return error_response({"message": serializer.errors})
+    data = serializer.validated_data
+    try:
+        # the insert and the overlap check share a transaction, atomic() is sync only.
+        booking = await sync_to_async(engine.book)(data['service'], request.user, data['starts_at'], data['ends_at'])
+    except engine.Conflict:
+        logger.info("booking conflict", extra={'service_id': data['service'].pk})
+        return error_response({"message": "This time slot is already booked."}, status.HTTP_409_CONFLICT)
+    return FastJSONResponse(BookingValuesSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+async def list_bookings_view(request):
+    """
+    Booking list API endpoint
+    GET /bookings/list/?limit=20&cursor=...
+    """
+    params = BookingListSerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    try:
+        bookings, next_cursor = await apaginate_keyset(
+            user_bookings(request.user).values(*BookingValuesSerializer.value_fields()),
+            cursor=params.validated_data.get('cursor'),
+            page_size=params.validated_data['limit']
+        )
+    except InvalidCursor as error:
+        return error_response({"message": str(error)})
+    return FastJSONResponse(
+        {"results": BookingValuesSerializer(bookings, many=True).data, "next": next_cursor},
+        status=status.HTTP_200_OK
+    )
+
+
+@csrf_exempt
+@require_POST
+@token_required
+@throttle('api')
+async def cancel_booking_view(request, pk):
+    """
+    Booking cancellation API endpoint
+    POST /bookings/<id>/cancel/
+    """
+    booking = await Booking.objects.filter(Q(costumer=request.user) | Q(company=request.user), pk=pk).afirst()
+    if booking is None:
+        return error_response({"detail": "No Booking matches the given query."}, status.HTTP_404_NOT_FOUND)
+    await engine.acancel(booking)
+    return FastJSONResponse(BookingValuesSerializer(booking).data, status=status.HTTP_200_OK)
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+async def availability_view(request):
+    """
+    Availability API endpoint
+    GET /bookings/availability/?service=12&start=2026-11-02T08:00:00Z&end=2026-11-02T18:00:00Z
+    """
+    params = AvailabilitySerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    data = params.validated_data
+    company_id = await Service.objects.filter(pk=data['service']).values_list('company_id', flat=True).afirst()
+    if company_id is None:
+        return error_response({"message": "Service not found."}, status.HTTP_404_NOT_FOUND)
+    busy, free = await engine.aavailability(company_id, data['start'], data['end'])
+    return FastJSONResponse(availability_data(data['service'], busy, free), status=status.HTTP_200_OK)
@@ -0,0 +1,112 @@
+"""
+Booking and availability of the service hours: a company serves one confirmed booking at a time.
+
+Double bookings are refused by the database, without a table lock:
+- postgres: the booking_no_overlap exclusion constraint (migration 0002, a GiST index over the
+  company and tstzrange(starts_at, ends_at)), the second of two concurrent overlapping inserts
+  fails with an IntegrityError.
+- sqlite: the writers take the database lock one at a time. The booking is inserted first and the
+  overlap check runs after it in the same transaction, so an overlapping booking either committed
+  before (the check sees it) or waits for this transaction to end.
+The checks and the availability are range scans of the (company, starts_at) index of the confirmed
+bookings: no booking lasts more than MAX_DURATION, so every booking overlapping [start, end)
+starts in (start - MAX_DURATION, end).
+"""
+from datetime import timedelta
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from .models import Booking
+
+MAX_DURATION = timedelta(hours=12)
+MAX_WINDOW = timedelta(days=31)
+EXCLUSION_CONSTRAINT = 'booking_no_overlap'
+
+
+class Conflict(Exception):
+    """The slot overlaps a confirmed booking of the company."""
+
+
+def uses_exclusion_constraint(using):
+    return connections[using].vendor == 'postgresql'
+
+
+def overlapping(queryset, starts_at, ends_at):
+    """The confirmed bookings of queryset overlapping [starts_at, ends_at)."""
+    return queryset.filter(
+        status=Booking.CONFIRMED,
+        starts_at__gt=starts_at - MAX_DURATION, starts_at__lt=ends_at,
+        ends_at__gt=starts_at,
+    )
+
+
+def book(service, costumer, starts_at, ends_at, using=DEFAULT_DB_ALIAS):
+    """Book [starts_at, ends_at) of service for costumer, raises Conflict when the company is busy."""
+    bookings = Booking.objects.using(using)
+    try:
+        with transaction.atomic(using=using):
+            booking = bookings.create(
+                service=service, company_id=service.company_id, costumer=costumer,
+                starts_at=starts_at, ends_at=ends_at,
+            )
+            if not uses_exclusion_constraint(using):
+                others = bookings.filter(company_id=service.company_id).exclude(pk=booking.pk)
+                if overlapping(others, starts_at, ends_at).exists():
+                    # rolls the insert back.
+                    raise Conflict()
+    except IntegrityError as error:
+        if EXCLUSION_CONSTRAINT in str(error):
+            raise Conflict() from error
+        raise
+    return booking
+
+
+def cancel(booking, using=DEFAULT_DB_ALIAS):
+    """Free the slot of booking, False when it was already cancelled."""
+    cancelled = _confirmed(booking, using).update(status=Booking.CANCELLED)
+    booking.status = Booking.CANCELLED
+    return bool(cancelled)
+
+
+async def acancel(booking, using=DEFAULT_DB_ALIAS):
+    cancelled = await _confirmed(booking, using).aupdate(status=Booking.CANCELLED)
+    booking.status = Booking.CANCELLED
+    return bool(cancelled)
+
+
+def _confirmed(booking, using):
+    # conditional, a concurrent cancel writes it once.
+    return Booking.objects.using(using).filter(pk=booking.pk, status=Booking.CONFIRMED)
+
+
+def busy_queryset(company_id, starts_at, ends_at):
+    bookings = overlapping(Booking.objects.filter(company_id=company_id), starts_at, ends_at)
+    return bookings.order_by('starts_at').values_list('starts_at', 'ends_at')
+
+
+def availability(company_id, starts_at, ends_at):
+    """(busy, free) intervals of the company in the window [starts_at, ends_at)."""
+    return split_window(busy_queryset(company_id, starts_at, ends_at), starts_at, ends_at)
+
+
+async def aavailability(company_id, starts_at, ends_at):
+    busy = [interval async for interval in busy_queryset(company_id, starts_at, ends_at)]
+    return split_window(busy, starts_at, ends_at)
+
+
+def split_window(bookings, starts_at, ends_at):
+    """The merged (start, end) of the bookings clipped to the window, and the gaps between them."""
+    busy = []
+    for start, end in bookings:
+        start, end = max(start, starts_at), min(end, ends_at)
+        if busy and start <= busy[-1][1]:
+            busy[-1] = (busy[-1][0], max(busy[-1][1], end))
+        else:
+            busy.append((start, end))
+    free = []
+    cursor = starts_at
+    for start, end in busy:
+        if start > cursor:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < ends_at:
+        free.append((cursor, ends_at))
+    return busy, free
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# must stay in sync with bookings.engine.EXCLUSION_CONSTRAINT. btree_gist lets the GiST index
+# compare the company ids with =, next to the && of the ranges.
+CREATE_CONSTRAINT = """
+ALTER TABLE bookings_booking ADD CONSTRAINT booking_no_overlap EXCLUDE USING gist (
+    company_id WITH =,
+    tstzrange(starts_at, ends_at, '[)') WITH &&
+) WHERE (status = 'confirmed')
+"""
+
+
+# postgres only, on sqlite bookings.engine checks the overlaps itself.
+def create_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        schema_editor.execute(CREATE_CONSTRAINT)
+
+
+def drop_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS booking_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_exclusion_constraint, drop_exclusion_constraint),
+    ]
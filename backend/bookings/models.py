@@ -0,0 +1,42 @@
+from django.db import models
+from authentication.models import User
+from services.models import Service
+
+
+# hours of a service booked by a costumer. A company serves one confirmed booking at a time,
+# see bookings/engine.py for how the overlaps are refused.
+class Booking(models.Model):
+    CONFIRMED = 'confirmed'
+    CANCELLED = 'cancelled'
+    STATUS_CHOICES = (
+        (CONFIRMED, 'Confirmed'),
+        (CANCELLED, 'Cancelled'),
+    )
+
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='bookings')
+    # the service's company, copied so the overlap checks don't join the services.
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='company_bookings', db_index=False)
+    costumer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='bookings', db_index=False)
+    # [starts_at, ends_at), a booking ending at 10:00 doesn't overlap one starting at 10:00.
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=CONFIRMED)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(ends_at__gt=models.F('starts_at')), name='booking_ends_after_start'),
+            # postgres also has the booking_no_overlap exclusion constraint, created by migration 0002.
+        ]
+        indexes = [
+            # the overlap checks and the availability: range scans of a company's confirmed bookings.
+            models.Index(
+                fields=['company', 'starts_at'], condition=models.Q(status='confirmed'), name='booking_company_starts_idx'
+            ),
+            # the booking lists, newest first.
+            models.Index(fields=['company', 'created_at'], name='booking_company_created_idx'),
+            models.Index(fields=['costumer', 'created_at'], name='booking_costumer_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.service_id} {self.starts_at:%Y-%m-%d %H:%M}-{self.ends_at:%H:%M}'
@@ -0,0 +1,67 @@
+from django.utils import timezone
+from rest_framework import serializers
+from backend.fast_serializers import ValuesSerializer
+from services.models import Service
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .engine import MAX_DURATION, MAX_WINDOW
+from .models import Booking
+
+
+def validate_interval(starts_at, ends_at, max_length, message):
+    if ends_at <= starts_at:
+        raise serializers.ValidationError("The end must be after the start.")
+    if ends_at - starts_at > max_length:
+        raise serializers.ValidationError(message)
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    # fetched anyway, the booking needs its company.
+    service = serializers.PrimaryKeyRelatedField(queryset=Service.objects.only('id', 'company_id'))
+
+    class Meta:
+        model = Booking
+        fields = ['id', 'service', 'company', 'costumer', 'starts_at', 'ends_at', 'status', 'created_at']
+        read_only_fields = ['id', 'company', 'costumer', 'status', 'created_at']
+
+    def validate(self, attrs):
+        validate_interval(
+            attrs['starts_at'], attrs['ends_at'], MAX_DURATION,
+            f"A booking lasts {MAX_DURATION.total_seconds() / 3600:g} hours at most."
+        )
+        if attrs['starts_at'] < timezone.now():
+            raise serializers.ValidationError("The booking can't start in the past.")
+        return attrs
+
+
+# same output as BookingSerializer, for the booking lists.
+class BookingValuesSerializer(ValuesSerializer):
+    serializer_class = BookingSerializer
+
+
+# query parameters of the booking list:
+class BookingListSerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE)
+
+
+_datetime = serializers.DateTimeField()
+
+
+def availability_data(service_id, busy, free):
+    """Response of the availability endpoint, the (start, end) intervals of engine.availability()."""
+    def intervals(values):
+        return [{"start": _datetime.to_representation(start), "end": _datetime.to_representation(end)} for start, end in values]
+    return {"service": service_id, "busy": intervals(busy), "free": intervals(free)}
+
+
+# query parameters of the availability endpoint:
+class AvailabilitySerializer(serializers.Serializer):
+    service = serializers.IntegerField(min_value=1)
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        validate_interval(
+            attrs['start'], attrs['end'], MAX_WINDOW, f"The window spans {MAX_WINDOW.days} days at most."
+        )
+        return attrs
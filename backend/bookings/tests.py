@@ -0,0 +1,146 @@
+import json
+from datetime import datetime, timedelta, timezone
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone as django_timezone
+from authentication.models import AuthToken
+from backend.testing import api_mode
+from benchmarks.factories import seed_services, seed_users
+from categories import registry as categories
+from services.models import Service
+from . import engine
+from .models import Booking
+
+MODES = ('sync', 'async')
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class BookingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        company, cls.costumer, cls.other = seed_users(3, companies_ratio=1 / 3)
+        seed_services([company], 2)
+        cls.service, cls.other_service = Service.objects.order_by('pk')
+        cls.tokens = {user.pk: AuthToken.objects.issue(user).key for user in (company, cls.costumer, cls.other)}
+        cls.company = company
+
+    def setUp(self):
+        # 00:00 UTC the day after tomorrow, a day of its own per API mode.
+        today = django_timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self.days = {mode: today + timedelta(days=2 + index) for index, mode in enumerate(MODES)}
+
+    def at(self, mode, hour, minute=0):
+        return self.days[mode] + timedelta(hours=hour, minutes=minute)
+
+    def post(self, user, path, data=None):
+        return self.client.post(
+            path, json.dumps(data or {}), content_type='application/json',
+            headers={'Authorization': f'Token {self.tokens[user.pk]}'}
+        )
+
+    def book(self, mode, start, end, user=None, service=None):
+        return self.post(user or self.costumer, '/bookings/create/', {
+            'service': (service or self.service).pk,
+            'starts_at': self.at(mode, *start).isoformat(), 'ends_at': self.at(mode, *end).isoformat(),
+        })
+
+    def intervals(self, data):
+        return [(datetime.fromisoformat(interval['start']), datetime.fromisoformat(interval['end'])) for interval in data]
+
+    def test_overlap(self):
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                self.assertEqual(self.book(mode, (9,), (11,)).status_code, 201)
+                for start, end in (((10,), (12,)), ((8,), (9, 30)), ((9, 30), (10, 30)), ((8,), (12,))):
+                    response = self.book(mode, start, end, user=self.other)
+                    self.assertEqual(response.status_code, 409, (start, end, response.content))
+                # the company is busy, whichever of its services is booked.
+                self.assertEqual(self.book(mode, (10,), (12,), service=self.other_service).status_code, 409)
+        self.assertEqual(Booking.objects.count(), 2)
+
+    def test_back_to_back(self):
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                self.assertEqual(self.book(mode, (9,), (10,)).status_code, 201)
+                self.assertEqual(self.book(mode, (10,), (11,), user=self.other).status_code, 201)
+                self.assertEqual(self.book(mode, (8,), (9,), user=self.other).status_code, 201)
+
+    def test_cancel_frees_the_slot(self):
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                booking = self.book(mode, (9,), (11,)).json()
+                self.assertEqual(self.book(mode, (9,), (11,), user=self.other).status_code, 409)
+                response = self.post(self.costumer, f"/bookings/{booking['id']}/cancel/")
+                self.assertEqual(response.status_code, 200, response.content)
+                self.assertEqual(response.json()['status'], Booking.CANCELLED)
+                self.assertEqual(self.book(mode, (9,), (11,), user=self.other).status_code, 201)
+
+    def test_cancel_by_someone_else(self):
+        booking = self.book('sync', (9,), (11,)).json()
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                self.assertEqual(self.post(self.other, f"/bookings/{booking['id']}/cancel/").status_code, 404)
+        self.assertEqual(Booking.objects.get(pk=booking['id']).status, Booking.CONFIRMED)
+
+    def test_company_forbidden(self):
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                self.assertEqual(self.book(mode, (9,), (11,), user=self.company).status_code, 403)
+
+    def test_invalid_slots(self):
+        # 00:00 yesterday.
+        yesterday = {'sync': -72, 'async': -96}
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                for start, end in (((8,), (20, 1)), ((yesterday[mode],), (yesterday[mode] + 1,)), ((10,), (10,)), ((11,), (10,))):
+                    response = self.book(mode, start, end)
+                    self.assertEqual(response.status_code, 400, (start, end, response.content))
+                # 12 hours exactly is fine.
+                self.assertEqual(self.book(mode, (8,), (20,)).status_code, 201)
+
+    def test_availability(self):
+        self.book('sync', (9,), (11,))
+        self.book('sync', (11,), (12,), user=self.other)
+        params = {'service': self.other_service.pk, 'start': self.at('sync', 8).isoformat(), 'end': self.at('sync', 18).isoformat()}
+        for mode in MODES:
+            with self.subTest(mode=mode), api_mode(mode):
+                response = self.client.get(
+                    '/bookings/availability/', params, headers={'Authorization': f'Token {self.tokens[self.other.pk]}'}
+                )
+                self.assertEqual(response.status_code, 200, response.content)
+                data = response.json()
+                self.assertEqual(self.intervals(data['busy']), [(self.at('sync', 9), self.at('sync', 12))])
+                self.assertEqual(self.intervals(data['free']), [
+                    (self.at('sync', 8), self.at('sync', 9)), (self.at('sync', 12), self.at('sync', 18))
+                ])
+
+
+class SplitWindowTests(SimpleTestCase):
+    DAY = datetime(2026, 11, 2, tzinfo=timezone.utc)
+
+    def hours(self, *intervals):
+        return [(self.DAY + timedelta(hours=start), self.DAY + timedelta(hours=end)) for start, end in intervals]
+
+    def split(self, bookings, window=(8, 18)):
+        return engine.split_window(self.hours(*bookings), *(self.DAY + timedelta(hours=hour) for hour in window))
+
+    def test_empty(self):
+        self.assertEqual(self.split([]), ([], self.hours((8, 18))))
+
+    def test_merged(self):
+        cases = [
+            # overlapping, nested, touching.
+            ([(9, 11), (10, 12)], [(9, 12)], [(8, 9), (12, 18)]),
+            ([(9, 14), (10, 11), (12, 13)], [(9, 14)], [(8, 9), (14, 18)]),
+            ([(9, 10), (10, 11), (13, 14)], [(9, 11), (13, 14)], [(8, 9), (11, 13), (14, 18)]),
+            # a longer booking starting first, then a shorter one inside it and one after.
+            ([(9, 15), (10, 12), (14, 16)], [(9, 16)], [(8, 9), (16, 18)]),
+        ]
+        for bookings, busy, free in cases:
+            with self.subTest(bookings=bookings):
+                self.assertEqual(self.split(bookings), (self.hours(*busy), self.hours(*free)))
+
+    def test_clipped_to_the_window(self):
+        self.assertEqual(self.split([(6, 9), (17, 20)]), (self.hours((8, 9), (17, 18)), self.hours((9, 17))))
+        self.assertEqual(self.split([(6, 20)]), (self.hours((8, 18)), []))
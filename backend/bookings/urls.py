@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.urls import path
+from . import views
+
+# same urls, served by the async (ASGI-native) views when API_MODE is 'async'.
+if settings.API_MODE == 'async':
+    from . import async_views as views
+
+urlpatterns = [
+    path('create/', views.create_booking_view, name='create_booking'),
+    path('list/', views.list_bookings_view, name='list_bookings'),
+    path('<int:pk>/cancel/', views.cancel_booking_view, name='cancel_booking'),
+    path('availability/', views.availability_view, name='availability')
+]
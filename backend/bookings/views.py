@@ -0,0 +1,119 @@
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+import logging
+from backend.routers import read_replica
+from services.models import Service
+from services.pagination import InvalidCursor, paginate_keyset
+from . import engine
+from .models import Booking
+from .serializers import (
+    AvailabilitySerializer,
+    BookingListSerializer,
+    BookingSerializer,
+    BookingValuesSerializer,
+    availability_data
+)
+
+logger = logging.getLogger(__name__)
+
+
+def user_bookings(user):
+    # a costumer sees what they booked, a company what was booked from it.
+    if user.user_type == 'company':
+        return Booking.objects.filter(company=user)
+    return Booking.objects.filter(costumer=user)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def create_booking_view(request):
+    """
+    Booking API endpoint (costumers)
+    POST /bookings/create/
+    {
+        "service": 12,
+        "starts_at": "2026-11-02T09:00:00Z",
+        "ends_at": "2026-11-02T11:00:00Z"
+    }
+    Returns the booking, or a 409 when the service's company is already booked in that time.
+    """
+    if request.user.user_type != 'costumer':
+        return Response({"message": "Only costumer accounts can book a service."}, status=status.HTTP_403_FORBIDDEN)
+    serializer = BookingSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({"message": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    try:
+        booking = engine.book(data['service'], request.user, data['starts_at'], data['ends_at'])
+    except engine.Conflict:
+        logger.info("booking conflict", extra={'service_id': data['service'].pk})
+        return Response({"message": "This time slot is already booked."}, status=status.HTTP_409_CONFLICT)
+    return Response(BookingValuesSerializer(booking).data, status=status.HTTP_201_CREATED)
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_bookings_view(request):
+    """
+    Booking list API endpoint
+    GET /bookings/list/?limit=20&cursor=...
+    Returns the bookings of request.user (costumer) or of its services (company), newest first.
+    """
+    params = BookingListSerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        bookings, next_cursor = paginate_keyset(
+            user_bookings(request.user).values(*BookingValuesSerializer.value_fields()),
+            cursor=params.validated_data.get('cursor'),
+            page_size=params.validated_data['limit']
+        )
+    except InvalidCursor as error:
+        return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {"results": BookingValuesSerializer(bookings, many=True).data, "next": next_cursor},
+        status=status.HTTP_200_OK
+    )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def cancel_booking_view(request, pk):
+    """
+    Booking cancellation API endpoint, by its costumer or its company
+    POST /bookings/<id>/cancel/
+    Frees the time slot, returns the cancelled booking.
+    """
+    booking = get_object_or_404(
+        Booking.objects.filter(Q(costumer=request.user) | Q(company=request.user)), pk=pk
+    )
+    engine.cancel(booking)
+    return Response(BookingValuesSerializer(booking).data, status=status.HTTP_200_OK)
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def availability_view(request):
+    """
+    Availability API endpoint
+    GET /bookings/availability/?service=12&start=2026-11-02T08:00:00Z&end=2026-11-02T18:00:00Z
+    Returns the busy and free intervals of the service's company in [start, end), 31 days at most.
+    """
+    params = AvailabilitySerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    data = params.validated_data
+    company_id = Service.objects.filter(pk=data['service']).values_list('company_id', flat=True).first()
+    if company_id is None:
+        return Response({"message": "Service not found."}, status=status.HTTP_404_NOT_FOUND)
+    busy, free = engine.availability(company_id, data['start'], data['end'])
+    return Response(availability_data(data['service'], busy, free), status=status.HTTP_200_OK)
@@ -0,0 +1,30 @@
+from rest_framework import serializers
+from . import registry
+from .models import Category
+
+
+class CategoryField(serializers.Field):
+    """
+    A Category foreign key, read and written as the category name (the API never sees the ids),
+    mapped by the in-process registry without a query.
+    """
+    # backend.fast_serializers: to_representation also takes the bare id of a .values() row.
+    accepts_column_values = True
+    default_error_messages = {
+        'invalid_choice': '"{input}" is not a valid choice.',
+    }
+
+    def get_attribute(self, instance):
+        # the id column, instance.<field> would fetch the Category.
+        return getattr(instance, f'{self.source}_id')
+
+    def to_representation(self, value):
+        if isinstance(value, Category):
+            return value.name
+        return registry.name_of(value)
+
+    def to_internal_value(self, data):
+        category = registry.get_by_name(data) if isinstance(data, str) else None
+        if category is None:
+            self.fail('invalid_choice', input=data)
+        return category
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+# the union of the former Service.choices and User.FIELD_OF_WORK_CHOICES, 'House Keeping' merged into 'Housekeeping'.
+CATEGORIES = [
+    'Air Conditioner',
+    'All in One',
+    'Carpentry',
+    'Electricity',
+    'Gardening',
+    'Home Machines',
+    'Housekeeping',
+    'Interior Design',
+    'Locks',
+    'Painting',
+    'Plumbing',
+    'Water Heaters',
+]
+
+
+def create_categories(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    Category.objects.using(schema_editor.connection.alias).bulk_create([Category(name=name) for name in CATEGORIES])
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=30, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+            },
+        ),
+        migrations.RunPython(create_categories, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+# the service categories, shared by Service.field and User.field_of_work: the rows store a small
+# integer, the name lives once here. Read them through categories.registry, not this table.
+class Category(models.Model):
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=30, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'categories'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,119 @@
+"""
+In-process cache of the Category table.
+
+A dozen rows that practically never change, while every catalog request reads or writes a
+category: each process loads them once (at startup, see backend/wsgi.py and backend/asgi.py)
+and the serializers map names <-> ids from memory, without a query or a join.
+- an id missing from the cache (a category created by another process) reloads it,
+  an unknown name at most once per NAME_RELOAD_INTERVAL (it's user input),
+- saving or deleting a Category reloads the cache of its process (categories/signals.py),
+  the other workers see a renamed category after their next restart.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.db import DatabaseError, connections
+from .models import Category
+
+logger = logging.getLogger(__name__)
+
+# the former spellings, still accepted as input ('House Keeping' was the Service.field one).
+ALIASES = {'House Keeping': 'Housekeeping'}
+NAME_RELOAD_INTERVAL = 60  # seconds
+
+
+class _Snapshot:
+    __slots__ = ('categories', 'by_id', 'by_name', 'etag', 'loaded_at')
+
+    def __init__(self, categories):
+        self.categories = tuple(sorted(categories, key=lambda category: category.name))
+        self.by_id = {category.pk: category for category in self.categories}
+        self.by_name = {category.name: category for category in self.categories}
+        raw = '|'.join(f'{category.pk}={category.name}' for category in self.categories)
+        self.etag = '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+        self.loaded_at = time.monotonic()
+
+
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _fetch():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return list(Category.objects.all())
+    # an async view: the ORM refuses to run in the event loop thread, the rare (re)load
+    # runs in a thread of its own and blocks the loop for a moment instead.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_fetch_in_thread).result()
+
+
+def _fetch_in_thread():
+    try:
+        return list(Category.objects.all())
+    finally:
+        connections.close_all()
+
+
+def load():
+    """(Re)load the categories from the database."""
+    global _snapshot
+    with _lock:
+        _snapshot = _Snapshot(_fetch())
+    return _snapshot
+
+
+def warm():
+    """Load at startup, a database without the table yet (before migrate) loads at first use instead."""
+    try:
+        load()
+    except DatabaseError:
+        logger.warning("categories not loaded at startup", exc_info=True)
+
+
+def clear():
+    global _snapshot
+    _snapshot = None
+
+
+def _current():
+    snapshot = _snapshot
+    return snapshot if snapshot is not None else load()
+
+
+def all():
+    """The categories, by name."""
+    return _current().categories
+
+
+def etag():
+    return _current().etag
+
+
+def get(pk):
+    """The Category of id pk, None when there's none."""
+    if pk is None:
+        return None
+    category = _current().by_id.get(pk)
+    if category is None:
+        category = load().by_id.get(pk)
+    return category
+
+
+def get_by_name(name):
+    """The Category named `name` (or one of its ALIASES), None when there's none."""
+    name = ALIASES.get(name, name)
+    snapshot = _current()
+    category = snapshot.by_name.get(name)
+    if category is None and time.monotonic() - snapshot.loaded_at > NAME_RELOAD_INTERVAL:
+        category = load().by_name.get(name)
+    return category
+
+
+def name_of(pk):
+    category = get(pk)
+    return category.name if category is not None else None
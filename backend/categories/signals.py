@@ -0,0 +1,12 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from . import registry
+from .models import Category
+
+
+# reloads the categories of this process, the other workers see a renamed one after a restart.
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reload_registry(sender, using, **kwargs):
+    transaction.on_commit(registry.clear, using=using)
@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from unittest import mock
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import serializers
+from . import registry
+from .fields import CategoryField
+from .models import Category
+
+
+class CategoryMigrationTests(TransactionTestCase):
+    """services 0006-0008 and authentication 0004-0006: the field names become Category foreign keys."""
+    # the categories seeded by categories 0001 are restored for the next tests.
+    serialized_rollback = True
+
+    before = [('services', '0005_service_location'), ('authentication', '0003_auth_token')]
+    after = [('services', '0008_category_foreign_keys'), ('authentication', '0006_field_of_work_foreign_key')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('authentication', 'User')
+        Service = apps.get_model('services', 'Service')
+        ServiceStats = apps.get_model('services', 'ServiceStats')
+        self.company = User.objects.create(
+            email='company@example.com', username='company', user_type='company', field_of_work='House Keeping'
+        ).pk
+        self.costumer = User.objects.create(
+            email='costumer@example.com', username='costumer', user_type='costumer', date_of_birth='1990-01-01'
+        ).pk
+        for field in ('House Keeping', 'Plumbing', 'Underwater Welding'):
+            Service.objects.create(company_id=self.company, name=field, description='d', price_per_hour=10, field=field)
+            ServiceStats.objects.create(
+                company_id=self.company, field=field, count=1, price_sum=10, price_min=10, price_max=10,
+                last_activity_at=timezone.now(),
+            )
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        registry.clear()
+
+    def test_forward_and_back(self):
+        apps = self.migrate(self.after)
+        Category = apps.get_model('categories', 'Category')
+        User = apps.get_model('authentication', 'User')
+        seeded = dict(Category.objects.values_list('name', 'pk'))
+        # the former spelling is merged, an unknown name gets a category of its own.
+        self.assertNotIn('House Keeping', seeded)
+        self.assertIn('Underwater Welding', seeded)
+        self.assertEqual(len(seeded), 13)
+        names = {'House Keeping': 'Housekeeping', 'Plumbing': 'Plumbing', 'Underwater Welding': 'Underwater Welding'}
+        for model_name in ('Service', 'ServiceStats'):
+            rows = apps.get_model('services', model_name).objects
+            self.assertEqual(
+                sorted(rows.values_list('field_id', flat=True)), sorted(seeded[name] for name in names.values())
+            )
+        self.assertEqual(
+            dict(apps.get_model('services', 'Service').objects.values_list('name', 'field__name')), names
+        )
+        self.assertEqual(User.objects.get(pk=self.company).field_of_work_id, seeded['Housekeeping'])
+        self.assertIsNone(User.objects.get(pk=self.costumer).field_of_work_id)
+
+        apps = self.migrate(self.before)
+        User = apps.get_model('authentication', 'User')
+        self.assertEqual(
+            dict(apps.get_model('services', 'Service').objects.values_list('name', 'field')),
+            names
+        )
+        self.assertEqual(
+            sorted(apps.get_model('services', 'ServiceStats').objects.values_list('field', flat=True)),
+            sorted(names.values())
+        )
+        self.assertEqual(User.objects.get(pk=self.company).field_of_work, 'Housekeeping')
+        self.assertIsNone(User.objects.get(pk=self.costumer).field_of_work)
+
+
+class CategorySerializer(serializers.Serializer):
+    field = CategoryField()
+
+
+class CategoryFieldTests(TestCase):
+
+    def setUp(self):
+        registry.load()
+
+    def tearDown(self):
+        registry.clear()
+
+    def test_round_trip(self):
+        for category in Category.objects.all():
+            with self.subTest(name=category.name):
+                # a model instance: the id column.
+                self.assertEqual(CategorySerializer(SimpleNamespace(field_id=category.pk)).data, {'field': category.name})
+                serializer = CategorySerializer(data={'field': category.name})
+                self.assertTrue(serializer.is_valid(), serializer.errors)
+                self.assertEqual(serializer.validated_data['field'], category)
+
+    def test_column_value(self):
+        # the bare id of a .values() row, named from memory.
+        plumbing = Category.objects.get(name='Plumbing')
+        with self.assertNumQueries(0):
+            self.assertEqual(CategoryField().to_representation(plumbing.pk), 'Plumbing')
+
+    def test_alias(self):
+        serializer = CategorySerializer(data={'field': 'House Keeping'})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['field'].name, 'Housekeeping')
+
+    def test_unknown_name_rejected(self):
+        for value in ('Underwater Welding', 'plumbing', 3, None):
+            with self.subTest(value=value):
+                serializer = CategorySerializer(data={'field': value})
+                self.assertFalse(serializer.is_valid())
+                self.assertIn('field', serializer.errors)
+
+    def test_unknown_name_reload(self):
+        # created by another process: no signal reloads this one.
+        Category.objects.bulk_create([Category(name='Underwater Welding')])
+        # user input, the registry isn't reloaded more than once per NAME_RELOAD_INTERVAL.
+        with self.assertNumQueries(0):
+            self.assertIsNone(registry.get_by_name('Underwater Welding'))
+        with mock.patch.object(registry, 'NAME_RELOAD_INTERVAL', 0), self.assertNumQueries(1):
+            self.assertEqual(registry.get_by_name('Underwater Welding').name, 'Underwater Welding')
+
+    def test_unknown_id_reload(self):
+        Category.objects.bulk_create([Category(name='Underwater Welding')])
+        category = Category.objects.get(name='Underwater Welding')
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.get(category.pk), category)
+        with self.assertNumQueries(0):
+            self.assertEqual(CategoryField().to_representation(category.pk), 'Underwater Welding')
+
+    def test_saved_category_reloads(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            category = Category.objects.create(name='Underwater Welding')
+        with self.assertNumQueries(1):
+            self.assertEqual(registry.get_by_name('Underwater Welding'), category)
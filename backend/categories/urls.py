@@ -0,0 +1,7 @@
+from django.urls import path
+from . import views
+
+# no async variant, the view does no I/O: it runs as is under both API modes.
+urlpatterns = [
+    path('', views.categories_view, name='categories'),
+]
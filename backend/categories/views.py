@@ -0,0 +1,33 @@
+from django.utils.cache import patch_cache_control
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from . import registry
+
+# the categories change with a deploy at most, the clients and proxies keep them a day.
+CACHE_MAX_AGE = 24 * 60 * 60
+
+
+# no authentication: the registration forms need them. Served from memory, no query.
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@throttle_classes([])
+def categories_view(request):
+    """
+    Categories API endpoint
+    GET /categories/
+    Returns the names of the service categories, the values of a service's field and of a company's field_of_work.
+    """
+    etag = registry.etag()
+    if request.headers.get('If-None-Match') == etag:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(
+            {"results": [category.name for category in registry.all()]},
+            status=status.HTTP_200_OK
+        )
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=CACHE_MAX_AGE)
+    return response
@@ -0,0 +1,225 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+import logging
+from backend.routers import read_replica
+from backend.throttling import throttle
+from backend.async_api import BadRequest, error_response, parse_json_body, staff_required, token_required
+from backend.renderers import FastJSONResponse
+from backend import exporting
+from django.conf import settings
+from django.db import router
+from .cache import acached_catalog_response
+from .models import Service, ServiceStats
+from .pagination import apaginate_keyset, apaginate_distance, InvalidCursor
+from .serializers import (
+    ServiceSerializer,
+    ServiceValuesSerializer,
+    ServiceFilterSerializer,
+    ServiceSearchSerializer,
+    ServiceStatsSerializer,
+    ServiceNearbySerializer,
+    ServiceNearbyValuesSerializer,
+    ServiceFeedSerializer
+)
+from .search import search_services
+from . import feed, geo, stats
+# the streamed import reads the body synchronously, django runs it in a thread under ASGI.
+from .views import bulk_create_services_view  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# ASGI-native versions of the views in views.py, served when settings.API_MODE == 'async'.
+
+@csrf_exempt
+@require_POST
+@token_required
+@throttle('api')
+async def create_service_view(request):
+    try:
+        data = parse_json_body(request)
+    except BadRequest as error:
+        return error_response(error.detail)
+    data['company'] = request.user.id
+    serialized_service = ServiceSerializer(data=data)
+    # validating the company foreign key runs a query.
+    if await sync_to_async(serialized_service.is_valid)():
+        await Service.objects.acreate(**serialized_service.validated_data)
+        return FastJSONResponse(
+            {"message": "Service created successfully"},
+            status=status.HTTP_201_CREATED
+        )
+    logger.info("service creation rejected", extra={'errors': serialized_service.errors})
+    return error_response({"message": serialized_service.errors})
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+@acached_catalog_response
+async def list_services_view(request):
+    """
+    Service catalog API endpoint
+    GET /services/list/?field=Plumbing&min_price=10&max_price=50&company=3&specialists=true&limit=20&cursor=...
+    """
+    filters = ServiceFilterSerializer(data=request.GET)
+    if not filters.is_valid():
+        return error_response({"message": filters.errors})
+    # plain rows for the fast serializer, no model instances.
+    queryset = filters.filter_queryset(Service.objects.values(*ServiceValuesSerializer.value_fields(filters.expand_company)))
+    try:
+        services, next_cursor = await apaginate_keyset(
+            queryset,
+            cursor=filters.validated_data.get('cursor'),
+            page_size=filters.validated_data['limit']
+        )
+    except InvalidCursor as error:
+        return error_response({"message": str(error)})
+    return FastJSONResponse(
+        {
+            "results": ServiceValuesSerializer(services, many=True, expand_company=filters.expand_company).data,
+            "next": next_cursor
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+@acached_catalog_response
+async def search_services_view(request):
+    """
+    Service search API endpoint
+    GET /services/search/?q=leaking pipe&field=Plumbing&min_price=10&max_price=50&page=1&limit=20
+    """
+    params = ServiceSearchSerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    page, limit = params.validated_data['page'], params.validated_data['limit']
+    # the ranking query is raw SQL on a database cursor, which has no async api.
+    services = await sync_to_async(search_services)(
+        params.validated_data['q'], params.validated_data, limit=limit + 1, offset=(page - 1) * limit,
+        expand_company=params.expand_company
+    )
+    return FastJSONResponse(
+        {
+            "results": ServiceValuesSerializer(services[:limit], many=True, expand_company=params.expand_company).data,
+            "page": page,
+            "next": page + 1 if len(services) > limit and page < params.fields['page'].max_value else None
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+async def nearby_services_view(request):
+    """
+    Nearby services API endpoint
+    GET /services/nearby/?lat=48.85&lng=2.35&radius=10&field=Plumbing&min_price=10&max_price=50&limit=20&cursor=...
+    """
+    params = ServiceNearbySerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    data = params.validated_data
+    queryset = params.filter_queryset(Service.objects.values(*ServiceValuesSerializer.value_fields(params.expand_company)))
+    try:
+        services, next_cursor = await apaginate_distance(
+            geo.nearby(queryset, data['lat'], data['lng'], data['radius']),
+            cursor=data.get('cursor'),
+            page_size=data['limit']
+        )
+    except InvalidCursor as error:
+        return error_response({"message": str(error)})
+    return FastJSONResponse(
+        {
+            "results": ServiceNearbyValuesSerializer(services, many=True, expand_company=params.expand_company).data,
+            "next": next_cursor
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@require_GET
+@token_required
+@throttle('api')
+async def company_dashboard_view(request):
+    """
+    Company dashboard API endpoint
+    GET /services/dashboard/
+    """
+    if request.user.user_type != 'company':
+        return error_response({"message": "Only company accounts have a dashboard."}, status.HTTP_403_FORBIDDEN)
+    groups = [group async for group in ServiceStats.objects.filter(company=request.user).order_by('field')]
+    return FastJSONResponse(
+        {
+            "total": ServiceStatsSerializer(stats.total(groups)).data,
+            "fields": ServiceStatsSerializer(groups, many=True).data
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@require_GET
+@token_required
+@staff_required
+@throttle('api')
+async def export_services_view(request):
+    """
+    Service export API endpoint (staff)
+    GET /services/export/?output=csv|ndjson|json&since=2026-01-01T00:00:00Z&until=...
+    """
+    params = exporting.ExportParamsSerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    return exporting.streaming_response(
+        exporting.get_exports()['services'], params.validated_data, using=router.db_for_read(Service), asynchronous=True
+    )
+
+
+# served by this view in both API modes but only by the ASGI application, see services/feed.py
+# (no @read_replica: a lagging replica would replay less than the events the client missed).
+@require_GET
+@token_required
+@throttle('api')
+async def feed_services_view(request):
+    """
+    Live feed of the created and updated services, as Server-Sent Events
+    GET /services/feed/?field=Plumbing
+    Last-Event-ID: <id of the last event received>, to replay the ones missed while disconnected.
+    """
+    if not isinstance(request, ASGIRequest):
+        # a WSGI worker would buffer the endless stream (async_to_sync) and never get its thread back.
+        return error_response({"message": "The live feed is served by the ASGI application."}, status.HTTP_501_NOT_IMPLEMENTED)
+    params = ServiceFeedSerializer(data=request.GET)
+    if not params.is_valid():
+        return error_response({"message": params.errors})
+    category = params.validated_data.get('field')
+    field_id = category.pk if category is not None else None
+    hub = feed.get_hub()
+    if hub.full():
+        response = error_response({"message": "Too many feed subscribers, retry later."}, status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = str(settings.FEED['RETRY'] // 1000)
+        return response
+    replay = None
+    last_event_id = request.headers.get('Last-Event-ID')
+    if last_event_id:
+        try:
+            replay = feed.replay_services(last_event_id, field_id)
+        except InvalidCursor:
+            pass  # not one of ours, live events only.
+    response = StreamingHttpResponse(feed.stream(hub, field_id, replay), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-store'
+    # nginx would buffer the events otherwise.
+    response['X-Accel-Buffering'] = 'no'
+    return response
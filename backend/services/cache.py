@@ -0,0 +1,153 @@
+"""
+Response cache of the catalog read endpoints (service list and search).
+
+A cached page is keyed by the url, the negotiated media type and the version of
+the slice of the catalog it depends on:
+    - the version of its `field` and/or of its `company` filter,
+    - the version of the whole catalog when it has neither.
+Saving or deleting a Service bumps the versions it belongs to (services/signals.py),
+so the stale pages are never read again and simply expire.
+Each page carries an ETag, a matching If-None-Match is answered with a 304 before
+the view, the ORM or the serializer run.
+"""
+import functools
+import hashlib
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from categories import registry as categories
+
+VERSION_PREFIX = 'catalog:v:'
+PAGE_PREFIX = 'catalog:page:'
+
+
+def _config():
+    config = {'ALIAS': 'default', 'TIMEOUT': 300}
+    config.update(getattr(settings, 'CATALOG_CACHE', {}))
+    return config
+
+
+def _cache():
+    return caches[_config()['ALIAS']]
+
+
+def _dependencies(params):
+    dependencies = []
+    if params.get('field'):
+        # the versions are per category id, an unknown name (a 400) keeps its own.
+        category = categories.get_by_name(params['field'])
+        dependencies.append(f"field:{category.pk if category is not None else params['field']}")
+    if params.get('company'):
+        dependencies.append(f"company:{params['company']}")
+    return dependencies or ['all']
+
+
+def _page_key(path, params, media_type, versions):
+    raw = '|'.join([path, media_type or '', *sorted(f'{key}={value}' for key, value in params.items()), *versions])
+    return PAGE_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _versions(cache, dependencies):
+    keys = [VERSION_PREFIX + dependency for dependency in dependencies]
+    found = cache.get_many(keys)
+    return [f'{key}={found.get(key, 0)}' for key in keys]
+
+
+async def _aversions(cache, dependencies):
+    keys = [VERSION_PREFIX + dependency for dependency in dependencies]
+    found = await cache.aget_many(keys)
+    return [f'{key}={found.get(key, 0)}' for key in keys]
+
+
+def _etag(content):
+    return '"%s"' % hashlib.sha1(content).hexdigest()[:20]
+
+
+def _cached_response(request, page):
+    if page['etag'] in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(page['content'], content_type=page['content_type'])
+    return _patch_headers(response, page['etag'])
+
+
+def _patch_headers(response, etag):
+    response['ETag'] = etag
+    # pages are only served to authenticated users, browsers must revalidate them with the ETag.
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def _page(response):
+    return {
+        'etag': _etag(response.content),
+        'content': response.content,
+        'content_type': response['Content-Type'],
+    }
+
+
+def cached_catalog_response(view):
+    """Cache the 200 responses of a DRF catalog view, put it below @api_view (after the authentication)."""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        cache = _cache()
+        params = request.query_params.dict()
+        key = _page_key(request.path, params, request.accepted_media_type, _versions(cache, _dependencies(params)))
+        page = cache.get(key)
+        if page is not None:
+            return _cached_response(request, page)
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        # render now (DRF renders after the view returns) to cache the bytes.
+        drf_view = request.parser_context['view']
+        response.accepted_renderer = request.accepted_renderer
+        response.accepted_media_type = request.accepted_media_type
+        response.renderer_context = drf_view.get_renderer_context()
+        response.render()
+        page = _page(response)
+        cache.set(key, page, _config()['TIMEOUT'])
+        return _cached_response(request, page)
+    return wrapper
+
+
+def acached_catalog_response(view):
+    """Same as cached_catalog_response for the async views, put it below @token_required."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        cache = _cache()
+        params = request.GET.dict()
+        key = _page_key(request.path, params, 'application/json', await _aversions(cache, _dependencies(params)))
+        page = await cache.aget(key)
+        if page is not None:
+            return _cached_response(request, page)
+        response = await view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        page = _page(response)
+        await cache.aset(key, page, _config()['TIMEOUT'])
+        return _cached_response(request, page)
+    return wrapper
+
+
+def bump_versions(dependencies):
+    """Invalidate the pages depending on `dependencies`, once the current transaction commits."""
+    keys = [VERSION_PREFIX + dependency for dependency in {'all', *dependencies}]
+
+    def bump():
+        cache = _cache()
+        for key in keys:
+            # add() is a no-op when the key exists, incr() is atomic on the shared backends.
+            cache.add(key, 0, None)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+    transaction.on_commit(bump)
+
+
+def service_dependencies(field_id, company_id):
+    return [f'field:{field_id}', f'company:{company_id}']
@@ -0,0 +1,194 @@
+"""
+Live feed of the created and updated services, pushed as Server-Sent Events (GET /services/feed/)
+so the clients stop polling the list. Served by the ASGI application only (backend/asgi.py): a
+subscriber is a bounded queue and an idle connection, not a thread. Under WSGI the view answers 501.
+
+One poller per event loop (per worker) reads the services saved since its last poll every
+FEED['POLL_INTERVAL'] seconds, on the (created_at, id) index (created_at is updated by every save),
+serializes and encodes each of them once and fans the event out to the subscribers of its field.
+The database sees one query per worker and interval whatever the number of clients, and a save
+made by any worker (or by the import command, the tasks...) reaches them all.
+- a full queue is a slow consumer: it's dropped instead of buffering without bound or holding the
+  others back. Its stream ends and the client reconnects with the Last-Event-ID header (EventSource
+  does it by itself), the events it missed are replayed from the database.
+- delivery is at least once: an event can come twice around a reconnection, its id tells.
+"""
+import asyncio
+import contextvars
+import logging
+import weakref
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from backend import fast_json
+from .models import Service
+from .pagination import decode_cursor, encode_cursor
+from .serializers import ServiceValuesSerializer
+
+logger = logging.getLogger(__name__)
+
+# a save committed this long after its created_at (a slow transaction) is still picked up.
+COMMIT_LAG = timedelta(seconds=5)
+KEEPALIVE = b': keepalive\n\n'
+RESET = b'event: reset\ndata: {}\n\n'
+
+
+class Subscriber:
+    __slots__ = ('field_id', 'queue', 'dropped')
+
+    def __init__(self, field_id, buffer):
+        self.field_id = field_id
+        self.queue = asyncio.Queue(maxsize=buffer)
+        self.dropped = False
+
+
+class Hub:
+    """The subscribers of an event loop, by field id (None: every field), and their poller."""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.count = 0
+        self.dropped = 0
+        self._poller = None
+
+    def full(self):
+        return self.count >= settings.FEED['MAX_SUBSCRIBERS']
+
+    def subscribe(self, field_id=None):
+        """A new Subscriber, None when the worker has FEED['MAX_SUBSCRIBERS'] already."""
+        if self.full():
+            return None
+        subscriber = Subscriber(field_id, settings.FEED['BUFFER'])
+        self.subscribers.setdefault(field_id, set()).add(subscriber)
+        self.count += 1
+        if self._poller is None or self._poller.done():
+            # a context of its own, not the one (request id...) of the request starting it.
+            self._poller = asyncio.get_running_loop().create_task(self._poll(), context=contextvars.Context())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        group = self.subscribers.get(subscriber.field_id)
+        if group is None or subscriber not in group:
+            return
+        group.discard(subscriber)
+        if not group:
+            del self.subscribers[subscriber.field_id]
+        self.count -= 1
+
+    def publish(self, field_id, event):
+        """Queue the encoded event for the subscribers of field_id and of every field."""
+        for subscriber in [*self.subscribers.get(field_id, ()), *self.subscribers.get(None, ())]:
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+
+    def _drop(self, subscriber):
+        self.unsubscribe(subscriber)
+        self.dropped += 1
+        subscriber.dropped = True
+        # the buffered events are stale now, make room for the end of stream.
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+        logger.info("slow feed subscriber dropped", extra={'field_id': subscriber.field_id})
+
+    async def _poll(self):
+        since = timezone.now()
+        # (pk, created_at) of the rows published in the last COMMIT_LAG, read again by each poll.
+        # the ones saved before the poller started aren't news, the subscribers replay them if needed.
+        published = {}
+        try:
+            published = {row['id']: row['created_at'] async for row in changed_services(since - COMMIT_LAG)}
+        except Exception:
+            logger.exception("feed poll failed")
+        while self.count:
+            await asyncio.sleep(settings.FEED['POLL_INTERVAL'])
+            started = timezone.now()
+            try:
+                rows = [row async for row in changed_services(since - COMMIT_LAG)]
+            except Exception:
+                logger.exception("feed poll failed")
+                continue
+            for row in rows:
+                if published.get(row['id']) == row['created_at']:
+                    continue
+                published[row['id']] = row['created_at']
+                self.publish(row['field'], encode_event(row))
+            since = started
+            horizon = since - COMMIT_LAG
+            published = {pk: created_at for pk, created_at in published.items() if created_at >= horizon}
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """The Hub of the running event loop: its queues and its poller belong to that loop."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = Hub()
+    return hub
+
+
+def changed_services(since):
+    return (
+        Service.objects.filter(created_at__gte=since)
+        .order_by('created_at', 'id')
+        .values(*ServiceValuesSerializer.value_fields())
+    )
+
+
+def replay_services(last_event_id, field_id):
+    """The services saved after the event last_event_id, oldest first (InvalidCursor when it's not one)."""
+    created_at, pk = decode_cursor(last_event_id)
+    services = changed_services(created_at).filter(Q(created_at__gt=created_at) | Q(id__gt=pk))
+    if field_id is not None:
+        services = services.filter(field_id=field_id)
+    return services[:settings.FEED['REPLAY_LIMIT'] + 1]
+
+
+_serializer = ServiceValuesSerializer(None)
+
+
+def encode_event(row):
+    data = fast_json.dumps(_serializer.to_representation(row))
+    return b'id: %s\nevent: service\ndata: %s\n\n' % (encode_cursor(row['created_at'], row['id']).encode(), data)
+
+
+async def stream(hub, field_id=None, replay=None):
+    """
+    The SSE body of a new subscriber of field_id, ends when it's dropped. replay: a replay_services()
+    queryset sent first. Subscribed once the body is read: a response never sent subscribes nothing.
+    """
+    # before the replay query: a save made in between is sent twice rather than lost.
+    subscriber = hub.subscribe(field_id)
+    if subscriber is None:
+        # filled up since the view checked, the client comes back after the retry delay.
+        yield b'retry: %d\n\n' % settings.FEED['RETRY']
+        return
+    try:
+        yield b'retry: %d\n\n' % settings.FEED['RETRY']
+        if replay is not None:
+            rows = [row async for row in replay]
+            if len(rows) > settings.FEED['REPLAY_LIMIT']:
+                # too far behind, the client reloads the list instead.
+                yield RESET
+            else:
+                for row in rows:
+                    yield encode_event(row)
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), settings.FEED['KEEPALIVE'])
+            except asyncio.TimeoutError:
+                # keeps the proxies from closing an idle connection.
+                yield KEEPALIVE
+                continue
+            if event is None:
+                return
+            yield event
+    finally:
+        # the client went away (the response is cancelled) or it was dropped.
+        hub.unsubscribe(subscriber)
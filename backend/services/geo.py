@@ -0,0 +1,120 @@
+"""
+Distance search of the services around a point, no PostGIS needed.
+
+1. prefilter on an index: on sqlite the geohash cells covering the search circle, each cell
+   being a range scan of the geohash index, on postgres the bounding box of the circle on
+   the (latitude, longitude) index.
+2. rank the candidates by their exact haversine distance, computed in SQL so the page and
+   its cursor (distance, id) are applied by the database.
+"""
+import math
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+GEOHASH_PRECISION = 9  # ~5 meters cells, the precision stored in Service.geohash
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_CELLS = 16
+# sorts after every geohash character: the cell "abc" is the range ["abc", "abc{").
+_CELL_END = '{'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        # the bits alternate between longitude (even) and latitude.
+        value, interval = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(latitude, longitude) span in degrees of a geohash cell."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2 ** lat_bits, 360 / 2 ** lng_bits
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(min lat, max lat, min lng, max lng) around the circle, longitudes may cross the antimeridian."""
+    delta_lat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    # near the poles the circle covers every longitude.
+    delta_lng = 180.0 if cos_lat < 1e-9 else min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+    return latitude - delta_lat, latitude + delta_lat, longitude - delta_lng, longitude + delta_lng
+
+
+def covering_cells(latitude, longitude, radius_km, max_cells=MAX_CELLS):
+    """
+    The geohash prefixes covering the bounding box of the circle, at the finest precision needing
+    at most max_cells of them (fewer false candidates to rank), [] when even the coarsest need more.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    min_lat, max_lat = max(-90.0, min_lat), min(90.0, max_lat)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_span, lng_span = cell_size(precision)
+        first_row, last_row = int((min_lat + 90) // lat_span), int((max_lat + 90) // lat_span)
+        first_column, last_column = int((min_lng + 180) // lng_span), int((max_lng + 180) // lng_span)
+        if (last_row - first_row + 1) * (last_column - first_column + 1) > max_cells:
+            continue
+        cells = set()
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                # the center of the cell, the columns wrap around the antimeridian.
+                cell_lat = min(90.0, (row + 0.5) * lat_span - 90)
+                cell_lng = ((column + 0.5) * lng_span) % 360 - 180
+                cells.add(encode_geohash(cell_lat, cell_lng, precision))
+        return sorted(cells)
+    return []
+
+
+def prefilter(queryset, latitude, longitude, radius_km):
+    # sqlite: range scans of the geohash cells (a btree on (latitude, longitude) can only range scan the
+    # latitude, a band around the whole earth). postgres: the box, its planner combines both columns.
+    if connections[queryset.db].vendor != 'postgresql':
+        cells = covering_cells(latitude, longitude, radius_km)
+        if cells:
+            in_cells = Q()
+            for cell in cells:
+                in_cells |= Q(geohash__gte=cell, geohash__lt=cell + _CELL_END)
+            return queryset.filter(in_cells)
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    queryset = queryset.filter(latitude__gte=min_lat, latitude__lte=max_lat)
+    if max_lng - min_lng >= 360:
+        return queryset
+    if min_lng < -180:
+        return queryset.filter(Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng))
+    if max_lng > 180:
+        return queryset.filter(Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360))
+    return queryset.filter(longitude__gte=min_lng, longitude__lte=max_lng)
+
+
+def distance_km(latitude, longitude):
+    """Haversine distance in km from the point to the row's (latitude, longitude), as an expression."""
+    lat = Radians(Value(latitude, output_field=FloatField()))
+    row_lat = Radians(F('latitude'))
+    half_delta_lat = (row_lat - lat) / 2
+    half_delta_lng = (Radians(F('longitude')) - Radians(Value(longitude, output_field=FloatField()))) / 2
+    a = Power(Sin(half_delta_lat), 2) + Cos(lat) * Cos(row_lat) * Power(Sin(half_delta_lng), 2)
+    # rounding can push a a hair above 1 for antipodal points.
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, Value(1.0, output_field=FloatField()))))
+
+
+def nearby(queryset, latitude, longitude, radius_km):
+    """The rows of queryset within radius_km of the point, annotated with their distance_km."""
+    queryset = prefilter(queryset, latitude, longitude, radius_km)
+    return queryset.annotate(distance_km=distance_km(latitude, longitude)).filter(distance_km__lte=radius_km)
@@ -0,0 +1,182 @@
+"""
+Bulk service import shared by the bulk_create endpoint and the import_services command.
+
+The rows are streamed from JSON array / NDJSON / CSV input, validated chunk by chunk
+with the ServiceImportSerializer child and written with one bulk_create per chunk,
+so the memory used stays bounded whatever the size of the input.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+from django.db import transaction
+from rest_framework import serializers
+from authentication.models import User
+from . import cache, stats, tasks
+from .models import Service
+from .serializers import ServiceImportSerializer
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+READ_SIZE = 64 * 1024
+
+FORMATS = ('json', 'ndjson', 'csv')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def _iter_text(stream):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        data = stream.read(READ_SIZE)
+        if not data:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(data)
+
+
+def _iter_lines(stream):
+    # with their terminator, the csv reader needs it to keep the newlines of a quoted field.
+    pending = ''
+    for text in _iter_text(stream):
+        pending += text
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line + '\n'
+    if pending:
+        yield pending
+
+
+def iter_json_array(stream):
+    """Yield the elements of a top level JSON array one by one without loading the whole document."""
+    decoder = json.JSONDecoder()
+    chunks = _iter_text(stream)
+    buffer, position, started, eof = '', 0, False, False
+    while True:
+        # skip the separators between two elements.
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer):
+            if not started:
+                if buffer[position] != '[':
+                    raise ImportFormatError("Expected a JSON array.")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                # the element may be cut by the end of the buffer, read more before giving up.
+                if eof:
+                    raise ImportFormatError(f"Invalid JSON: {error}")
+            else:
+                yield element
+                position = end
+                continue
+        if eof:
+            raise ImportFormatError("Unterminated JSON array.")
+        try:
+            buffer = buffer[position:] + next(chunks)
+            position = 0
+        except StopIteration:
+            eof = True
+
+
+def iter_ndjson(stream):
+    for line_number, line in enumerate(_iter_lines(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            # reported as a row error, the other lines are still imported.
+            yield ImportFormatError(f"Invalid JSON on line {line_number}: {error}")
+
+
+def iter_csv(stream):
+    yield from csv.DictReader(_iter_lines(stream))
+
+
+def iter_rows(stream, import_format):
+    if import_format == 'json':
+        return iter_json_array(stream)
+    if import_format == 'ndjson':
+        return iter_ndjson(stream)
+    if import_format == 'csv':
+        return iter_csv(stream)
+    raise ImportFormatError(f"Unsupported format '{import_format}', expected one of {', '.join(FORMATS)}.")
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _validate_chunk(child, chunk, companies):
+    """ListSerializer(many=True) style validation, except that the valid rows of the chunk are kept."""
+    services, errors = [], []
+    for row_number, row in chunk:
+        if isinstance(row, ImportFormatError):
+            errors.append({'row': row_number, 'errors': [str(row)]})
+            continue
+        if not isinstance(row, dict):
+            errors.append({'row': row_number, 'errors': ["Invalid data. Expected a dictionary."]})
+            continue
+        try:
+            data = child.run_validation(row)
+            company_id = companies(row)
+        except serializers.ValidationError as error:
+            errors.append({'row': row_number, 'errors': error.detail})
+            continue
+        service = Service(company_id=company_id, **data)
+        service.update_geohash()
+        services.append(service)
+    return services, errors
+
+
+def _company_resolver(chunk, company):
+    if company is not None:
+        return lambda row: company.pk
+    # one query per chunk to check the companies referenced by the rows.
+    ids = {str(row.get('company')) for _, row in chunk if isinstance(row, dict)}
+    known = {
+        str(pk) for pk in User.objects.filter(
+            pk__in=[pk for pk in ids if pk.isdigit()], user_type='company'
+        ).values_list('pk', flat=True)
+    }
+
+    def resolve(row):
+        if str(row.get('company')) not in known:
+            raise serializers.ValidationError({'company': ["Unknown company."]})
+        return int(row['company'])
+    return resolve
+
+
+def import_services(rows, company=None, chunk_size=DEFAULT_CHUNK_SIZE, max_errors=MAX_REPORTED_ERRORS):
+    """
+    Import the rows for `company`, or for the company id of each row's "company" column when it's None.
+    Returns {"created": ..., "failed": ..., "errors": [{"row": n, "errors": ...}]} (errors capped to max_errors).
+    """
+    child = ServiceImportSerializer(many=True).child
+    summary = {'created': 0, 'failed': 0, 'errors': []}
+    for chunk in _chunks(enumerate(rows, start=1), chunk_size):
+        services, errors = _validate_chunk(child, chunk, _company_resolver(chunk, company))
+        with transaction.atomic():
+            Service.objects.bulk_create(services, batch_size=chunk_size)
+            # bulk_create sends no post_save, index/count the chunk and invalidate the cached pages here.
+            tasks.index_later(services)
+            stats.add_services(services)
+            if services:
+                cache.bump_versions({dep for service in services for dep in cache.service_dependencies(service.field_id, service.company_id)})
+        summary['created'] += len(services)
+        summary['failed'] += len(errors)
+        room = max_errors - len(summary['errors'])
+        summary['errors'].extend(errors[:room])
+    return summary
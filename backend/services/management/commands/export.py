@@ -0,0 +1,49 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from backend import exporting
+
+
+def _datetime(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"'{value}' isn't an ISO 8601 datetime.")
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the services or the users as CSV, NDJSON or JSON (backend/exporting.py), in constant memory. "
+        "--since exports the rows saved/joined since the --until printed by the previous export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=['services', 'users'])
+        parser.add_argument('--format', choices=exporting.OUTPUTS, default='csv')
+        parser.add_argument('--since', help="ISO 8601 datetime, included")
+        parser.add_argument('--until', help="ISO 8601 datetime, excluded, defaults to a few seconds ago")
+        parser.add_argument('--output', default='-', help="file to write, '-' is stdout")
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--chunk-size', type=int, default=exporting.DEFAULT_CHUNK_SIZE, help="rows fetched at a time")
+
+    def handle(self, *args, **options):
+        export = exporting.get_exports()[options['table']]
+        since = _datetime(options['since']) if options['since'] else None
+        until = _datetime(options['until']) if options['until'] else export.default_until()
+        if since is not None and since > until:
+            raise CommandError("--since can't be after --until.")
+
+        output = sys.stdout.buffer if options['output'] == '-' else open(options['output'], 'wb')
+        written = 0
+        try:
+            for chunk in export.stream(options['format'], since, until, options['database'], options['chunk_size']):
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if output is sys.stdout.buffer:
+                output.flush()
+            else:
+                output.close()
+        # on stderr, stdout may be the export itself.
+        self.stderr.write(f"{written} bytes exported, next --since {until.isoformat()}", style_func=self.style.SUCCESS)
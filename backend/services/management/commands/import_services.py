@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from authentication.models import User
+from services.importing import DEFAULT_CHUNK_SIZE, FORMATS, ImportFormatError, import_services, iter_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import services from a JSON array, NDJSON or CSV file (or '-' for stdin). "
+        "Rows are streamed and written in chunks, so the memory stays bounded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="file to import, '-' reads stdin")
+        parser.add_argument('--format', choices=FORMATS, help="defaults to the file extension")
+        parser.add_argument(
+            '--company',
+            help="email of the company owning all the rows, otherwise each row needs a 'company' id column"
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if import_format not in FORMATS:
+            raise CommandError(f"Can't guess the format of '{path}', use --format.")
+
+        company = None
+        if options['company']:
+            try:
+                company = User.objects.get(email=options['company'], user_type='company')
+            except User.DoesNotExist:
+                raise CommandError(f"No company with the email '{options['company']}'.")
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            summary = import_services(iter_rows(stream, import_format), company=company, chunk_size=options['chunk_size'])
+        except ImportFormatError as error:
+            raise CommandError(str(error))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in summary['errors']:
+            self.stderr.write(f"row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(f"{summary['created']} services created, {summary['failed']} rows failed."))
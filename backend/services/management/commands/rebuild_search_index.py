@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from services import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the sqlite FTS5 service search table (postgres indexes need no rebuild)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f"{count} services indexed."))
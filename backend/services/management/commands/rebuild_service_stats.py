@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from services import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the per company and per field service aggregates of the company dashboards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--company', type=int, help="only rebuild the aggregates of this company id")
+
+    def handle(self, *args, **options):
+        count = stats.rebuild(using=options['database'], company=options['company'])
+        self.stdout.write(self.style.SUCCESS(f"{count} service groups rebuilt."))
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# the postgres expression must stay identical to services.search.PG_DOCUMENT.
+PG_DOCUMENT = (
+    "(setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(f'CREATE INDEX service_search_document_idx ON services_service USING GIN ({PG_DOCUMENT})')
+        schema_editor.execute('CREATE INDEX service_name_trigram_idx ON services_service USING GIN (name gin_trgm_ops)')
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE service_search USING fts5(name, description, tokenize='porter unicode61', prefix='2 3')"
+        )
+        schema_editor.execute(
+            'INSERT INTO service_search(rowid, name, description) SELECT id, name, description FROM services_service'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS service_search_document_idx')
+        schema_editor.execute('DROP INDEX IF EXISTS service_name_trigram_idx')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS service_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_service_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
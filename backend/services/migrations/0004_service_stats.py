@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+# same as services.stats.rebuild(), on the historical models.
+def fill_service_stats(apps, schema_editor):
+    Service = apps.get_model('services', 'Service')
+    ServiceStats = apps.get_model('services', 'ServiceStats')
+    using = schema_editor.connection.alias
+    groups = Service.objects.using(using).values('company_id', 'field').order_by().annotate(
+        count=Count('id'), price_sum=Sum('price_per_hour'),
+        price_min=Min('price_per_hour'), price_max=Max('price_per_hour'),
+        last_activity_at=Max('created_at'),
+    )
+    ServiceStats.objects.using(using).bulk_create((ServiceStats(**group) for group in groups), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_service_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('Air Conditioner', 'Air Conditioner'), ('Carpentry', 'Carpentry'), ('Electricity', 'Electricity'), ('Gardening', 'Gardening'), ('Home Machines', 'Home Machines'), ('House Keeping', 'House Keeping'), ('Interior Design', 'Interior Design'), ('Locks', 'Locks'), ('Painting', 'Painting'), ('Plumbing', 'Plumbing'), ('Water Heaters', 'Water Heaters')], max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('price_sum', models.DecimalField(decimal_places=2, default=0, max_digits=100)),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=100)),
+                ('last_activity_at', models.DateTimeField()),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='service_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('company', 'field'), name='service_stats_company_field_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_service_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 0006-0008 replace the field names by categories.Category foreign keys. Three migrations (three
+# transactions): postgres can't alter a table with pending foreign key checks from the data copy.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('services', '0005_service_location'),
+    ]
+
+    operations = [
+        # nullable until 0008 drops them, so unapplying 0008 can add them back before 0007 fills them.
+        migrations.AlterField(
+            model_name='service',
+            name='field',
+            field=models.CharField(max_length=30, null=True),
+        ),
+        migrations.AlterField(
+            model_name='servicestats',
+            name='field',
+            field=models.CharField(max_length=30, null=True),
+        ),
+        migrations.AddField(
+            model_name='service',
+            name='category',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='categories.category'),
+        ),
+        migrations.AddField(
+            model_name='servicestats',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='categories.category'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations
+
+ALIASES = {'House Keeping': 'Housekeeping'}
+
+
+# one UPDATE per distinct name, a name outside of the seeded categories gets its own.
+def copy_categories(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    using = schema_editor.connection.alias
+    for model_name in ('Service', 'ServiceStats'):
+        rows = apps.get_model('services', model_name).objects.using(using)
+        for name in rows.order_by().values_list('field', flat=True).distinct():
+            category, _ = Category.objects.using(using).get_or_create(name=ALIASES.get(name, name))
+            rows.filter(field=name).update(category=category)
+
+
+def copy_names(apps, schema_editor):
+    using = schema_editor.connection.alias
+    for model_name in ('Service', 'ServiceStats'):
+        rows = apps.get_model('services', model_name).objects.using(using)
+        for category_id, name in rows.order_by().values_list('category_id', 'category__name').distinct():
+            rows.filter(category_id=category_id).update(field=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0006_category_columns'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_categories, copy_names),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0001_initial'),
+        ('services', '0007_copy_categories'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='service',
+            name='service_field_price_idx',
+        ),
+        migrations.RemoveConstraint(
+            model_name='servicestats',
+            name='service_stats_company_field_uniq',
+        ),
+        migrations.RemoveField(
+            model_name='service',
+            name='field',
+        ),
+        migrations.RemoveField(
+            model_name='servicestats',
+            name='field',
+        ),
+        migrations.RenameField(
+            model_name='service',
+            old_name='category',
+            new_name='field',
+        ),
+        migrations.RenameField(
+            model_name='servicestats',
+            old_name='category',
+            new_name='field',
+        ),
+        migrations.AlterField(
+            model_name='service',
+            name='field',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='services', to='categories.category'),
+        ),
+        migrations.AlterField(
+            model_name='servicestats',
+            name='field',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='categories.category'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['field', 'price_per_hour'], name='service_field_price_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='servicestats',
+            constraint=models.UniqueConstraint(fields=('company', 'field'), name='service_stats_company_field_uniq'),
+        ),
+    ]
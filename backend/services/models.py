@@ -1,6 +1,9 @@
-from django.db import models
-# from django.core.validators import MaxValueValidator, MinValueValidator
+from decimal import Decimal
+from django.db import models, router, transaction
+from django.core.validators import MaxValueValidator, MinValueValidator
 from authentication.models import User
+from categories.models import Category
+from . import geo
 
 # create the blueprint for the service object:
 class Service(models.Model):
@@ -10,21 +13,64 @@ class Service(models.Model):
     price_per_hour = models.DecimalField(decimal_places=2, max_digits=100)
         # rating = models.IntegerField(validators=[MinValueValidator(
         # 0), MaxValueValidator(5)], default=0)
-    choices = (
-        ('Air Conditioner', 'Air Conditioner'),
-        ('Carpentry', 'Carpentry'),
-        ('Electricity', 'Electricity'),
-        ('Gardening', 'Gardening'),
-        ('Home Machines', 'Home Machines'),
-        ('House Keeping', 'House Keeping'),
-        ('Interior Design', 'Interior Design'),
-        ('Locks', 'Locks'),
-        ('Painting', 'Painting'),
-        ('Plumbing', 'Plumbing'),
-        ('Water Heaters', 'Water Heaters'),
-    )
-    field = models.CharField(max_length=30, blank=False, null=False, choices=choices)
+    # the (field, price_per_hour) index covers the lookups of the foreign key.
+    field = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='services', db_index=False)
     created_at = models.DateTimeField(auto_now=True, null=False)
+    # where the service is offered, optional. geohash is derived from them (see services/geo.py).
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    geohash = models.CharField(max_length=12, null=True, blank=True, editable=False)
+
+    class Meta:
+        # composite indexes backing the catalog filters and the keyset pagination walk.
+        indexes = [
+            models.Index(fields=['field', 'price_per_hour'], name='service_field_price_idx'),
+            models.Index(fields=['company', 'created_at'], name='service_company_created_idx'),
+            models.Index(fields=['created_at', 'id'], name='service_created_id_idx'),
+            # prefilters of the nearby search.
+            models.Index(fields=['geohash'], name='service_geohash_idx'),
+            models.Index(fields=['latitude', 'longitude'], name='service_lat_lng_idx'),
+        ]
+
+    def update_geohash(self):
+        # bulk_create skips save(), the importers call it themselves.
+        if self.latitude is None or self.longitude is None:
+            self.geohash = None
+        else:
+            self.geohash = geo.encode_geohash(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.update_geohash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geohash'}
+        # the post_save receivers (search index, services/stats.py aggregates) run in the same transaction.
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(Service, instance=self), savepoint=False):
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
+# per company and per field aggregates of the services, maintained by services/stats.py.
+class ServiceStats(models.Model):
+    company = models.ForeignKey(User, on_delete=models.CASCADE, related_name='service_stats')
+    field = models.ForeignKey(Category, on_delete=models.PROTECT, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(decimal_places=2, max_digits=100, default=0)
+    price_min = models.DecimalField(decimal_places=2, max_digits=100)
+    price_max = models.DecimalField(decimal_places=2, max_digits=100)
+    # last time a service of the group was created, updated or deleted.
+    last_activity_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['company', 'field'], name='service_stats_company_field_uniq'),
+        ]
+
+    @property
+    def price_avg(self):
+        return (self.price_sum / self.count).quantize(Decimal('0.01')) if self.count else None
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f'{self.company_id} {self.field_id}'
\ No newline at end of file
@@ -0,0 +1,109 @@
+import base64
+import binascii
+from datetime import datetime
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# the cursor is the (created_at, id) of the last row of the previous page,
+# so the next page is a plain index range scan instead of an OFFSET.
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def paginate_keyset(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Walk the queryset newest first on (created_at, id).
+    Returns the rows of the page and the cursor of the next one (None on the last page).
+    """
+    # fetch one extra row to know if there is a next page without a COUNT(*).
+    rows = list(_page_queryset(queryset, cursor, page_size))
+    return _split_page(rows, page_size)
+
+
+async def apaginate_keyset(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    rows = [row async for row in _page_queryset(queryset, cursor, page_size)]
+    return _split_page(rows, page_size)
+
+
+def _page_queryset(queryset, cursor, page_size):
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    return queryset[:page_size + 1]
+
+
+# the nearby search walks nearest first on (distance_km, id), same principle.
+def encode_distance_cursor(distance, pk):
+    # repr() round-trips the float, the next page starts exactly after the row.
+    return base64.urlsafe_b64encode(f"{distance!r}|{pk}".encode()).decode().rstrip('=')
+
+
+def decode_distance_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        distance, pk = base64.urlsafe_b64decode(padded).decode().split('|')
+        return float(distance), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def paginate_distance(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Walk a geo.nearby() queryset of .values() rows nearest first.
+    Returns the rows of the page and the cursor of the next one (None on the last page).
+    """
+    rows = list(_distance_page_queryset(queryset, cursor, page_size))
+    return _split_distance_page(rows, page_size)
+
+
+async def apaginate_distance(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    rows = [row async for row in _distance_page_queryset(queryset, cursor, page_size)]
+    return _split_distance_page(rows, page_size)
+
+
+def _distance_page_queryset(queryset, cursor, page_size):
+    queryset = queryset.order_by('distance_km', 'id')
+    if cursor:
+        distance, pk = decode_distance_cursor(cursor)
+        queryset = queryset.filter(Q(distance_km__gt=distance) | Q(distance_km=distance, id__gt=pk))
+    return queryset[:page_size + 1]
+
+
+def _split_distance_page(rows, page_size):
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_distance_cursor(rows[-1]['distance_km'], rows[-1]['id'])
+
+
+def _split_page(rows, page_size):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        # the rows are model instances or .values() dicts.
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        else:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,148 @@
+"""
+Ranked full-text search over Service.name and Service.description.
+
+- postgres: weighted tsvector matched against a GIN expression index, plus the pg_trgm
+  % operator on the name (GIN trigram index) so typos and partial words still match.
+- sqlite: an FTS5 table (service_search, rowid = service id) ranked with bm25(),
+  kept in sync by the signals in services/signals.py.
+The indexes are created by migration 0003_service_search.
+"""
+import re
+from django.db import connections, router
+from authentication.models import User
+from .models import Service
+from .serializers import ServiceValuesSerializer
+
+FTS_TABLE = 'service_search'
+
+# must stay identical to the indexed expression of migration 0003, or postgres won't use the index.
+PG_DOCUMENT = (
+    "(setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B'))"
+)
+
+
+def _fts5_query(text):
+    # every word must match (as a prefix), quoting them keeps the FTS5 syntax out of the user input.
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def _filters_sql(filters, column_prefix=''):
+    clauses, params = [], []
+    if 'field' in filters:
+        clauses.append(f'{column_prefix}field_id = %s')
+        params.append(filters['field'].pk)
+    if 'min_price' in filters:
+        clauses.append(f'{column_prefix}price_per_hour >= %s')
+        params.append(filters['min_price'])
+    if 'max_price' in filters:
+        clauses.append(f'{column_prefix}price_per_hour <= %s')
+        params.append(filters['max_price'])
+    if 'company' in filters:
+        clauses.append(f'{column_prefix}company_id = %s')
+        params.append(filters['company'])
+    if filters.get('specialists'):
+        clauses.append(
+            f'{column_prefix}field_id = (SELECT company.field_of_work_id FROM {User._meta.db_table} AS company'
+            f' WHERE company.id = {column_prefix}company_id)'
+        )
+    return ''.join(f' AND {clause}' for clause in clauses), params
+
+
+def _search_postgres(cursor, text, filters, limit, offset):
+    where, params = _filters_sql(filters)
+    cursor.execute(
+        f"""
+        SELECT id, ts_rank_cd({PG_DOCUMENT}, query) + similarity(name, %s) AS rank
+        FROM services_service, websearch_to_tsquery('english', %s) AS query
+        WHERE ({PG_DOCUMENT} @@ query OR name %% %s){where}
+        ORDER BY rank DESC, id DESC
+        LIMIT %s OFFSET %s
+        """,
+        [text, text, text, *params, limit, offset]
+    )
+    return cursor.fetchall()
+
+
+def _search_sqlite(cursor, text, filters, limit, offset):
+    match = _fts5_query(text)
+    if not match:
+        return []
+    where, params = _filters_sql(filters, 'service.')
+    # bm25 is lower for better matches, the name weighs more than the description.
+    cursor.execute(
+        f"""
+        SELECT service.id, -bm25({FTS_TABLE}, 10.0, 1.0) AS rank
+        FROM {FTS_TABLE} JOIN services_service AS service ON service.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH %s{where}
+        ORDER BY rank DESC, service.id DESC
+        LIMIT %s OFFSET %s
+        """,
+        [match, *params, limit, offset]
+    )
+    return cursor.fetchall()
+
+
+def search_services(text, filters=None, limit=20, offset=0, expand_company=False):
+    """
+    Returns the matching services, best first, each with a `rank` attribute.
+    expand_company fetches their company's summary (ServiceValuesSerializer) in the same query.
+    """
+    alias = router.db_for_read(Service)
+    connection = connections[alias]
+    search = _search_postgres if connection.vendor == 'postgresql' else _search_sqlite
+    with connection.cursor() as cursor:
+        ranked = search(cursor, text, filters or {}, limit, offset)
+    services = Service.objects.using(alias)
+    if expand_company:
+        services = services.select_related('company').only(*ServiceValuesSerializer.value_fields(expand_company=True))
+    services = services.in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, rank in ranked:
+        if pk in services:
+            services[pk].rank = rank
+            results.append(services[pk])
+    return results
+
+
+# sqlite only, the postgres indexes are maintained by the database itself.
+def uses_fts_table(using):
+    return connections[using].vendor == 'sqlite'
+
+
+def index_services(services, using='default'):
+    services = [service for service in services if service.pk is not None]
+    if not services or not uses_fts_table(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(service.pk,) for service in services]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (%s, %s, %s)',
+            [(service.pk, service.name, service.description) for service in services]
+        )
+
+
+def unindex_service(pk, using='default'):
+    if not uses_fts_table(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [pk])
+
+
+def rebuild_index(using='default', chunk_size=2000):
+    if not uses_fts_table(using):
+        return 0
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    count = 0
+    chunk = []
+    for service in Service.objects.using(using).only('id', 'name', 'description').iterator(chunk_size=chunk_size):
+        chunk.append(service)
+        if len(chunk) == chunk_size:
+            index_services(chunk, using)
+            count += len(chunk)
+            chunk = []
+    index_services(chunk, using)
+    return count + len(chunk)
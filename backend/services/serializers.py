@@ -1,8 +1,157 @@
+from django.db.models import F
 from rest_framework import serializers
-from .models import Service
+from backend.fast_serializers import ValuesSerializer
+from categories import registry as categories
+from categories.fields import CategoryField
+from .models import Service, ServiceStats
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+MAX_SEARCH_PAGE = 50
+DEFAULT_NEARBY_RADIUS_KM = 10
+MAX_NEARBY_RADIUS_KM = 200
+EXPANDABLE = ('company',)
+
+
+def validate_location(attrs):
+    if (attrs.get('latitude') is None) != (attrs.get('longitude') is None):
+        raise serializers.ValidationError("latitude and longitude must be given together.")
+    return attrs
+
 
 class ServiceSerializer(serializers.ModelSerializer):
+    field = CategoryField()
+
     class Meta:
         model = Service
-        fields = '__all__'  # Include all fields
+        exclude = ['geohash']  # derived from latitude/longitude by the model
         read_only_fields = ['id', 'created_at']  # These are managed by Django/database
+
+    def validate(self, attrs):
+        return validate_location(attrs)
+
+
+# same output as ServiceSerializer, for the list/search responses.
+# expand_company replaces the company id by a summary of the company, read from the same
+# query: the rows come from .values(*value_fields(True)) or select_related('company').
+class ServiceValuesSerializer(ValuesSerializer):
+    serializer_class = ServiceSerializer
+    company_fields = ('username', 'email', 'field_of_work')
+
+    def __init__(self, instance, many=False, expand_company=False):
+        super().__init__(instance, many)
+        self.expand_company = expand_company
+
+    @classmethod
+    def value_fields(cls, expand_company=False):
+        fields = super().value_fields()
+        if expand_company:
+            fields += [f'company__{name}' for name in cls.company_fields]
+        return fields
+
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        if self.expand_company:
+            if isinstance(row, dict):
+                summary = {name: row[f'company__{name}'] for name in self.company_fields}
+            else:
+                # the category id like the rows, company.field_of_work would fetch the Category.
+                summary = {name: row.company.serializable_value(name) for name in self.company_fields}
+            summary['field_of_work'] = categories.name_of(summary['field_of_work'])
+            data['company'] = {'id': data['company'], **summary}
+        return data
+
+
+# the rows of geo.nearby() are annotated with their distance.
+class ServiceNearbyValuesSerializer(ServiceValuesSerializer):
+    def to_representation(self, row):
+        data = super().to_representation(row)
+        data['distance_km'] = round(row['distance_km'], 3)
+        return data
+
+
+# a row of the company dashboard (the totals have no field):
+class ServiceStatsSerializer(serializers.ModelSerializer):
+    field = CategoryField(read_only=True)
+    price_avg = serializers.DecimalField(max_digits=100, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ServiceStats
+        fields = ['field', 'count', 'price_min', 'price_avg', 'price_max', 'last_activity_at']
+
+
+# query parameters of the catalog list endpoint:
+class ServiceFilterSerializer(serializers.Serializer):
+    field = CategoryField(required=False)
+    min_price = serializers.DecimalField(max_digits=100, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=100, decimal_places=2, required=False)
+    company = serializers.IntegerField(min_value=1, required=False)
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_PAGE_SIZE, default=DEFAULT_PAGE_SIZE)
+    # only the services of companies working in the service's field.
+    specialists = serializers.BooleanField(required=False, default=False)
+    # comma separated relations to nest in the results.
+    expand = serializers.CharField(required=False)
+
+    def validate_expand(self, value):
+        expand = {name.strip() for name in value.split(',') if name.strip()}
+        unknown = expand.difference(EXPANDABLE)
+        if unknown:
+            raise serializers.ValidationError(f"Can't expand {', '.join(sorted(unknown))}, expected {', '.join(EXPANDABLE)}.")
+        return expand
+
+    @property
+    def expand_company(self):
+        return 'company' in self.validated_data.get('expand', ())
+
+    def validate(self, attrs):
+        min_price = attrs.get('min_price')
+        max_price = attrs.get('max_price')
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError("min_price can't be greater than max_price.")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        if 'field' in data:
+            queryset = queryset.filter(field=data['field'])
+        if 'min_price' in data:
+            queryset = queryset.filter(price_per_hour__gte=data['min_price'])
+        if 'max_price' in data:
+            queryset = queryset.filter(price_per_hour__lte=data['max_price'])
+        if 'company' in data:
+            queryset = queryset.filter(company_id=data['company'])
+        if data.get('specialists'):
+            # both sides are category ids, an integer comparison across the company join.
+            queryset = queryset.filter(company__field_of_work=F('field'))
+        return queryset
+
+
+# query parameters of the search endpoint, ranked results are paged by number instead of cursor.
+class ServiceSearchSerializer(ServiceFilterSerializer):
+    q = serializers.CharField(max_length=200)
+    page = serializers.IntegerField(min_value=1, max_value=MAX_SEARCH_PAGE, default=1)
+    cursor = None
+
+
+# query parameters of the nearby endpoint, the results are paged by distance.
+class ServiceNearbySerializer(ServiceFilterSerializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(min_value=0.1, max_value=MAX_NEARBY_RADIUS_KM, default=DEFAULT_NEARBY_RADIUS_KM)
+
+
+# query parameters of the live feed (services/feed.py), every field when there's none.
+class ServiceFeedSerializer(serializers.Serializer):
+    field = CategoryField(required=False)
+
+
+# row of a bulk import, the company comes from the request user or the import command.
+class ServiceImportSerializer(serializers.ModelSerializer):
+    field = CategoryField()
+
+    class Meta:
+        model = Service
+        fields = ['name', 'description', 'price_per_hour', 'field', 'latitude', 'longitude']
+
+    def validate(self, attrs):
+        return validate_location(attrs)
@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import cache, search, stats, tasks
+from authentication.models import User
+from .models import Service, ServiceStats
+
+
+# keeps the sqlite FTS5 search table in sync (bulk imports index their chunks themselves),
+# through a background task: the search results lag the writes by a worker poll.
+@receiver(post_save, sender=Service)
+def index_saved_service(sender, instance, using, **kwargs):
+    tasks.index_later([instance], using)
+
+
+@receiver(post_delete, sender=Service)
+def unindex_deleted_service(sender, instance, using, **kwargs):
+    search.unindex_service(instance.pk, using)
+
+
+# the row before an update: the aggregates move the service out of its old group and the
+# cache invalidates the pages of the old field/company too. Service.save() runs in a transaction,
+# the row stays locked until it commits (postgres).
+@receiver(pre_save, sender=Service)
+def remember_previous_row(sender, instance, using, **kwargs):
+    instance._previous_row = None
+    if instance.pk is not None:
+        instance._previous_row = Service.objects.using(using).select_for_update().filter(pk=instance.pk).values_list(
+            'company_id', 'field_id', 'price_per_hour'
+        ).first()
+
+
+# aggregates of the company dashboard, updated in the transaction of the write.
+@receiver(post_save, sender=Service)
+def count_saved_service(sender, instance, created, using, **kwargs):
+    previous = getattr(instance, '_previous_row', None)
+    if previous is None:
+        stats.add_services([instance], using)
+    else:
+        stats.move_service(previous, instance, using)
+
+
+@receiver(post_delete, sender=Service)
+def uncount_deleted_service(sender, instance, using, **kwargs):
+    stats.remove_service(instance.company_id, instance.field_id, instance.price_per_hour, using)
+
+
+# invalidates the cached catalog pages (services/cache.py).
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_catalog_cache(sender, instance, signal, **kwargs):
+    dependencies = cache.service_dependencies(instance.field_id, instance.company_id)
+    # a deleted instance may still carry the row of its last save.
+    previous = getattr(instance, '_previous_row', None) if signal is post_save else None
+    if previous is not None:
+        dependencies += cache.service_dependencies(previous[1], previous[0])
+    cache.bump_versions(dependencies)
+
+
+# the ?expand=company pages carry the company's summary, a profile change invalidates the pages
+# of its services. Saves not writing the summary fields (password upgrade, last_login) skip it.
+@receiver(post_save, sender=User)
+def invalidate_company_pages(sender, instance, created, update_fields, using, **kwargs):
+    if created or instance.user_type != 'company':
+        return
+    if update_fields is not None and not set(update_fields) & {'username', 'email', 'field_of_work'}:
+        return
+    fields = ServiceStats.objects.using(using).filter(company=instance).values_list('field_id', flat=True)
+    dependencies = [dep for field in fields for dep in cache.service_dependencies(field, instance.pk)]
+    if dependencies:
+        cache.bump_versions(dependencies)
@@ -0,0 +1,142 @@
+"""
+Incremental maintenance of the ServiceStats aggregates (one row per company and field).
+
+Every change is applied with a single UPDATE ... SET count = count + 1 ... in the transaction
+of the Service write, so concurrent writers never lose an update. Only removing the
+cheapest/most expensive service of a group recomputes that group from the services.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Sum, Value
+from django.db.models.functions import Cast, Greatest, Least
+from django.utils import timezone
+from .models import Service, ServiceStats
+
+
+def add_services(services, using='default'):
+    """Count `services` (new rows) in their groups, one UPDATE per group."""
+    groups = defaultdict(list)
+    for service in services:
+        groups[(service.company_id, service.field_id)].append(_price(service.price_per_hour))
+    now = timezone.now()
+    for (company_id, field), prices in groups.items():
+        _add(company_id, field, len(prices), sum(prices), min(prices), max(prices), now, using)
+
+
+def remove_service(company_id, field, price, using='default'):
+    price = _price(price)
+    stats = ServiceStats.objects.using(using).filter(company_id=company_id, field_id=field)
+    stats.update(count=F('count') - 1, price_sum=F('price_sum') - price, last_activity_at=timezone.now())
+    row = stats.values('count', 'price_min', 'price_max').first()
+    if row is None:
+        return
+    if row['count'] <= 0:
+        stats.delete()
+    elif price <= row['price_min'] or price >= row['price_max']:
+        # the bound may be gone, recompute it.
+        refresh_group(company_id, field, using)
+
+
+def move_service(previous, service, using='default'):
+    """`previous` is the (company_id, field_id, price_per_hour) of `service` before the update."""
+    company_id, field, price = previous
+    price, new_price = _price(price), _price(service.price_per_hour)
+    if (company_id, field) != (service.company_id, service.field_id):
+        remove_service(company_id, field, price, using)
+        add_services([service], using)
+        return
+    stats = ServiceStats.objects.using(using).filter(company_id=company_id, field_id=field)
+    if price == new_price:
+        stats.update(last_activity_at=timezone.now())
+        return
+    row = stats.values('price_min', 'price_max').first()
+    if row is None or price <= row['price_min'] or price >= row['price_max']:
+        # the bound may be gone. the service is saved already, the recomputed group has its new price.
+        refresh_group(company_id, field, using)
+        stats.update(last_activity_at=timezone.now())
+        return
+    stats.update(
+        price_sum=F('price_sum') - price + new_price,
+        price_min=Least(F('price_min'), _decimal(new_price)), price_max=Greatest(F('price_max'), _decimal(new_price)),
+        last_activity_at=timezone.now(),
+    )
+
+
+def refresh_group(company_id, field, using='default'):
+    aggregates = Service.objects.using(using).filter(company_id=company_id, field_id=field).aggregate(
+        count=Count('id'), price_sum=Sum('price_per_hour'),
+        price_min=Min('price_per_hour'), price_max=Max('price_per_hour'),
+    )
+    stats = ServiceStats.objects.using(using).filter(company_id=company_id, field_id=field)
+    if not aggregates['count']:
+        stats.delete()
+    elif not stats.update(**aggregates):
+        ServiceStats.objects.using(using).create(
+            company_id=company_id, field_id=field, last_activity_at=timezone.now(), **aggregates
+        )
+
+
+def rebuild(using='default', company=None):
+    """Recompute all the aggregates (of one company) from the services, returns the number of groups."""
+    services = Service.objects.using(using).all()
+    stats = ServiceStats.objects.using(using).all()
+    if company is not None:
+        services = services.filter(company_id=company)
+        stats = stats.filter(company_id=company)
+    groups = services.values('company_id', 'field_id').order_by().annotate(
+        count=Count('id'), price_sum=Sum('price_per_hour'),
+        price_min=Min('price_per_hour'), price_max=Max('price_per_hour'),
+        last_activity_at=Max('created_at'),
+    )
+    with transaction.atomic(using=using):
+        stats.delete()
+        rows = ServiceStats.objects.using(using).bulk_create(
+            (ServiceStats(**group) for group in groups.iterator()), batch_size=1000
+        )
+    return len(rows)
+
+
+def total(groups):
+    """Unsaved ServiceStats summing the groups of a company (field is None)."""
+    groups = list(groups)
+    if not groups:
+        return ServiceStats(field=None, count=0)
+    return ServiceStats(
+        field=None,
+        count=sum(group.count for group in groups),
+        price_sum=sum(group.price_sum for group in groups),
+        price_min=min(group.price_min for group in groups),
+        price_max=max(group.price_max for group in groups),
+        last_activity_at=max(group.last_activity_at for group in groups),
+    )
+
+
+def _add(company_id, field, count, price_sum, price_min, price_max, now, using):
+    stats = ServiceStats.objects.using(using).filter(company_id=company_id, field_id=field)
+    changes = dict(
+        count=F('count') + count, price_sum=F('price_sum') + price_sum,
+        price_min=Least(F('price_min'), _decimal(price_min)), price_max=Greatest(F('price_max'), _decimal(price_max)),
+        last_activity_at=now,
+    )
+    if stats.update(**changes):
+        return
+    try:
+        # savepoint: a concurrent writer may create the row first, then it's an update again.
+        with transaction.atomic(using=using):
+            ServiceStats.objects.using(using).create(
+                company_id=company_id, field_id=field, count=count, price_sum=price_sum,
+                price_min=price_min, price_max=price_max, last_activity_at=now,
+            )
+    except IntegrityError:
+        stats.update(**changes)
+
+
+def _price(value):
+    # unsaved instances may hold an int/float/str price.
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _decimal(value):
+    # typed parameter, sqlite's MIN()/MAX() would compare a plain one as text.
+    return Cast(Value(value), output_field=DecimalField(max_digits=100, decimal_places=2))
@@ -0,0 +1,21 @@
+from tasks.queue import enqueue, task
+from . import cache, search
+from .models import Service
+
+
+# the sqlite FTS5 search table is updated by the task workers, in batches, off the request path.
+def index_later(services, using='default'):
+    ids = [service.pk for service in services if service.pk is not None]
+    if ids and search.uses_fts_table(using):
+        enqueue('services.index_services', {'ids': ids}, using=using)
+
+
+@task('services.index_services', batch=True)
+def index_services(payloads, using):
+    ids = {pk for payload in payloads for pk in payload['ids']}
+    # a service deleted in between is gone from the table and was unindexed by its post_delete.
+    services = list(Service.objects.using(using).only('id', 'name', 'description', 'field', 'company_id').filter(pk__in=ids))
+    search.index_services(services, using)
+    # the search pages cached before the indexing don't have them.
+    if services:
+        cache.bump_versions({dep for service in services for dep in cache.service_dependencies(service.field_id, service.company_id)})
@@ -0,0 +1,360 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from django.core.cache import cache
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+from authentication.models import AuthToken
+from backend import fast_json
+from backend.testing import api_mode, get_content
+from benchmarks.factories import CENTER, seed_services, seed_users
+from categories import registry as categories
+from . import feed, stats
+from .cache import VERSION_PREFIX
+from .importing import import_services
+from .models import Service, ServiceStats
+from .serializers import ServiceSerializer
+
+LIMITS = (1, 20, 100)
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class ExpandQueriesTests(TestCase):
+    """?expand=company joins the companies, the count of queries doesn't grow with the page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        users = seed_users(10)
+        seed_services([user for user in users if user.user_type == 'company'], 150)
+        cls.token = AuthToken.objects.issue(users[-1]).key
+
+    def assertQueriesPerPage(self, path, params, queries):
+        headers = {'Authorization': f'Token {self.token}'}
+        for mode in ('sync', 'async'):
+            for limit in LIMITS:
+                with self.subTest(mode=mode, limit=limit), api_mode(mode):
+                    params = dict(params, expand='company', limit=limit)
+                    # warms the token cache, then the page is read from the database again.
+                    self.client.get(path, params, headers=headers)
+                    cache.clear()
+                    with self.assertNumQueries(queries):
+                        response = self.client.get(path, params, headers=headers)
+                    self.assertEqual(response.status_code, 200, response.content)
+                    results = response.json()['results']
+                    self.assertEqual(len(results), limit)
+                    self.assertIn('username', results[0]['company'])
+
+    def test_list(self):
+        self.assertQueriesPerPage('/services/list/', {}, 1)
+
+    def test_search(self):
+        # the search index, then the services.
+        self.assertQueriesPerPage('/services/search/', {'q': 'service'}, 2)
+
+    def test_nearby(self):
+        self.assertQueriesPerPage('/services/nearby/', {'lat': CENTER[0], 'lng': CENTER[1], 'radius': 100}, 1)
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class FeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.token = AuthToken.objects.issue(seed_users(1, companies_ratio=0)[0]).key
+
+    def test_not_served_under_wsgi(self):
+        # the test client is a WSGI handler, the stream would never end.
+        response = self.client.get('/services/feed/', headers={'Authorization': f'Token {self.token}'})
+        self.assertEqual(response.status_code, 501)
+
+
+class FeedSubscriptionTests(SimpleTestCase):
+    """A subscriber exists while its stream is read, never before nor after."""
+
+    async def test_unread_stream(self):
+        hub = feed.Hub()
+        body = feed.stream(hub)
+        self.assertEqual(hub.count, 0)
+        # the response is dropped before it's sent (client gone, a middleware failed...).
+        await body.aclose()
+        self.assertEqual(hub.count, 0)
+
+    async def test_closed_stream(self):
+        hub = feed.Hub()
+        body = feed.stream(hub, field_id=3)
+        self.assertEqual(await anext(body), b'retry: %d\n\n' % settings.FEED['RETRY'])
+        self.assertEqual(hub.count, 1)
+        self.assertEqual(list(hub.subscribers), [3])
+        await body.aclose()
+        self.assertEqual((hub.count, hub.subscribers), (0, {}))
+
+    async def test_full_hub(self):
+        hub = feed.Hub()
+        with override_settings(FEED={**settings.FEED, 'MAX_SUBSCRIBERS': 1}):
+            first = feed.stream(hub)
+            await anext(first)
+            self.assertTrue(hub.full())
+            # filled up after the view checked: the stream ends at once, the client retries.
+            self.assertEqual([part async for part in feed.stream(hub)], [b'retry: %d\n\n' % settings.FEED['RETRY']])
+            self.assertEqual(hub.count, 1)
+            await first.aclose()
+            self.assertFalse(hub.full())
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class BulkCreateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        company, costumer = seed_users(2)
+        cls.tokens = {user.user_type: AuthToken.objects.issue(user).key for user in (company, costumer)}
+
+    def post(self, user_type, body, content_type='text/csv'):
+        headers = {'Authorization': f'Token {self.tokens[user_type]}'}
+        return self.client.post('/services/bulk_create/', body, content_type=content_type, headers=headers)
+
+    def test_company_only(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                response = self.post('costumer', 'name,description,price_per_hour,field\nx,y,10,Plumbing\n')
+                self.assertEqual(response.status_code, 403, response.content)
+        self.assertFalse(Service.objects.exists())
+
+    def test_csv_multiline_field(self):
+        body = 'name,description,price_per_hour,field\r\nx,"line1\r\nline2\nline3",10,Plumbing\r\ny,z,12,Plumbing'
+        response = self.post('company', body)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(
+            list(Service.objects.order_by('name').values_list('description', flat=True)),
+            ['line1\r\nline2\nline3', 'z']
+        )
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class CatalogCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        cls.companies = seed_users(3, companies_ratio=2 / 3)[:2]
+        cls.plumbing, cls.painting = categories.get_by_name('Plumbing'), categories.get_by_name('Painting')
+        cls.token = AuthToken.objects.issue(cls.companies[0]).key
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, path, params=None, **headers):
+        return self.client.get(path, params, headers={'Authorization': f'Token {self.token}', **headers})
+
+    def create_service(self, company, field):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Service.objects.create(company=company, name='s', description='d', price_per_hour=10, field=field)
+
+    def versions(self, *dependencies):
+        found = cache.get_many([VERSION_PREFIX + dependency for dependency in dependencies])
+        return [found.get(VERSION_PREFIX + dependency, 0) for dependency in dependencies]
+
+    def test_not_modified(self):
+        self.create_service(self.companies[0], self.plumbing)
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                response = self.get('/services/list/', {'field': 'Plumbing'})
+                self.assertEqual(response.status_code, 200)
+                # answered from the cache, the token too.
+                with self.assertNumQueries(0):
+                    response = self.get('/services/list/', {'field': 'Plumbing'}, if_none_match=response['ETag'])
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def bumped(self, write, *dependencies):
+        """The dependencies whose version `write` bumped."""
+        before = self.versions(*dependencies)
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        return {dependency for dependency, old, new in zip(dependencies, before, self.versions(*dependencies)) if new != old}
+
+    def test_writes_bump_the_versions(self):
+        first, second = self.companies
+        old = {'all', f'field:{self.plumbing.pk}', f'company:{first.pk}'}
+        new = {'all', f'field:{self.painting.pk}', f'company:{second.pk}'}
+        service = Service(company=first, name='s', description='d', price_per_hour=10, field=self.plumbing)
+        self.assertEqual(self.bumped(service.save, *old, *new), old)
+        service.price_per_hour = 20
+        self.assertEqual(self.bumped(service.save, *old, *new), old)
+        # moved: the pages of the old field and company too.
+        service.field, service.company = self.painting, second
+        self.assertEqual(self.bumped(service.save, *old, *new), old | new)
+        self.assertEqual(self.bumped(service.delete, *old, *new), new)
+
+    def test_stale_page_not_served(self):
+        self.create_service(self.companies[0], self.plumbing)
+        first = self.get('/services/list/', {'field': 'Plumbing'}).json()['results']
+        self.create_service(self.companies[1], self.plumbing)
+        second = self.get('/services/list/', {'field': 'Plumbing'}).json()['results']
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 2)
+
+    def test_company_profile_change(self):
+        company = self.companies[0]
+        self.create_service(company, self.plumbing)
+        for mode in ('sync', 'async'):
+            for params in ({'expand': 'company'}, {'expand': 'company', 'field': 'Plumbing'}, {'expand': 'company', 'company': company.pk}):
+                with self.subTest(mode=mode, params=params), api_mode(mode):
+                    self.get('/services/list/', params)
+                    with self.captureOnCommitCallbacks(execute=True):
+                        company.username = f'renamed-{mode}-{len(params)}'
+                        company.save()
+                    results = self.get('/services/list/', params).json()['results']
+                    self.assertEqual(results[0]['company']['username'], company.username)
+
+    def test_login_keeps_the_pages(self):
+        company = self.companies[0]
+        self.create_service(company, self.plumbing)
+        self.assertEqual(self.bumped(lambda: company.save(update_fields=['last_login']), 'all', f'company:{company.pk}'), set())
+
+
+class ServiceStatsTests(TestCase):
+    """The aggregates maintained by every write equal the ones rebuild() computes from the services."""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        cls.companies = seed_users(2, companies_ratio=1)
+        cls.plumbing, cls.painting = categories.get_by_name('Plumbing'), categories.get_by_name('Painting')
+
+    def create(self, company, field, price):
+        return Service.objects.create(company=company, name='s', description='d', price_per_hour=price, field=field)
+
+    def assertMatchesRebuild(self):
+        # last_activity_at is the time of the write, rebuild() can only take the last created_at.
+        columns = ('company_id', 'field_id', 'count', 'price_sum', 'price_min', 'price_max')
+        maintained = set(ServiceStats.objects.values_list(*columns))
+        stats.rebuild()
+        self.assertEqual(maintained, set(ServiceStats.objects.values_list(*columns)))
+
+    def test_writes(self):
+        first, second = self.companies
+        cheap = self.create(first, self.plumbing, '10.50')
+        middle = self.create(first, self.plumbing, 30)
+        expensive = self.create(first, self.plumbing, 90)
+        self.create(second, self.painting, 15)
+        self.assertMatchesRebuild()
+        # new bounds, then the former ones removed.
+        cheap.price_per_hour = 5
+        cheap.save()
+        expensive.price_per_hour = 95
+        expensive.save()
+        self.assertMatchesRebuild()
+        cheap.price_per_hour = 40
+        cheap.save()
+        self.assertMatchesRebuild()
+        # within the bounds.
+        middle.price_per_hour = 35
+        middle.save()
+        self.assertMatchesRebuild()
+        # moved to another field, then to another company.
+        expensive.field = self.painting
+        expensive.save()
+        self.assertMatchesRebuild()
+        expensive.company = second
+        expensive.save()
+        self.assertMatchesRebuild()
+        # the minimum of a group, then the last service of one.
+        middle.delete()
+        self.assertMatchesRebuild()
+        cheap.delete()
+        self.assertFalse(ServiceStats.objects.filter(company=first, field=self.plumbing).exists())
+        self.assertMatchesRebuild()
+
+    def test_bulk_import(self):
+        first, second = self.companies
+        self.create(first, self.plumbing, 20)
+        summary = import_services([
+            {'name': 's', 'description': 'd', 'price_per_hour': price, 'field': field}
+            for price, field in (('5', 'Plumbing'), ('50.25', 'Plumbing'), ('12', 'Painting'))
+        ], company=first, chunk_size=2)
+        self.assertEqual(summary['created'], 3)
+        self.assertMatchesRebuild()
+        summary = import_services([
+            {'name': 's', 'description': 'd', 'price_per_hour': '7', 'field': 'Painting', 'company': company.pk}
+            for company in (first, second)
+        ])
+        self.assertEqual(summary['created'], 2)
+        self.assertMatchesRebuild()
+
+
+@override_settings(THROTTLING={'ENABLED': False, 'RATES': {}})
+class ServiceExportTests(TestCase):
+    START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    @classmethod
+    def setUpTestData(cls):
+        categories.load()
+        company, costumer, staff = seed_users(3, companies_ratio=1 / 3)
+        staff.is_staff = True
+        staff.save()
+        seed_services([company], 6)
+        # one service per hour from START, created_at is auto_now: set it after the fact.
+        for hour, pk in enumerate(Service.objects.order_by('pk').values_list('pk', flat=True)):
+            Service.objects.filter(pk=pk).update(created_at=cls.START + timedelta(hours=hour))
+        cls.tokens = {user.username: AuthToken.objects.issue(user).key for user in (costumer, staff)}
+        cls.staff, cls.costumer = staff.username, costumer.username
+
+    def export(self, user, **params):
+        return get_content(self, '/services/export/', params, headers={'Authorization': f'Token {self.tokens[user]}'})
+
+    def expected(self, services):
+        # what the DRF serializer renders, as the JSON outputs decode it.
+        return json.loads(fast_json.dumps(ServiceSerializer(services.order_by('created_at', 'pk'), many=True).data))
+
+    def test_outputs(self):
+        expected = self.expected(Service.objects.all())
+        for mode in ('sync', 'async'):
+            for output in ('csv', 'ndjson', 'json'):
+                with self.subTest(mode=mode, output=output), api_mode(mode):
+                    response, content = self.export(self.staff, output=output)
+                    self.assertEqual(response.status_code, 200, content)
+                    self.assertIn(f'filename="services.{output}"', response['Content-Disposition'])
+                    if output == 'json':
+                        self.assertEqual(json.loads(content), expected)
+                    elif output == 'ndjson':
+                        self.assertEqual([json.loads(line) for line in content.decode().splitlines()], expected)
+                    else:
+                        self.assertEqual(list(csv.DictReader(io.StringIO(content.decode()))), [
+                            {key: '' if value is None else str(value) for key, value in row.items()} for row in expected
+                        ])
+
+    def test_bounds(self):
+        since, until = self.START + timedelta(hours=1), self.START + timedelta(hours=4)
+        expected = self.expected(Service.objects.filter(created_at__gte=since, created_at__lt=until))
+        self.assertEqual(len(expected), 3)
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                response, content = self.export(self.staff, output='json', since=since.isoformat(), until=until.isoformat())
+                self.assertEqual(json.loads(content), expected)
+                self.assertEqual(datetime.fromisoformat(response['X-Export-Until']), until)
+                # the next incremental export starts where this one stopped.
+                response, content = self.export(self.staff, output='json', since=response['X-Export-Until'])
+                self.assertEqual(json.loads(content), self.expected(Service.objects.filter(created_at__gte=until)))
+
+    def test_default_until(self):
+        # a few seconds in the past: a service saved just now is left to the next export.
+        Service.objects.filter(pk=Service.objects.order_by('pk').last().pk).update(created_at=datetime.now(timezone.utc))
+        response, content = self.export(self.staff, output='json')
+        until = datetime.fromisoformat(response['X-Export-Until'])
+        self.assertLess(until, datetime.now(timezone.utc))
+        self.assertEqual(len(json.loads(content)), 5)
+
+    def test_invalid_bounds(self):
+        response, content = self.export(self.staff, since=self.START.isoformat(), until=(self.START - timedelta(hours=1)).isoformat())
+        self.assertEqual(response.status_code, 400, content)
+
+    def test_staff_only(self):
+        for mode in ('sync', 'async'):
+            with self.subTest(mode=mode), api_mode(mode):
+                response, content = self.export(self.costumer)
+                self.assertEqual(response.status_code, 403, content)
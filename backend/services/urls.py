@@ -1,6 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .async_views import feed_services_view
+
+# same urls, served by the async (ASGI-native) views when API_MODE is 'async'.
+if settings.API_MODE == 'async':
+    from . import async_views as views
 
 urlpatterns = [
-    path('create/', views.create_service_view)
+    path('create/', views.create_service_view),
+    path('list/', views.list_services_view, name='list_services'),
+    path('bulk_create/', views.bulk_create_services_view, name='bulk_create_services'),
+    path('search/', views.search_services_view, name='search_services'),
+    path('nearby/', views.nearby_services_view, name='nearby_services'),
+    path('dashboard/', views.company_dashboard_view, name='company_dashboard'),
+    path('export/', views.export_services_view, name='export_services'),
+    # Server-Sent Events, served by the async view in both modes. ASGI only (backend.asgi): under
+    # WSGI (backend.wsgi, the test client) it answers 501 instead of holding a worker thread forever.
+    path('feed/', feed_services_view, name='feed_services')
 ]     
\ No newline at end of file
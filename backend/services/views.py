@@ -1,10 +1,29 @@
-from .serializers import ServiceSerializer
+from .serializers import (
+    ServiceSerializer,
+    ServiceValuesSerializer,
+    ServiceFilterSerializer,
+    ServiceSearchSerializer,
+    ServiceStatsSerializer,
+    ServiceNearbySerializer,
+    ServiceNearbyValuesSerializer
+)
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
-from .models import Service
+from .models import Service, ServiceStats
+from .pagination import paginate_keyset, paginate_distance, InvalidCursor
+from .importing import import_services, iter_rows, ImportFormatError
+from .search import search_services
+from . import geo, stats
+import logging
+from backend.routers import read_replica
+from .cache import cached_catalog_response
+from django.db import router
+from backend import exporting
+
+logger = logging.getLogger(__name__)
 
 
 @api_view(['POST'])
@@ -20,8 +39,182 @@ def create_service_view(request):
             {"message": "Service created successfully"},
             status=status.HTTP_201_CREATED
         )
-    print(f"ERROR: {serialized_service.errors}")
+    logger.info("service creation rejected", extra={'errors': serialized_service.errors})
     return Response(
         {"message": serialized_service.errors},
         status=status.HTTP_400_BAD_REQUEST
     )
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_catalog_response
+def list_services_view(request):
+    """
+    Service catalog API endpoint
+    GET /services/list/?field=Plumbing&min_price=10&max_price=50&company=3&specialists=true&limit=20&cursor=...
+    Returns the services newest first, pass the returned "next" cursor to get the following page.
+    """
+    filters = ServiceFilterSerializer(data=request.query_params)
+    if not filters.is_valid():
+        return Response({"message": filters.errors}, status=status.HTTP_400_BAD_REQUEST)
+    # plain rows for the fast serializer, no model instances.
+    queryset = filters.filter_queryset(Service.objects.values(*ServiceValuesSerializer.value_fields(filters.expand_company)))
+    try:
+        services, next_cursor = paginate_keyset(
+            queryset,
+            cursor=filters.validated_data.get('cursor'),
+            page_size=filters.validated_data['limit']
+        )
+    except InvalidCursor as error:
+        return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {
+            "results": ServiceValuesSerializer(services, many=True, expand_company=filters.expand_company).data,
+            "next": next_cursor
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_catalog_response
+def search_services_view(request):
+    """
+    Service search API endpoint
+    GET /services/search/?q=leaking pipe&field=Plumbing&min_price=10&max_price=50&page=1&limit=20
+    Returns the services matching q in their name or description, best match first.
+    """
+    params = ServiceSearchSerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    page, limit = params.validated_data['page'], params.validated_data['limit']
+    # one extra row tells if there is a next page.
+    services = search_services(
+        params.validated_data['q'], params.validated_data, limit=limit + 1, offset=(page - 1) * limit,
+        expand_company=params.expand_company
+    )
+    return Response(
+        {
+            "results": ServiceValuesSerializer(services[:limit], many=True, expand_company=params.expand_company).data,
+            "page": page,
+            "next": page + 1 if len(services) > limit and page < params.fields['page'].max_value else None
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def nearby_services_view(request):
+    """
+    Nearby services API endpoint
+    GET /services/nearby/?lat=48.85&lng=2.35&radius=10&field=Plumbing&min_price=10&max_price=50&limit=20&cursor=...
+    Returns the services within radius km (10 by default, 200 at most) nearest first with their
+    distance_km, pass the returned "next" cursor to get the following page.
+    """
+    params = ServiceNearbySerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    data = params.validated_data
+    queryset = params.filter_queryset(Service.objects.values(*ServiceValuesSerializer.value_fields(params.expand_company)))
+    try:
+        services, next_cursor = paginate_distance(
+            geo.nearby(queryset, data['lat'], data['lng'], data['radius']),
+            cursor=data.get('cursor'),
+            page_size=data['limit']
+        )
+    except InvalidCursor as error:
+        return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(
+        {
+            "results": ServiceNearbyValuesSerializer(services, many=True, expand_company=params.expand_company).data,
+            "next": next_cursor
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+# content type of the request body -> import format.
+IMPORT_CONTENT_TYPES = {
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'text/csv': 'csv',
+}
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@csrf_exempt
+def bulk_create_services_view(request):
+    """
+    Bulk service import API endpoint
+    POST /services/bulk_create/
+    The body is streamed: a JSON array (application/json), one JSON object per line
+    (application/x-ndjson) or a CSV file with a header line (text/csv), each row holding
+    name, description, price_per_hour and field. The services are created for request.user.
+    Returns {"created": n, "failed": n, "errors": [{"row": n, "errors": {...}}]}
+    """
+    if request.user.user_type != 'company':
+        return Response({"message": "Only company accounts can create services."}, status=status.HTTP_403_FORBIDDEN)
+    import_format = IMPORT_CONTENT_TYPES.get(request.content_type.split(';')[0].strip())
+    if import_format is None:
+        return Response(
+            {"message": f"Unsupported content type, expected one of {', '.join(IMPORT_CONTENT_TYPES)}."},
+            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        )
+    if request.stream is None:
+        return Response({"message": "Empty body."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        summary = import_services(iter_rows(request.stream, import_format), company=request.user)
+    except ImportFormatError as error:
+        # the chunks before the malformed part are already imported.
+        return Response({"message": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+    if summary['failed'] and not summary['created']:
+        return Response(summary, status=status.HTTP_400_BAD_REQUEST)
+    return Response(summary, status=status.HTTP_201_CREATED)
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def company_dashboard_view(request):
+    """
+    Company dashboard API endpoint
+    GET /services/dashboard/
+    Returns the services count, min/avg/max price_per_hour and last activity of request.user
+    per field and in total, read from the precomputed aggregates (one query).
+    """
+    if request.user.user_type != 'company':
+        return Response({"message": "Only company accounts have a dashboard."}, status=status.HTTP_403_FORBIDDEN)
+    groups = list(ServiceStats.objects.filter(company=request.user).order_by('field'))
+    return Response(
+        {
+            "total": ServiceStatsSerializer(stats.total(groups)).data,
+            "fields": ServiceStatsSerializer(groups, many=True).data
+        },
+        status=status.HTTP_200_OK
+    )
+
+
+@read_replica
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_services_view(request):
+    """
+    Service export API endpoint (staff, for the analytics jobs)
+    GET /services/export/?output=csv|ndjson|json&since=2026-01-01T00:00:00Z&until=...
+    Streams the services created or updated in [since, until), oldest first, in constant memory.
+    The X-Export-Until header is the since of the next incremental export.
+    """
+    params = exporting.ExportParamsSerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response({"message": params.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return exporting.streaming_response(
+        exporting.get_exports()['services'], params.validated_data, using=router.db_for_read(Service)
+    )
@@ -0,0 +1,46 @@
+import logging
+import signal
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from tasks import queue
+
+logger = logging.getLogger('tasks')
+
+
+class Command(BaseCommand):
+    help = "Run the background tasks of the database queue (tasks/queue.py), several workers can run side by side."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--batch-size', type=int, default=settings.TASKS['BATCH_SIZE'], help="tasks claimed at a time")
+        parser.add_argument('--poll-interval', type=float, default=settings.TASKS['POLL_INTERVAL'],
+                            help="seconds to wait when no task is due")
+        parser.add_argument('--once', action='store_true', help="exit once no task is due instead of polling")
+
+    def handle(self, *args, **options):
+        using = options['database']
+        worker = queue.worker_id()
+        stopping = []
+        # finish the current batch on SIGTERM/SIGINT, its tasks would wait for their lease to expire.
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stopping.append(True))
+        total_done = total_failed = 0
+        while not stopping:
+            close_old_connections()
+            batch = queue.claim(worker, options['batch_size'], using)
+            if not batch:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+            started = time.perf_counter()
+            done, failed = queue.run_batch(batch, using)
+            total_done += done
+            total_failed += failed
+            logger.info("tasks run", extra={
+                'worker': worker, 'done': done, 'failed': failed,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+        self.stdout.write(self.style.SUCCESS(f"{total_done} tasks done, {total_failed} failed."))
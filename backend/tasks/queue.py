@@ -0,0 +1,188 @@
+"""
+Background tasks backed by a database table, no broker: a Task row per unit of work,
+run by the `manage.py run_tasks` workers.
+
+- @task('name') registers a handler, enqueue('name', payload) inserts the row in the current
+  transaction: the task exists if and only if the write that needed it commits.
+- A worker claims up to BATCH_SIZE due tasks at a time (SKIP LOCKED on postgres, a conditional
+  UPDATE on sqlite), runs them grouped by name (a batch=True handler gets all their payloads in
+  one call, in one transaction) and deletes them. A failing task is retried with an exponential
+  backoff up to its max_attempts, then kept with the failed status and its last error. So is a
+  task whose worker died on its last attempt (its lease expired).
+- With TASKS['EAGER'] (development, no worker running) the handler runs in the process right
+  after the commit instead.
+"""
+import logging
+import os
+import random
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 3600  # seconds
+MAX_ERROR_LENGTH = 4000
+
+_handlers = {}
+
+
+class Handler:
+    __slots__ = ('name', 'function', 'batch', 'max_attempts')
+
+    def __init__(self, name, function, batch, max_attempts):
+        self.name = name
+        self.function = function
+        self.batch = batch
+        self.max_attempts = max_attempts
+
+    def __call__(self, payloads, using):
+        if self.batch:
+            return self.function(payloads, using=using)
+        for payload in payloads:
+            self.function(payload, using=using)
+
+
+def task(name, batch=False, max_attempts=None):
+    """
+    Register the decorated function as the handler of the `name` tasks: function(payload, using),
+    or function(payloads, using) with batch=True. using is the database alias of the tasks.
+    """
+    def decorator(function):
+        _handlers[name] = Handler(name, function, batch, max_attempts)
+        return function
+    return decorator
+
+
+def get_handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"No task handler registered as {name!r}.")
+
+
+def enqueue(name, payload=None, delay=0, using=DEFAULT_DB_ALIAS):
+    """Schedule the task `name` (a JSON serializable payload), in the current transaction of `using`."""
+    handler = get_handler(name)
+    payload = payload if payload is not None else {}
+    if settings.TASKS['EAGER']:
+        transaction.on_commit(lambda: _run_eager(handler, payload, using), using=using)
+        return None
+    return Task.objects.using(using).create(
+        name=name,
+        payload=payload,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=handler.max_attempts or settings.TASKS['MAX_ATTEMPTS'],
+    )
+
+
+def _run_eager(handler, payload, using):
+    try:
+        with transaction.atomic(using=using):
+            handler([payload], using)
+    except Exception:
+        # the request that enqueued it already committed, its response must not fail.
+        logger.exception("eager task failed", extra={'task': handler.name})
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+
+def _due(now):
+    # pending and due, or running with the lease of a dead worker (and attempts left).
+    return Q(status=Task.PENDING, run_at__lte=now) | Q(
+        status=Task.RUNNING, locked_until__lt=now, attempts__lt=F('max_attempts')
+    )
+
+
+def _fail_expired(now, tasks):
+    # a task whose lease expired on its last attempt likely killed its workers (OOM, segfault...):
+    # it's failed instead of being claimed forever.
+    failed = tasks.filter(status=Task.RUNNING, locked_until__lt=now, attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED,
+        locked_by=None,
+        locked_until=None,
+        last_error="The lease of the last attempt expired, its worker died while running it.",
+    )
+    if failed:
+        logger.warning("tasks failed after their last lease expired", extra={'count': failed})
+
+
+def claim(worker, batch_size, using=DEFAULT_DB_ALIAS):
+    """Lock up to batch_size due tasks for `worker`, oldest first, returns them."""
+    now = timezone.now()
+    tasks = Task.objects.using(using)
+    with transaction.atomic(using=using):
+        _fail_expired(now, tasks)
+        due = tasks.filter(_due(now))
+        if connections[using].features.has_select_for_update_skip_locked:
+            # the workers claim disjoint batches instead of waiting on each other's rows.
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.order_by('run_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # conditional, without row locks (sqlite) another worker may have claimed some of them first.
+        tasks.filter(_due(now), id__in=ids).update(
+            status=Task.RUNNING,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=settings.TASKS['LEASE']),
+            attempts=F('attempts') + 1,
+        )
+    return list(tasks.filter(id__in=ids, status=Task.RUNNING, locked_by=worker).order_by('run_at', 'id'))
+
+
+def run_batch(batch, using=DEFAULT_DB_ALIAS):
+    """Run the claimed tasks, deletes the done ones and reschedules the failed ones. Returns (done, failed)."""
+    groups = {}
+    for claimed in batch:
+        groups.setdefault(claimed.name, []).append(claimed)
+    done, failed = [], []
+    for name, group in groups.items():
+        handler = _handlers.get(name)
+        if handler is None:
+            _failed(group, f"No task handler registered as {name!r}.", retry=False)
+            failed += group
+            continue
+        # a batch handler succeeds or fails as a whole, the others one task at a time.
+        for chunk in [group] if handler.batch else [[one] for one in group]:
+            try:
+                with transaction.atomic(using=using):
+                    handler([claimed.payload for claimed in chunk], using)
+            except Exception:
+                logger.warning("task failed", exc_info=True, extra={'task': name, 'ids': [one.pk for one in chunk]})
+                _failed(chunk, traceback.format_exc())
+                failed += chunk
+            else:
+                done += chunk
+    if done:
+        Task.objects.using(using).filter(id__in=[claimed.pk for claimed in done]).delete()
+    if failed:
+        Task.objects.using(using).bulk_update(failed, ['status', 'run_at', 'locked_by', 'locked_until', 'last_error'])
+    return len(done), len(failed)
+
+
+def retry_delay(attempts):
+    """Exponential backoff from TASKS['RETRY_DELAY'], with some jitter so the retries don't come in waves."""
+    delay = min(MAX_RETRY_DELAY, settings.TASKS['RETRY_DELAY'] * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _failed(failed, error, retry=True):
+    now = timezone.now()
+    for claimed in failed:
+        claimed.locked_by = None
+        claimed.locked_until = None
+        claimed.last_error = error[-MAX_ERROR_LENGTH:]
+        if retry and claimed.attempts < claimed.max_attempts:
+            claimed.status = Task.PENDING
+            claimed.run_at = now + timedelta(seconds=retry_delay(claimed.attempts))
+        else:
+            claimed.status = Task.FAILED
@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from .models import Task
+from .queue import claim
+
+
+class ClaimTests(TestCase):
+    def running(self, attempts, max_attempts=3):
+        # claimed by a worker that died, its lease expired.
+        return Task.objects.create(
+            name='noop', run_at=timezone.now(), status=Task.RUNNING, attempts=attempts, max_attempts=max_attempts,
+            locked_by='dead', locked_until=timezone.now() - timedelta(seconds=1),
+        )
+
+    def test_expired_lease_is_claimed_again(self):
+        task = self.running(attempts=1)
+        self.assertEqual([claimed.pk for claimed in claim('worker', 10)], [task.pk])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.locked_by), (Task.RUNNING, 2, 'worker'))
+
+    def test_expired_lease_of_last_attempt_fails(self):
+        task = self.running(attempts=3)
+        self.assertEqual(claim('worker', 10), [])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.locked_by), (Task.FAILED, 3, None))
+        self.assertIn('lease', task.last_error)